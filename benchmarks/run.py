@@ -0,0 +1,178 @@
+r"""
+Benchmarks of the metrics pipeline on synthetic corpora of growing size.
+
+Each stage is run once for its wall time, then once under `tracemalloc`
+for its peak memory. The results are compared to the stored baselines,
+and the run fails when a stage is slower or larger than its baseline
+beyond the tolerance, or has no baseline to be compared to.
+
+    python -m benchmarks.run --sizes 10k 100k
+    python -m benchmarks.run --sizes 10k --update-baseline
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from hn_eda.corpus_metrics import CorpusMetrics
+from hn_eda.data_preparation import CACHE_DIR
+from hn_eda.story_corpus import StoryCorpusReader
+from hn_eda.synthetic_corpus import TitleModel, write_synthetic_corpus
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+BASELINES = Path(__file__).parent / "baselines.json"
+DATA_DIR = CACHE_DIR / "benchmarks"
+TOLERANCE = 1.25
+MIN_SECONDS = 0.05
+
+
+def corpus_path(size_name, seed=0, data_dir=DATA_DIR):
+    """
+    :return: the path of the synthetic corpus of that size, generated on
+        first use.
+    """
+    path = Path(data_dir) / f"synthetic_{size_name}_{seed}.jsonl"
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        model = TitleModel.from_titles(StoryCorpusReader().titles())
+        write_synthetic_corpus(path, SIZES[size_name], model, seed=seed)
+    return path
+
+
+def read_titles(path):
+    story_corpus = StoryCorpusReader(path=path)
+    story_corpus.titles()
+    return story_corpus
+
+
+def tokenize_titles(story_corpus):
+    story_corpus.sentences()
+    return story_corpus
+
+
+def metric_values(story_corpus):
+    return CorpusMetrics(story_corpus, item_name="title").values()
+
+
+def stages(path):
+    """
+    :return: the stages of the pipeline, as (name, function) pairs, each
+        function taking the result of the previous one. The reader keeps
+        the titles and their tokens, so that the metrics are measured
+        apart from them.
+    """
+    return [
+        ("reader", lambda _: read_titles(path)),
+        ("tokenizer", tokenize_titles),
+        ("values", metric_values),
+    ]
+
+
+def run_stages(path, trace_memory=False):
+    """
+    :return: the wall time, or the peak memory in bytes, of each stage.
+    :rtype: dict
+    """
+    measures = {}
+    result = None
+    for name, stage in stages(path):
+        gc.collect()
+        if trace_memory:
+            tracemalloc.start()
+            result = stage(result)
+            measures[name] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        else:
+            start = time.perf_counter()
+            result = stage(result)
+            measures[name] = time.perf_counter() - start
+    return measures
+
+
+def benchmark(size_names, seed=0, data_dir=DATA_DIR):
+    """
+    :return: the seconds and peak memory of each stage, by corpus size.
+    :rtype: dict
+    """
+    results = {}
+    for size_name in size_names:
+        path = corpus_path(size_name, seed=seed, data_dir=data_dir)
+        seconds = run_stages(path)
+        peak_memory = run_stages(path, trace_memory=True)
+        results[size_name] = {
+            stage: {"seconds": seconds[stage], "peak_memory": peak_memory[stage]}
+            for stage in seconds
+        }
+    return results
+
+
+def regressions(results, baselines, tolerance=TOLERANCE):
+    """
+    :return: a message for every measure exceeding its baseline times the
+        tolerance, and for every stage without a baseline; times shorter
+        than `MIN_SECONDS` are too noisy to compare.
+    :rtype: list(str)
+    """
+    messages = []
+    for size_name, stage_results in results.items():
+        for stage, measures in stage_results.items():
+            baseline = baselines.get(size_name, {}).get(stage)
+            if baseline is None:
+                messages.append(f"{size_name} {stage}: no baseline")
+                continue
+            for measure, value in measures.items():
+                limit = baseline[measure] * tolerance
+                if measure == "seconds" and value < MIN_SECONDS:
+                    continue
+                if value > limit:
+                    messages.append(
+                        f"{size_name} {stage} {measure}: "
+                        f"{value:.4g} > {baseline[measure]:.4g} x {tolerance}"
+                    )
+    return messages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["10k"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baselines", type=Path, default=BASELINES)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = benchmark(args.sizes, seed=args.seed)
+    for size_name, stage_results in results.items():
+        for stage, measures in stage_results.items():
+            print(
+                f"{size_name:>5} {stage:<15} {measures['seconds']:9.3f} s "
+                f"{measures['peak_memory'] / 2**20:9.1f} MiB"
+            )
+
+    baselines = {}
+    if args.baselines.exists():
+        baselines = json.loads(args.baselines.read_text())
+
+    if args.update_baseline:
+        baselines.update(results)
+        args.baselines.write_text(json.dumps(baselines, indent=2, sort_keys=True))
+        return 0
+
+    messages = regressions(results, baselines, tolerance=args.tolerance)
+    for message in messages:
+        print(f"Regression: {message}", file=sys.stderr)
+    if messages and not baselines:
+        print(
+            f"No baselines in {args.baselines}, "
+            "record them on the reference machine with --update-baseline",
+            file=sys.stderr,
+        )
+    return 1 if messages else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+import json
+import typing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from hashlib import blake2b
+from pathlib import Path
+
+MANIFEST_NAME = ".artifacts.json"
+
+
+class Artifact(typing.NamedTuple):
+    name: str
+    build: typing.Callable
+    """Called with the values of the required artifacts and the parameters,
+    preceded by the output path for the artifacts written to a file"""
+    requires: typing.Tuple[str, ...]
+    params: typing.Dict[str, typing.Any]
+    output: typing.Optional[str]
+    """File name of the artifact in the output directory, None for the
+    intermediate values kept in memory"""
+    figure: bool
+    """Rendered in a worker process with a headless matplotlib backend"""
+
+
+def _type_name(value) -> str:
+    # Objects bound to a build function, such as a corpus reader, are keyed
+    # by their type, their content being part of the content key
+    return f"{type(value).__module__}.{type(value).__qualname__}"
+
+
+def _use_headless_backend():
+    import matplotlib
+
+    matplotlib.use("Agg", force=True)
+
+
+def _render_figure(build, path, values, params):
+    from matplotlib import pyplot as plt
+
+    try:
+        build(path, *values, **params)
+    finally:
+        plt.close("all")
+
+
+class ArtifactGraph:
+    r"""
+    Dependency graph of named artifacts: files written to an output
+    directory, and the intermediate values they are built from.
+
+    The key of an artifact hashes the content key, such as a digest of the
+    corpus and the version of its tokenizer, the name, build function and
+    parameters of the artifact, the arguments bound to a partial build
+    function, and the keys of the artifacts it requires.
+    The keys of the files written are kept in a manifest, so that a rerun
+    only builds the files whose key changed, and the intermediate values
+    they need.
+
+        >>> graph = ArtifactGraph(GENERATED_DIR, content_key)
+        >>> graph.add("dictionary", corpus_dictionary)
+        >>> graph.add(
+        ...     "word_cloud",
+        ...     plot_word_cloud,
+        ...     requires=("dictionary",),
+        ...     output="wordcloud.png",
+        ...     figure=True,
+        ... )
+        >>> graph.run()
+        ['word_cloud']
+
+    Figures are rendered in parallel by a process pool, their build
+    functions and the values they require being pickled.
+    """
+
+    def __init__(self, output_dir: typing.Union[str, Path], content_key: str):
+        """
+        :param output_dir: directory of the files and of their manifest.
+        :param content_key: key of everything the artifacts depend on that
+            is not a parameter, such as the corpus content.
+        """
+        self.output_dir = Path(output_dir)
+        self.content_key = content_key
+        self.artifacts = {}
+        self._keys = {}
+        self._values = {}
+
+    def add(
+        self,
+        name: str,
+        build: typing.Callable,
+        requires: typing.Sequence[str] = (),
+        params: typing.Dict[str, typing.Any] = None,
+        output: str = None,
+        figure: bool = False,
+    ):
+        """
+        :param requires: names of the artifacts the build function is called
+            with, added beforehand.
+        :param params: JSON serialisable keyword arguments of the build
+            function.
+        :param output: file name of the artifact, which is otherwise an
+            intermediate value.
+        :param figure: whether the build function draws a matplotlib figure
+            saved to the output path.
+        """
+        if name in self.artifacts:
+            raise ValueError(f"Artifact {name!r} already added")
+        unknown_names = [required for required in requires if required not in self]
+        if unknown_names:
+            raise ValueError(f"Unknown artifacts required by {name!r}: {unknown_names}")
+        if figure and output is None:
+            raise ValueError(f"Figure {name!r} has no output file")
+        self.artifacts[name] = Artifact(
+            name, build, tuple(requires), dict(params or {}), output, figure
+        )
+
+    def __contains__(self, name):
+        return name in self.artifacts
+
+    def key(self, name: str) -> str:
+        """
+        :rtype: str
+        """
+        if name not in self._keys:
+            artifact = self.artifacts[name]
+            build = artifact.build
+            bound_args = []
+            while isinstance(build, partial):
+                bound_args.append([build.args, build.keywords])
+                build = build.func
+            content = json.dumps(
+                [
+                    self.content_key,
+                    name,
+                    f"{build.__module__}.{build.__qualname__}",
+                    bound_args,
+                    artifact.params,
+                    [self.key(required) for required in artifact.requires],
+                ],
+                sort_keys=True,
+                default=_type_name,
+            )
+            self._keys[name] = blake2b(content.encode(), digest_size=16).hexdigest()
+        return self._keys[name]
+
+    def path(self, name: str) -> Path:
+        return self.output_dir / self.artifacts[name].output
+
+    def _manifest_path(self):
+        return self.output_dir / MANIFEST_NAME
+
+    def manifest(self) -> typing.Dict[str, str]:
+        """
+        :return: the key of each file built so far.
+        :rtype: dict(str, str)
+        """
+        try:
+            with open(self._manifest_path(), encoding="utf-8") as manifest_file:
+                return json.load(manifest_file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def stale(self, manifest=None) -> typing.List[str]:
+        """
+        :return: the names of the files missing or built with another key.
+        :rtype: list(str)
+        """
+        if manifest is None:
+            manifest = self.manifest()
+        return [
+            name
+            for name, artifact in self.artifacts.items()
+            if artifact.output is not None
+            and (manifest.get(name) != self.key(name) or not self.path(name).exists())
+        ]
+
+    def value(self, name: str):
+        """
+        :return: the value of an intermediate artifact, built on first use.
+        """
+        if name not in self._values:
+            artifact = self.artifacts[name]
+            if artifact.output is not None:
+                raise ValueError(f"Artifact {name!r} is a file")
+            self._values[name] = artifact.build(
+                *self._required_values(artifact), **artifact.params
+            )
+        return self._values[name]
+
+    def _required_values(self, artifact):
+        return [self.value(required) for required in artifact.requires]
+
+    def run(self, workers: int = None) -> typing.List[str]:
+        """
+        Build the stale files: the figures across a process pool while the
+        other files are written by this process.
+
+        :param workers: number of processes rendering the figures, one per
+            CPU by default.
+        :return: the names of the files built.
+        :rtype: list(str)
+        """
+        manifest = self.manifest()
+        stale_names = self.stale(manifest)
+        if not stale_names:
+            return []
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        figure_names = [name for name in stale_names if self.artifacts[name].figure]
+        executor = None
+        futures = {}
+        if figure_names:
+            executor = ProcessPoolExecutor(
+                max_workers=workers, initializer=_use_headless_backend
+            )
+        try:
+            for name in figure_names:
+                artifact = self.artifacts[name]
+                futures[name] = executor.submit(
+                    _render_figure,
+                    artifact.build,
+                    self.path(name),
+                    self._required_values(artifact),
+                    artifact.params,
+                )
+
+            for name in stale_names:
+                if name in futures:
+                    continue
+                artifact = self.artifacts[name]
+                artifact.build(
+                    self.path(name), *self._required_values(artifact), **artifact.params
+                )
+                manifest[name] = self.key(name)
+
+            for name, future in futures.items():
+                future.result()
+                manifest[name] = self.key(name)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            with open(self._manifest_path(), "w", encoding="utf-8") as manifest_file:
+                json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+        return stale_names
@@ -0,0 +1,289 @@
+import typing
+from itertools import islice
+
+import numpy as np
+
+ID_BITS = 21
+MAX_VOCABULARY = 1 << ID_BITS
+CHUNK_SIZE = 1 << 20
+MEASURES = ("likelihood_ratio", "raw_freq", "pmi")
+RANK_GAP = 1e-15
+_SMALL = 1e-20
+
+
+def _pack(*id_arrays) -> np.ndarray:
+    """
+    :return: the n-grams of the token ids, packed into one `int64` key each.
+    """
+    keys = np.zeros(len(id_arrays[0]), dtype=np.int64)
+    for ids in id_arrays:
+        keys = (keys << ID_BITS) | ids
+    return keys
+
+
+def _unpack(keys: np.ndarray, n: int) -> typing.List[np.ndarray]:
+    mask = MAX_VOCABULARY - 1
+    return [(keys >> (ID_BITS * (n - 1 - index))) & mask for index in range(n)]
+
+
+def _add_counts(keys, counts, new_keys):
+    """
+    :return: the sorted keys and their counts, once the new keys counted.
+    """
+    new_keys, new_counts = np.unique(new_keys, return_counts=True)
+    keys, inverse = np.unique(np.concatenate([keys, new_keys]), return_inverse=True)
+    counts = np.bincount(inverse, weights=np.concatenate([counts, new_counts]))
+    return keys, counts.astype(np.int64)
+
+
+class TrigramCollocations:
+    r"""
+    Trigram collocation finder over integer encoded tokens, scoring as
+    `nltk.collocations.TrigramCollocationFinder` does.
+
+    Words are read by chunks: the unigrams, bigrams, trigrams and skipping
+    bigrams `(w1, *, w3)` are counted as sorted arrays of packed token ids,
+    the n-grams spanning two chunks included. Filters are applied on the
+    arrays before scoring, and every association measure is computed for
+    all the trigrams at once.
+
+        >>> collocations = TrigramCollocations.from_words(words)
+        >>> collocations.apply_freq_filter(min_freq=2)
+        >>> collocations.nbest("likelihood_ratio", 15)
+        [('show', 'hn', ':'), ...]
+    """
+
+    def __init__(self):
+        self.vocabulary = {}
+        self.word_counts = np.zeros(0, dtype=np.int64)
+        self.bigram_keys = np.zeros(0, dtype=np.int64)
+        self.bigram_counts = np.zeros(0, dtype=np.int64)
+        self.wildcard_keys = np.zeros(0, dtype=np.int64)
+        self.wildcard_counts = np.zeros(0, dtype=np.int64)
+        self.trigram_keys = np.zeros(0, dtype=np.int64)
+        self.trigram_counts = np.zeros(0, dtype=np.int64)
+        self._tail = np.zeros(0, dtype=np.int64)
+
+    @classmethod
+    def from_words(cls, words: typing.Iterable[str], chunk_size=CHUNK_SIZE):
+        """
+        :param words: iterable of words, consumed once by chunks of
+            `chunk_size` words.
+        :rtype: TrigramCollocations
+        """
+        collocations = cls()
+        words = iter(words)
+        while True:
+            chunk = list(islice(words, chunk_size))
+            if not chunk:
+                return collocations
+            collocations.update(chunk)
+
+    def update(self, words: typing.Sequence[str]):
+        """
+        Count the n-grams of the next words of the corpus.
+        """
+        vocabulary = self.vocabulary
+        ids = np.fromiter(
+            (vocabulary.setdefault(word, len(vocabulary)) for word in words),
+            dtype=np.int64,
+            count=len(words),
+        )
+        if len(vocabulary) > MAX_VOCABULARY:
+            raise ValueError(f"More than {MAX_VOCABULARY} distinct words")
+        if len(ids) == 0:
+            return
+
+        word_counts = np.bincount(ids, minlength=len(vocabulary))
+        word_counts[: len(self.word_counts)] += self.word_counts
+        self.word_counts = word_counts
+
+        # The last two words of the previous chunk start n-grams of this one
+        window = np.concatenate([self._tail, ids])
+        start = max(len(self._tail) - 1, 0)
+        self.bigram_keys, self.bigram_counts = _add_counts(
+            self.bigram_keys,
+            self.bigram_counts,
+            _pack(window[start:-1], window[start + 1 :]),
+        )
+        start = max(len(self._tail) - 2, 0)
+        self.wildcard_keys, self.wildcard_counts = _add_counts(
+            self.wildcard_keys,
+            self.wildcard_counts,
+            _pack(window[start:-2], window[start + 2 :]),
+        )
+        self.trigram_keys, self.trigram_counts = _add_counts(
+            self.trigram_keys,
+            self.trigram_counts,
+            _pack(window[start:-2], window[start + 1 : -1], window[start + 2 :]),
+        )
+        self._tail = window[-2:]
+
+    def __len__(self):
+        return len(self.trigram_keys)
+
+    def word_count(self) -> int:
+        return int(self.word_counts.sum())
+
+    def _keep_trigrams(self, mask):
+        self.trigram_keys = self.trigram_keys[mask]
+        self.trigram_counts = self.trigram_counts[mask]
+
+    def apply_freq_filter(self, min_freq: int):
+        """
+        Remove the trigrams occurring less than `min_freq` times.
+        """
+        self._keep_trigrams(self.trigram_counts >= min_freq)
+
+    def apply_word_filter(self, word_filter: typing.Callable[[str], bool]):
+        """
+        Remove the trigrams with a word for which `word_filter` is true, the
+        filter being called once per distinct word.
+        """
+        word_mask = np.fromiter(
+            map(word_filter, self.vocabulary), dtype=bool, count=len(self.vocabulary)
+        )
+        w1, w2, w3 = _unpack(self.trigram_keys, 3)
+        self._keep_trigrams(~(word_mask[w1] | word_mask[w2] | word_mask[w3]))
+
+    def ngrams(self, indices=None) -> typing.List[typing.Tuple[str]]:
+        """
+        :return: the trigrams at `indices`, every trigram by default.
+        :rtype: list(tuple(str))
+        """
+        keys = self.trigram_keys if indices is None else self.trigram_keys[indices]
+        tokens = list(self.vocabulary)
+        return [
+            (tokens[w1], tokens[w2], tokens[w3])
+            for w1, w2, w3 in zip(*(ids.tolist() for ids in _unpack(keys, 3)))
+        ]
+
+    def marginals(self):
+        """
+        :return: the marginals of each trigram, as given to the measures of
+            `nltk.metrics.TrigramAssocMeasures`:
+            `n_iii, (n_iix, n_ixi, n_xii), (n_ixx, n_xix, n_xxi), n_xxx`.
+        """
+        w1, w2, w3 = _unpack(self.trigram_keys, 3)
+        n_iix = self.bigram_counts[np.searchsorted(self.bigram_keys, _pack(w1, w2))]
+        n_ixi = self.wildcard_counts[np.searchsorted(self.wildcard_keys, _pack(w1, w3))]
+        n_xii = self.bigram_counts[np.searchsorted(self.bigram_keys, _pack(w2, w3))]
+        return (
+            self.trigram_counts,
+            (n_iix, n_ixi, n_xii),
+            (self.word_counts[w1], self.word_counts[w2], self.word_counts[w3]),
+            self.word_count(),
+        )
+
+    def scores(self, measure: str) -> np.ndarray:
+        """
+        :param measure: one of `MEASURES`.
+        :return: the score of each trigram.
+        :rtype: numpy.ndarray
+        """
+        if measure not in MEASURES:
+            raise ValueError(f"Unknown measure {measure!r}, expected one of {MEASURES}")
+        n_iii, n_iix_tuple, n_ixx_tuple, n_xxx = self.marginals()
+        n_iii = n_iii.astype(np.float64)
+
+        if measure == "raw_freq":
+            return n_iii / n_xxx
+        if measure == "pmi":
+            unigram_product = (
+                n_ixx_tuple[0].astype(np.float64) * n_ixx_tuple[1] * n_ixx_tuple[2]
+            )
+            return np.log2(n_iii * float(n_xxx) ** 2) - np.log2(unigram_product)
+
+        contingency = _contingency(n_iii, n_iix_tuple, n_ixx_tuple, n_xxx)
+        expected = _expected_values(contingency, n_xxx)
+        return 2 * sum(
+            observed * np.log(observed / (expected_value + _SMALL) + _SMALL)
+            for observed, expected_value in zip(contingency, expected)
+        )
+
+    def nbest(self, measure: str, n: int) -> typing.List[typing.Tuple[str]]:
+        """
+        :return: the `n` best scored trigrams, ties broken by the trigram
+            words, selected without sorting every score.
+        :rtype: list(tuple(str))
+        """
+        scores = self.scores(measure)
+        if n < len(scores):
+            threshold = scores[np.argpartition(-scores, n - 1)[n - 1]]
+            candidates = np.flatnonzero(scores >= threshold)
+        else:
+            candidates = np.arange(len(scores))
+
+        ranked = sorted(
+            zip(self.ngrams(candidates), scores[candidates].tolist()),
+            key=lambda ngram_score: (-ngram_score[1], ngram_score[0]),
+        )
+        return [ngram for ngram, _ in ranked[:n]]
+
+    def ranks(self, measure: str, rank_gap=RANK_GAP) -> np.ndarray:
+        """
+        :return: the rank of each trigram by decreasing score, tied with the
+            previous one when their scores differ by less than `rank_gap`,
+            as `nltk.metrics.ranks_from_scores`.
+        :rtype: numpy.ndarray
+        """
+        scores = self.scores(measure)
+        order = np.argsort(-scores, kind="stable")
+        sorted_scores = scores[order]
+        rank_starts = np.zeros(len(scores), dtype=bool)
+        rank_starts[0:1] = True
+        rank_starts[1:] = np.abs(np.diff(sorted_scores)) > rank_gap
+        sorted_ranks = np.maximum.accumulate(
+            np.where(rank_starts, np.arange(len(scores)), 0)
+        )
+        ranks = np.empty(len(scores), dtype=np.int64)
+        ranks[order] = sorted_ranks
+        return ranks
+
+    def spearman_correlation(self, measure: str, other_measure: str) -> float:
+        """
+        :return: the Spearman correlation of the ranks of the trigrams by
+            the two measures.
+        :rtype: float
+        """
+        n = len(self)
+        if n < 2:
+            return 0.0
+        rank_differences = self.ranks(measure) - self.ranks(other_measure)
+        squares = float(np.dot(rank_differences, rank_differences))
+        return 1 - (6 * squares / (n * (n * n - 1)))
+
+
+def _contingency(n_iii, n_iix_tuple, n_ixx_tuple, n_xxx):
+    """
+    Contingency cube of each trigram, as
+    `nltk.metrics.TrigramAssocMeasures._contingency`.
+    """
+    n_iix, n_ixi, n_xii = n_iix_tuple
+    n_ixx, n_xix, n_xxi = n_ixx_tuple
+    n_oii = n_xii - n_iii
+    n_ioi = n_ixi - n_iii
+    n_iio = n_iix - n_iii
+    n_ooi = n_xxi - n_iii - n_oii - n_ioi
+    n_oio = n_xix - n_iii - n_oii - n_iio
+    n_ioo = n_ixx - n_iii - n_ioi - n_iio
+    n_ooo = n_xxx - n_iii - n_oii - n_ioi - n_iio - n_ooi - n_oio - n_ioo
+
+    return (n_iii, n_oii, n_ioi, n_ooi, n_iio, n_oio, n_ioo, n_ooo)
+
+
+def _expected_values(contingency, n_all):
+    """
+    Expected values of the contingency cells under independence, as
+    `nltk.metrics.NgramAssocMeasures._expected_values`.
+    """
+    bits = (1, 2, 4)
+    for cell in range(len(contingency)):
+        expected = 1.0
+        for bit in bits:
+            expected = expected * sum(
+                contingency[other]
+                for other in range(len(contingency))
+                if (other & bit) == (cell & bit)
+            )
+        yield expected / float(n_all) ** 2
@@ -1,20 +1,41 @@
+import math
 import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain
 from pathlib import Path
-from statistics import mean, median, stdev
-import pandas as pd
+import numpy as np
 
 from nltk import FreqDist
-from nltk.corpus import stopwords, words
-from nltk.stem import WordNetLemmatizer
 
-from hn_eda.story_corpus import CorpusReaderBase
+from hn_eda.encoded_corpus import EncodedCorpus
+from hn_eda.lemmatizer import default_lemma_cache
+from hn_eda.metric_state import (
+    UPPERCASE_SENTENCE_RE,
+    UPPERCASED_TOKEN_RE,
+    LengthStatistics,
+    MetricState,
+    title_hash,
+)
+from hn_eda.near_duplicates import NearDuplicates
+from hn_eda.stage_report import StageReport
+from hn_eda.story_corpus import CorpusReaderBase, StoryCorpusReader
+from hn_eda.tokenizers import StoryTokenizer
+from hn_eda.vocabulary import load_vocabulary
 
 ROOT = Path(__file__).parent
 
 
-def corpus_metric(name, formula, description="", order=0, decimal_round=0):
+def corpus_metric(name, formula, description="", order=0, decimal_round=0, requires=()):
+    """
+    :param requires: names of the intermediates of
+        `CorpusMetrics.INTERMEDIATES` the metric is computed from.
+    """
+
     def decorator(function):
         function.is_metric = True
+        function.requires = tuple(requires)
         function.name = name
         function.formula = formula
         function.decimal_round = decimal_round
@@ -26,18 +47,76 @@ def corpus_metric(name, formula, description="", order=0, decimal_round=0):
 
 
 class CorpusMetrics:
+    INTERMEDIATES = {
+        "titles": ("titles", ()),
+        "sentences": ("sentences", ()),
+        "title_features": ("title_features", ("titles",)),
+        "items": ("sentence_count", ("title_features",)),
+        "unique_items": ("unique_sentence_count", ("title_features",)),
+        "lengths": ("length_statistics", ("title_features",)),
+        "uppercase_sentences": ("uppercase_sentence_count", ("title_features",)),
+        "uppercased_tokens": ("uppercased_token_count", ("title_features",)),
+        "dictionary": ("token_counts", ("sentences",)),
+        "lemmas": ("_lemmatize_dictionary", ("dictionary",)),
+        "oov": ("_compute_oov", ("lemmas",)),
+        "near_duplicates": ("near_duplicate_labels", ("title_features",)),
+    }
+    """
+    Method computing each intermediate, None for the intermediates that are
+    computed on construction, and the intermediates it needs
+    """
+
     _dictionary = None
+    _token_counts = None
+    _lemmatized_words = None
+    _in_vocab_tokens = None
+    _out_of_vocab_tokens = None
+    _numerical_tokens = None
+    _title_features = None
+    _unique_title_features = None
     _unique_sentences = None
     _uppercase_sentences = None
     _sentence_lengths = None
+    _length_counts = None
+    _sentence_count = None
+    _unique_sentence_count = None
+    _uppercase_sentence_count = None
+    _uppercased_token_count = None
     _uppercased_tokens = None
+    _encoded_corpus = None
+    _dictionary_mask = None
+    _near_duplicate_signatures = None
+    _near_duplicate_labels = None
 
-    def __init__(self, corpus: CorpusReaderBase, item_name):
+    def __init__(
+        self,
+        corpus: CorpusReaderBase,
+        item_name,
+        lemma_cache=None,
+        report: StageReport = None,
+        near_duplicates: NearDuplicates = None,
+    ):
+        """
+        :param lemma_cache: cache of the dictionary lemmas, shared by the
+            process and persisted on disk by default.
+        :param report: report the time and memory of each intermediate and
+            metric computed by `values` are recorded into.
+        :param near_duplicates: near duplicate detection of the titles, with
+            its similarity threshold.
+        """
         self.corpus = corpus
         self.item_name = item_name
+        self._lemma_cache = lemma_cache
+        self.report = report
+        self.near_duplicates = near_duplicates or NearDuplicates()
+        self._appended_titles = []
+        self._appended_sentences = []
 
-        self._lemmatize_dictionary()
-        self._compute_oov()
+    @property
+    def lemma_cache(self):
+        if self._lemma_cache is None:
+            self._lemma_cache = default_lemma_cache()
+        return self._lemma_cache
 
     def unique_sentences(self):
         """
@@ -46,95 +125,490 @@ class CorpusMetrics:
         :rtype: list(list(str))
         """
         if self._unique_sentences == None:
-            self._unique_sentences = set(self.corpus.titles())
+            self._unique_sentences = set(self.titles())
         return self._unique_sentences
 
-    def uppercase_sentences(self):
-        if self._uppercase_sentences == None:
-            regex_pattern = r"^[^a-z]*$"
-            self._uppercase_sentences = [
-                sentence
-                for sentence in self.unique_sentences()
-                if re.match(regex_pattern, sentence) is not None
+    def titles(self):
+        """
+        :return: the title of every item, as read by the corpus reader,
+            followed by the titles added by `update`.
+        :rtype: list(str)
+        """
+        titles = self.corpus.titles()
+        if self._appended_titles:
+            titles = titles + self._appended_titles
+        return titles
+
+    def sentences(self):
+        """
+        :return: the tokens of every item, as tokenized by the corpus reader,
+            followed by those of the titles added by `update`.
+        :rtype: list(tuple(str))
+        """
+        sentences = self.corpus.sentences()
+        if self._appended_sentences:
+            sentences = sentences + self._appended_sentences
+        return sentences
+
+    def title_features(self):
+        """
+        Features of every item title, computed in one batch: its length,
+        whether it is uppercase, its number of uppercased tokens, and
+        whether it duplicates an earlier title.
+
+        :return: a table with one row per item.
+        :rtype: pandas.DataFrame
+        """
+        if self._title_features is None:
+            self._title_features = _title_feature_table(self.titles())
+        return self._title_features
+
+    def unique_title_features(self):
+        """
+        :return: the rows of the first occurrence of each title.
+        :rtype: pandas.DataFrame
+        """
+        if self._unique_title_features is None:
+            title_features = self.title_features()
+            self._unique_title_features = title_features[
+                ~title_features["is_duplicate"]
             ]
+        return self._unique_title_features
+
+    def uppercase_sentences(self):
+        if self._uppercase_sentences is None:
+            unique_title_features = self.unique_title_features()
+            self._uppercase_sentences = unique_title_features["title"][
+                unique_title_features["is_uppercase"]
+            ].tolist()
         return self._uppercase_sentences
 
     def sentence_lengths(self):
-        if self._sentence_lengths == None:
-            self._sentence_lengths = [
-                len(sentence_tokens) for sentence_tokens in self.unique_sentences()
-            ]
+        """
+        :return: the length of each unique item.
+        :rtype: numpy.ndarray
+        """
+        if self._sentence_lengths is None:
+            self._sentence_lengths = self.unique_title_features()["length"].to_numpy(
+                dtype=np.int64
+            )
         return self._sentence_lengths
 
-    def dictionary(self):
-        if self._dictionary == None:
-            stop_words = set(stopwords.words("english"))
+    def length_counts(self):
+        """
+        :return: the number of unique items of each length.
+        :rtype: numpy.ndarray
+        """
+        if self._length_counts is None:
+            self._length_counts = np.bincount(self.sentence_lengths())
+        return self._length_counts
 
-            meaningful_words = [
-                word
-                for word in self.corpus.words()
-                if word.casefold() not in stop_words
-            ]
+    def sentence_count(self):
+        if self._sentence_count is None:
+            self._sentence_count = len(self.title_features())
+        return self._sentence_count
+
+    def unique_sentence_count(self):
+        if self._unique_sentence_count is None:
+            self._unique_sentence_count = int(
+                (~self.title_features()["is_duplicate"]).sum()
+            )
+        return self._unique_sentence_count
+
+    def uppercase_sentence_count(self):
+        if self._uppercase_sentence_count is None:
+            self._uppercase_sentence_count = int(
+                self.unique_title_features()["is_uppercase"].sum()
+            )
+        return self._uppercase_sentence_count
+
+    def uppercased_token_count(self):
+        if self._uppercased_token_count is None:
+            self._uppercased_token_count = int(
+                self.unique_title_features()["uppercased_token_count"].sum()
+            )
+        return self._uppercased_token_count
+
+    def length_statistics(self):
+        """
+        :return: the statistics of the lengths of the unique items, from
+            their histogram.
+        :rtype: LengthStatistics
+        """
+        length_counts = self.length_counts()
+        lengths = np.arange(len(length_counts))
+        count = int(length_counts.sum())
+        total = int(length_counts @ lengths)
+        square_total = int(length_counts @ lengths**2)
+        # Exact integer variance, rounded once
+        std = (
+            math.sqrt((count * square_total - total * total) / (count * (count - 1)))
+            if count > 1
+            else math.nan
+        )
+
+        cumulative_counts = np.cumsum(length_counts)
+        middle = count // 2
+        upper = int(np.searchsorted(cumulative_counts, middle, side="right"))
+        if count % 2:
+            median = upper
+        else:
+            lower = int(np.searchsorted(cumulative_counts, middle - 1, side="right"))
+            median = (lower + upper) / 2
+
+        present_lengths = np.flatnonzero(length_counts)
+        return LengthStatistics(
+            count=count,
+            mean=total / count,
+            std=std,
+            minimum=int(present_lengths[0]),
+            maximum=int(present_lengths[-1]),
+            median=median,
+        )
+
+    def near_duplicate_labels(self):
+        """
+        :return: the label of the near duplicate cluster of each unique
+            title.
+        :rtype: numpy.ndarray
+        """
+        if self._near_duplicate_labels is None:
+            digests, signatures = self.near_duplicate_signatures()
+            self._near_duplicate_labels = self.near_duplicates.labels(
+                signatures, keys=digests
+            )
+        return self._near_duplicate_labels
+
+    def near_duplicate_signatures(self):
+        """
+        :return: the hash of each unique title and its MinHash signature.
+        :rtype: tuple(numpy.ndarray, numpy.ndarray)
+        """
+        if self._near_duplicate_signatures is None:
+            titles = self.unique_title_features()["title"].tolist()
+            self._near_duplicate_signatures = self._title_signatures(titles)
+        return self._near_duplicate_signatures
 
-            self._dictionary = FreqDist(meaningful_words)
+    def _title_signatures(self, titles):
+        digests = np.fromiter(map(title_hash, titles), dtype=np.uint64)
+        return digests, self.near_duplicates.signatures(titles)
+
+    def near_duplicate_clusters(self):
+        """
+        :return: the items of each cluster of near duplicate titles, exact
+            duplicates included.
+        :rtype: list(list(int))
+        """
+        return self.near_duplicates.clusters(self.titles())
+
+    def encoded_corpus(self):
+        """
+        :return: the integer encoded tokens of the corpus items.
+        :rtype: EncodedCorpus
+        """
+        if self._encoded_corpus is None:
+            self._encoded_corpus = EncodedCorpus.from_sentences(self.sentences())
+        return self._encoded_corpus
+
+    def dictionary_mask(self):
+        """
+        :return: a boolean array, indexed by token id, of the tokens that
+            are not stop words.
+        :rtype: numpy.ndarray
+        """
+        if self._dictionary_mask is None:
+            stop_words = load_vocabulary().stop_words
+            self._dictionary_mask = self.encoded_corpus().token_mask(
+                lambda token: token.casefold() not in stop_words
+            )
+        return self._dictionary_mask
+
+    def token_counts(self):
+        """
+        :return: the number of occurrences of each dictionary token.
+        :rtype: numpy.ndarray
+        """
+        if self._token_counts is None:
+            self._token_counts = self.encoded_corpus().counts()[self.dictionary_mask()]
+        return self._token_counts
+
+    def dictionary_tokens(self):
+        """
+        :return: the tokens that are not stop words, in the order of
+            `token_counts`.
+        :rtype: list(str)
+        """
+        return [
+            token
+            for token, is_meaningful in zip(
+                self.encoded_corpus().tokens(), self.dictionary_mask()
+            )
+            if is_meaningful
+        ]
+
+    def dictionary(self):
+        """
+        :return: the frequency of each dictionary token, built on first use
+            from `token_counts`.
+        :rtype: FreqDist
+        """
+        if self._dictionary == None:
+            self._dictionary = FreqDist(
+                dict(zip(self.dictionary_tokens(), self.token_counts().tolist()))
+            )
         return self._dictionary
 
     def _lemmatize_dictionary(self):
-        lemmatizer = WordNetLemmatizer()
-        self.lemmatized_words = set()
-        for word in self.dictionary().keys():
-            casefold_lemme = lemmatizer.lemmatize(word.casefold(), pos="n")
-            if casefold_lemme.casefold() != word.casefold():
-                self.lemmatized_words.add(casefold_lemme)
-                continue
-
-            casefoldv_lemme = lemmatizer.lemmatize(word.casefold(), pos="v")
-            self.lemmatized_words.add(casefoldv_lemme)
+        if self._lemmatized_words is None:
+            self._lemmatized_words = self.lemma_cache.lemmatize_words(
+                self.dictionary_tokens()
+            )
+            self.lemma_cache.save()
+        return self._lemmatized_words
 
     def _compute_oov(self):
+        if self._in_vocab_tokens is not None:
+            return
+        self._out_of_vocab_tokens = set()
+        self._numerical_tokens = list()
+        self._in_vocab_tokens = set()
+        self._classify_lemmas(self.lemmatized_words)
+
+    def _classify_lemmas(self, lemmas):
+        """
+        Add the lemmas to the in vocabulary, numerical or out of vocabulary
+        tokens.
+        """
         numerical_regex_pattern = r"^(([0-9]*)|(([0-9]*)[\.,]([0-9]*)))$"
-        self.in_vocab_tokens = set()
-        self.out_of_vocab_tokens = set()
-        self.numerical_tokens = list()
-        self.nltk_words = set(word.lower() for word in words.words())
-
-        for token in self.lemmatized_words:
-            if token.lower() in self.nltk_words:
-                self.in_vocab_tokens.add(token)
+        nltk_words = self.nltk_words
+
+        for token in lemmas:
+            if token.lower() in nltk_words:
+                self._in_vocab_tokens.add(token)
             elif re.match(numerical_regex_pattern, token) is not None:
-                self.numerical_tokens.append(token)
+                self._numerical_tokens.append(token)
             else:
-                self.out_of_vocab_tokens.add(token)
+                self._out_of_vocab_tokens.add(token)
 
-    def uppercased_tokens(self):
-        if self._uppercased_tokens == None:
-            self._uppercased_tokens = []
-            for sentence in self.unique_sentences():
-                if sentence in self.uppercase_sentences():
-                    continue
+    @property
+    def lemmatized_words(self):
+        """
+        :return: the lemmas of the dictionary, looked up on first access.
+        :rtype: set(str)
+        """
+        self._lemmatize_dictionary()
+        return self._lemmatized_words
+
+    @property
+    def nltk_words(self):
+        return load_vocabulary().words
+
+    @property
+    def in_vocab_tokens(self):
+        self._compute_oov()
+        return self._in_vocab_tokens
+
+    @property
+    def out_of_vocab_tokens(self):
+        self._compute_oov()
+        return self._out_of_vocab_tokens
 
-                tokens = re.findall(r"[A-Z]{2,}", sentence)
-                self._uppercased_tokens += tokens
+    @property
+    def numerical_tokens(self):
+        self._compute_oov()
+        return self._numerical_tokens
 
+    def uppercased_tokens(self):
+        """
+        :return: the uppercased tokens of the unique titles that are not
+            uppercase as a whole.
+        :rtype: list(str)
+        """
+        if self._uppercased_tokens is None:
+            unique_title_features = self.unique_title_features()
+            titles = unique_title_features["title"][
+                ~unique_title_features["is_uppercase"]
+            ]
+            self._uppercased_tokens = list(
+                chain.from_iterable(titles.str.findall(UPPERCASED_TOKEN_RE.pattern))
+            )
         return self._uppercased_tokens
 
+    def update(self, new_stories, tokenizer=None):
+        """
+        Append new stories to the corpus. The intermediates computed so far
+        are updated with the delta of the new stories instead of being
+        recomputed: only the tokens new to the vocabulary are lemmatized
+        and classified. The metrics are then those of the whole corpus.
+
+        :param new_stories: the stories appended to the corpus.
+        :param tokenizer: tokenizer of the new titles, the one of the corpus
+            reader by default.
+        :return: this instance.
+        :rtype: CorpusMetrics
+        """
+        tokenizer = tokenizer or self.corpus.word_tokenizer
+        new_titles = [story["title"] for story in new_stories]
+        new_sentences = [
+            tuple(tokens) for tokens in tokenizer.tokenize_sents(new_titles)
+        ]
+
+        unique_titles = self.unique_sentences()
+        is_duplicate = []
+        for title in new_titles:
+            is_duplicate.append(title in unique_titles)
+            unique_titles.add(title)
+
+        self._update_title_intermediates(new_titles, is_duplicate)
+        self._appended_titles.extend(new_titles)
+        self._appended_sentences.extend(new_sentences)
+        self._update_token_intermediates(new_sentences)
+        return self
+
+    def _update_title_intermediates(self, new_titles, is_duplicate):
+        import pandas as pd
+
+        new_unique_titles = [
+            title
+            for title, is_duplicate_title in zip(new_titles, is_duplicate)
+            if not is_duplicate_title
+        ]
+        if self._title_features is not None:
+            new_title_features = _title_feature_table(
+                new_titles, is_duplicate, start=len(self._title_features)
+            )
+            self._title_features = pd.concat([self._title_features, new_title_features])
+            if self._unique_title_features is not None:
+                self._unique_title_features = pd.concat(
+                    [
+                        self._unique_title_features,
+                        new_title_features[~new_title_features["is_duplicate"]],
+                    ]
+                )
+        else:
+            self._unique_title_features = None
+        # Recomputed from the unique titles if needed again
+        self._sentence_lengths = None
+        self._near_duplicate_labels = None
+
+        if self._sentence_count is not None:
+            self._sentence_count += len(new_titles)
+        if self._unique_sentence_count is not None:
+            self._unique_sentence_count += len(new_unique_titles)
+
+        uppercase_titles = []
+        uppercased_tokens = []
+        for title in new_unique_titles:
+            if UPPERCASE_SENTENCE_RE.match(title) is not None:
+                uppercase_titles.append(title)
+            else:
+                uppercased_tokens.extend(UPPERCASED_TOKEN_RE.findall(title))
+        if self._uppercase_sentences is not None:
+            self._uppercase_sentences.extend(uppercase_titles)
+        if self._uppercase_sentence_count is not None:
+            self._uppercase_sentence_count += len(uppercase_titles)
+        if self._uppercased_tokens is not None:
+            self._uppercased_tokens.extend(uppercased_tokens)
+        if self._uppercased_token_count is not None:
+            self._uppercased_token_count += len(uppercased_tokens)
+
+        if self._length_counts is not None:
+            length_counts = np.bincount(
+                np.fromiter(map(len, new_unique_titles), dtype=np.int64),
+                minlength=len(self._length_counts),
+            )
+            length_counts[: len(self._length_counts)] += self._length_counts
+            self._length_counts = length_counts
+
+        if self._near_duplicate_signatures is not None:
+            digests, signatures = self._near_duplicate_signatures
+            new_digests, new_signatures = self._title_signatures(new_unique_titles)
+            self._near_duplicate_signatures = (
+                np.concatenate([digests, new_digests]),
+                np.concatenate([signatures, new_signatures]),
+            )
+
+    def _update_token_intermediates(self, new_sentences):
+        # The dictionary, lemmas and vocabulary classes derive from the
+        # encoded corpus, in that order
+        if self._encoded_corpus is None:
+            return
+        vocabulary = self._encoded_corpus.vocabulary
+        new_tokens = list(
+            dict.fromkeys(
+                token
+                for sentence in new_sentences
+                for token in sentence
+                if token not in vocabulary
+            )
+        )
+        new_token_ids = self._encoded_corpus.extend(new_sentences)
+
+        if self._dictionary_mask is None:
+            return
+        stop_words = load_vocabulary().stop_words
+        new_mask = np.fromiter(
+            (token.casefold() not in stop_words for token in new_tokens),
+            dtype=bool,
+            count=len(new_tokens),
+        )
+        self._dictionary_mask = np.concatenate([self._dictionary_mask, new_mask])
+        new_dictionary_tokens = [
+            token for token, is_meaningful in zip(new_tokens, new_mask) if is_meaningful
+        ]
+
+        if self._token_counts is not None:
+            self._token_counts = np.concatenate(
+                [
+                    self._token_counts,
+                    np.zeros(
+                        len(new_dictionary_tokens), dtype=self._token_counts.dtype
+                    ),
+                ]
+            )
+            self._token_counts += np.bincount(
+                new_token_ids, minlength=len(self._dictionary_mask)
+            )[self._dictionary_mask]
+        if self._dictionary is not None:
+            self._dictionary.update(
+                Counter(
+                    token
+                    for sentence in new_sentences
+                    for token in sentence
+                    if self._dictionary_mask[vocabulary[token]]
+                )
+            )
+
+        if self._lemmatized_words is None:
+            return
+        new_lemmas = (
+            self.lemma_cache.lemmatize_words(new_dictionary_tokens)
+            - self._lemmatized_words
+        )
+        self.lemma_cache.save()
+        self._lemmatized_words |= new_lemmas
+        if self._in_vocab_tokens is not None:
+            self._classify_lemmas(new_lemmas)
+
     @corpus_metric(
         order=0,
         name="Count",
         description="Number of {}",
         formula="\\vert \mathcal{O} \\vert",
+        requires=("items",),
     )
     def item_count(self):
-        return len(self.corpus.sentences())
+        return self.sentence_count()
 
     @corpus_metric(
         order=1,
         name="Unique count",
         description="Number of unique {}",
         formula="\\vert \mathcal{O}_{unique} \\vert",
+        requires=("unique_items",),
     )
     def unique_item_count(self):
-        return len(self.unique_sentences())
+        return self.unique_sentence_count()
 
     @corpus_metric(
         order=2,
@@ -142,24 +616,27 @@ class CorpusMetrics:
         name="Token count",
         formula="\\vert \mathcal{T} \\vert",
         decimal_round=4,
+        requires=("dictionary",),
     )
     def token_count(self):
-        return self.dictionary().N()
+        return int(self.token_counts().sum())
 
     @corpus_metric(
         order=3,
         description="Total number of unique tokens",
         name="Dictionary length",
         formula="\\vert \mathcal{D} \\vert",
+        requires=("dictionary",),
     )
     def dictionary_length(self):
-        return len(self.dictionary())
+        return int(np.count_nonzero(self.token_counts()))
 
     @corpus_metric(
         order=4,
         description="Total number of unique lemmetized tokens",
         name="Lem dictionary length",
         formula="\\vert \mathcal{D}_{lemme} \\vert",
+        requires=("lemmas",),
     )
     def alpha_num_dictionary_length(self):
         return len(self.lemmatized_words)
@@ -169,6 +646,7 @@ class CorpusMetrics:
         description="Total number of unique alpha lemmetized tokens",
         name="Alpha lem dictionary length",
         formula="\\vert \mathcal{D}_{\\alpha-lemme} \\vert",
+        requires=("oov",),
     )
     def alpha_dictionary_length(self):
         return len(self.out_of_vocab_tokens) + len(self.in_vocab_tokens)
@@ -179,18 +657,21 @@ class CorpusMetrics:
         name="Average length",
         formula="\\bar{M_i}",
         decimal_round=2,
+        requires=("lengths",),
     )
     def average_item_length(self):
-        return mean(self.sentence_lengths())
+        return self.length_statistics().mean
 
     @corpus_metric(
         order=7,
         description="Minimum and maximum number of tokens",
         name="Min and Max length",
         formula="\{ min(M_i), max(M_i) \}",
+        requires=("lengths",),
     )
     def extremum_item_length(self):
-        return min(self.sentence_lengths()), max(self.sentence_lengths())
+        length_statistics = self.length_statistics()
+        return length_statistics.minimum, length_statistics.maximum
 
     @corpus_metric(
         order=8,
@@ -198,9 +679,10 @@ class CorpusMetrics:
         name="Median length",
         formula="\\tilde{M_i}",
         decimal_round=2,
+        requires=("lengths",),
     )
     def median_item_length(self):
-        return median(self.sentence_lengths())
+        return self.length_statistics().median
 
     @corpus_metric(
         order=9,
@@ -208,9 +690,10 @@ class CorpusMetrics:
         name="Std length",
         formula="s_{M_i}",
         decimal_round=2,
+        requires=("lengths",),
     )
     def std_item_length(self):
-        return stdev(self.sentence_lengths())
+        return self.length_statistics().std
 
     @corpus_metric(
         order=10,
@@ -218,6 +701,7 @@ class CorpusMetrics:
         name="Duplicate proportion",
         formula="\\vert \mathcal{O} \\vert - \\vert \mathcal{O}_{unique} \\vert \over \\vert \mathcal{O} \\vert",
         decimal_round=4,
+        requires=("items", "unique_items"),
     )
     def duplicate_proportion(self):
         return (self.item_count() - self.unique_item_count()) / self.item_count()
@@ -228,12 +712,12 @@ class CorpusMetrics:
         name="Numerical frequency",
         formula="\\vert \mathcal{T}_{numerical} \\vert \over \\vert \mathcal{T} \\vert",
         decimal_round=4,
+        requires=("dictionary", "oov"),
     )
     def numerical_frequency(self):
-        numerical_frequencies = [
-            self.dictionary().freq(token) for token in self.numerical_tokens
-        ]
-        return sum(numerical_frequencies)
+        dictionary = self.dictionary()
+        numerical_count = sum(dictionary[token] for token in self.numerical_tokens)
+        return numerical_count / self.token_count()
 
     @corpus_metric(
         order=12,
@@ -241,6 +725,7 @@ class CorpusMetrics:
         name="Numerical proportion",
         formula="\\vert \mathcal{D}_{numerical} \\vert \over \\vert \mathcal{D}_{lemme} \\vert",
         decimal_round=4,
+        requires=("lemmas", "oov"),
     )
     def numerical_proportion(self):
         return len(self.numerical_tokens) / self.alpha_num_dictionary_length()
@@ -251,6 +736,7 @@ class CorpusMetrics:
         name="In vocabulary",
         formula="\\vert \mathcal{D}_{\\alpha-lemme} \cap \mathcal{D}_{NLTK} \\vert \over \\vert \mathcal{D}_{\\alpha-lemme} \\vert",
         decimal_round=4,
+        requires=("oov",),
     )
     def in_vocabulary_proportion(self):
         return len(self.in_vocab_tokens) / self.alpha_dictionary_length()
@@ -261,6 +747,7 @@ class CorpusMetrics:
         name="Out of vocabulary",
         formula="$\\vert \mathcal{D}_{\\alpha-lemme} \\vert - \\vert \mathcal{D}_{\\alpha-lemme} \cap \mathcal{D}_{NLTK} \\vert \over \\vert \mathcal{D}_{\\alpha-lemme} \\vert$",
         decimal_round=4,
+        requires=("oov",),
     )
     def out_of_vocabulary_proportion(self):
         return len(self.out_of_vocab_tokens) / self.alpha_dictionary_length()
@@ -271,9 +758,10 @@ class CorpusMetrics:
         name="Lexical diversity",
         formula="\\vert \mathcal{D} \\vert \over \\vert \mathcal{T} \\vert",
         decimal_round=4,
+        requires=("dictionary",),
     )
     def lexical_diversity(self):
-        return self.dictionary_length() / self.dictionary().N()
+        return self.dictionary_length() / self.token_count()
 
     @corpus_metric(
         order=16,
@@ -281,9 +769,11 @@ class CorpusMetrics:
         name="Hapaxes",
         formula="\\vert \mathcal{D}_{hapax} \\vert \over \\vert \mathcal{D} \\vert",
         decimal_round=4,
+        requires=("dictionary",),
     )
     def hapaxes_proportion(self):
-        return len(self.dictionary().hapaxes()) / self.dictionary_length()
+        hapax_count = np.count_nonzero(self.token_counts() == 1)
+        return int(hapax_count) / self.dictionary_length()
 
     @corpus_metric(
         order=17,
@@ -291,9 +781,10 @@ class CorpusMetrics:
         name="Uppercase items",
         formula="\\vert \\mathcal{O}_{upper} \\vert \over \\vert \\mathcal{O} \\vert",
         decimal_round=4,
+        requires=("uppercase_sentences", "unique_items"),
     )
     def uppercase_item_proportion(self):
-        return len(self.uppercase_sentences()) / self.unique_item_count()
+        return self.uppercase_sentence_count() / self.unique_item_count()
 
     @corpus_metric(
         order=18,
@@ -301,18 +792,97 @@ class CorpusMetrics:
         name="Uppercased token proportion",
         formula="\\vert \mathcal{T}_{uppercase} \\vert \over \\vert \mathcal{T} \\vert",
         decimal_round=4,
+        requires=("uppercased_tokens", "dictionary"),
     )
     def uppercase_token_proportion(self):
-        return len(self.uppercased_tokens()) / self.dictionary().N()
+        return self.uppercased_token_count() / self.token_count()
+
+    @corpus_metric(
+        order=19,
+        description="Proportion of {} that are near duplicates of another",
+        name="Near duplicate proportion",
+        formula=r"\vert \mathcal{O} \vert - \vert \mathcal{C}_{near} \vert \over \vert \mathcal{O} \vert",
+        decimal_round=4,
+        requires=("items", "near_duplicates"),
+    )
+    def near_duplicate_proportion(self):
+        cluster_count = len(np.unique(self.near_duplicate_labels()))
+        return (self.item_count() - cluster_count) / self.item_count()
 
-    def values(self):
-        metrics = [
-            getattr(self, method)
-            for method in dir(self)
-            if hasattr(getattr(self, method), "is_metric")
+    def metrics(self, names=None):
+        """
+        :param names: names of the metric methods, every metric by default.
+        :return: the bound metric methods, in order.
+        :rtype: list
+        """
+        # Looked up on the class, so that the lazy properties are not computed
+        metric_names = [
+            method
+            for method in dir(type(self))
+            if getattr(getattr(type(self), method), "is_metric", False)
         ]
+        if names is not None:
+            unknown_names = set(names) - set(metric_names)
+            if unknown_names:
+                raise ValueError(f"Unknown metrics: {sorted(unknown_names)}")
+            metric_names = [method for method in metric_names if method in names]
 
+        metrics = [getattr(self, method) for method in metric_names]
         metrics.sort(key=lambda x: x.order)
+        return metrics
+
+    def required_intermediates(self, metrics):
+        """
+        :param metrics: metric methods.
+        :return: the names of the intermediates the metrics depend on, each
+            one after its own dependencies.
+        :rtype: list(str)
+        """
+        intermediates = []
+
+        def visit(name):
+            if name in intermediates:
+                return
+            for dependency in self.INTERMEDIATES[name][1]:
+                visit(dependency)
+            intermediates.append(name)
+
+        for metric in metrics:
+            for name in metric.requires:
+                visit(name)
+        return intermediates
+
+    def compute_intermediates(self, names):
+        """
+        Compute the intermediates, in the given order; each one is computed
+        once and kept.
+        """
+        for name in names:
+            method_name = self.INTERMEDIATES[name][0]
+            if method_name is None:
+                continue
+            if self.report is None:
+                getattr(self, method_name)()
+            else:
+                self.report.measure(name, "intermediate", getattr(self, method_name))
+
+    def _metric_value(self, metric):
+        if self.report is None:
+            return metric()
+        return self.report.measure(metric.__name__, "metric", metric)
+
+    def values(self, metrics=None):
+        """
+        :param metrics: names of the metric methods to compute, such as
+            `["item_count", "average_item_length"]`; every metric by default.
+            Only the intermediates these metrics depend on are computed.
+        :return: the name, formula, value and description of each metric.
+        :rtype: pandas.DataFrame
+        """
+        import pandas as pd
+
+        metrics = self.metrics(metrics)
+        self.compute_intermediates(self.required_intermediates(metrics))
 
         metric_names = []
         metric_formulas = []
@@ -323,12 +893,227 @@ class CorpusMetrics:
             metric_descriptions.append(metric.description.format(self.item_name))
             metric_formulas.append(f"${metric.formula}$")
             if metric.decimal_round > 0:
-                metric_values.append(round(metric(), metric.decimal_round))
+                metric_values.append(
+                    round(self._metric_value(metric), metric.decimal_round)
+                )
             else:
-                metric_values.append(metric())
+                metric_values.append(self._metric_value(metric))
 
         readme_df = pd.DataFrame(
             data=[metric_names, metric_formulas, metric_values, metric_descriptions],
             index=["Name", "Formula", "Value", "Description"],
         )
         return readme_df.transpose()
+
+
+class StreamingCorpusMetrics(CorpusMetrics):
+    r"""
+    Corpus metrics computed in a single pass over an iterator of titles,
+    from the online accumulators of a `MetricState`, so that corpora
+    larger than memory can be measured.
+
+        >>> titles = (story["title"] for story in StoryCorpusReader().docs())
+        >>> StreamingCorpusMetrics(titles, item_name="title").values()
+    """
+
+    INTERMEDIATES = {
+        **CorpusMetrics.INTERMEDIATES,
+        # The titles are read, tokenized and accumulated into the state
+        "titles": (None, ()),
+        "sentences": (None, ()),
+        "title_features": (None, ()),
+    }
+
+    def __init__(
+        self,
+        titles,
+        item_name,
+        tokenizer=StoryTokenizer(),
+        state=None,
+        lemma_cache=None,
+        report=None,
+        near_duplicates=None,
+        sign_titles=True,
+    ):
+        """
+        :param titles: iterable of titles, consumed once.
+        :param tokenizer: tokenizer of the titles.
+        :param state: state the titles are added to, such as the merged
+            states of several shards.
+        :param near_duplicates: near duplicate detection of a new state.
+        :param sign_titles: sign the titles of a new state, without which
+            the near duplicate metric is left out.
+        """
+        if state is None:
+            state = MetricState(near_duplicates, sign_titles=sign_titles)
+
+        def add_titles():
+            for title in titles:
+                state.add(title, tokenizer.tokenize(title))
+            return state.titles
+
+        if report is None:
+            add_titles()
+        else:
+            report.measure("state", "intermediate", add_titles)
+
+        self.state = state
+        self.tokenizer = tokenizer
+        CorpusMetrics.__init__(
+            self,
+            corpus=None,
+            item_name=item_name,
+            lemma_cache=lemma_cache,
+            report=report,
+            near_duplicates=state.near_duplicates,
+        )
+
+    @classmethod
+    def from_state(cls, state: MetricState, item_name):
+        """
+        :rtype: StreamingCorpusMetrics
+        """
+        return cls((), item_name, state=state)
+
+    def metrics(self, names=None):
+        """
+        :raises ValueError: if a near duplicate metric is named while the
+            titles of the state are not signed.
+        """
+        metrics = CorpusMetrics.metrics(self, names)
+        if self.state.sign_titles:
+            return metrics
+        unsigned_metrics = [
+            metric for metric in metrics if "near_duplicates" in metric.requires
+        ]
+        if names is not None and unsigned_metrics:
+            raise ValueError(
+                "The titles of the state are not signed: "
+                f"{[metric.__name__ for metric in unsigned_metrics]} are unknown"
+            )
+        return [metric for metric in metrics if metric not in unsigned_metrics]
+
+    def update(self, new_stories, tokenizer=None):
+        """
+        Add the titles of new stories to the state. The values derived from
+        the state are computed again from it when next needed.
+
+        :param new_stories: the stories appended to the corpus.
+        :param tokenizer: tokenizer of the new titles, the one of the
+            streamed titles by default.
+        :return: this instance.
+        :rtype: StreamingCorpusMetrics
+        """
+        tokenizer = tokenizer or self.tokenizer
+        for story in new_stories:
+            self.state.add(story["title"], tokenizer.tokenize(story["title"]))
+
+        self._near_duplicate_labels = None
+        self._dictionary = None
+        self._token_counts = None
+        self._lemmatized_words = None
+        self._in_vocab_tokens = None
+        self._out_of_vocab_tokens = None
+        self._numerical_tokens = None
+        return self
+
+    def sentence_count(self):
+        return self.state.item_count
+
+    def unique_sentence_count(self):
+        return self.state.unique_item_count()
+
+    def uppercase_sentence_count(self):
+        return self.state.uppercase_item_count
+
+    def uppercased_token_count(self):
+        return self.state.uppercased_token_count
+
+    def length_statistics(self):
+        return self.state.length_statistics()
+
+    def near_duplicate_labels(self):
+        if self._near_duplicate_labels is None:
+            self._near_duplicate_labels = self.state.near_duplicate_labels()
+        return self._near_duplicate_labels
+
+    def token_counts(self):
+        if self._token_counts is None:
+            self._token_counts = np.fromiter(self.dictionary().values(), dtype=np.int64)
+        return self._token_counts
+
+    def dictionary_tokens(self):
+        return list(self.dictionary())
+
+    def dictionary(self):
+        if self._dictionary is None:
+            stop_words = load_vocabulary().stop_words
+            self._dictionary = FreqDist(
+                {
+                    token: count
+                    for token, count in self.state.token_counts.items()
+                    if token.casefold() not in stop_words
+                }
+            )
+        return self._dictionary
+
+
+def _title_feature_table(titles, is_duplicate=None, start=0):
+    """
+    :param is_duplicate: whether each title duplicates an earlier one,
+        found among the titles by default.
+    :param start: index of the first row.
+    :rtype: pandas.DataFrame
+    """
+    import pandas as pd
+
+    titles = pd.Series(
+        titles, index=pd.RangeIndex(start, start + len(titles)), dtype=object
+    )
+    is_uppercase = titles.str.match(UPPERCASE_SENTENCE_RE.pattern)
+    uppercased_token_counts = titles.str.count(UPPERCASED_TOKEN_RE.pattern)
+    return pd.DataFrame(
+        {
+            "title": titles,
+            "length": titles.str.len(),
+            "is_uppercase": is_uppercase,
+            "uppercased_token_count": uppercased_token_counts.where(~is_uppercase, 0),
+            "is_duplicate": (
+                titles.duplicated() if is_duplicate is None else is_duplicate
+            ),
+        }
+    )
+
+
+def file_metric_state(path, tokenizer=StoryTokenizer(), sign_titles=True):
+    """
+    :return: the metric state of the titles of one JSONL file.
+    :rtype: MetricState
+    """
+    story_corpus = StoryCorpusReader(word_tokenizer=tokenizer, path=path)
+    return MetricState.from_titles(
+        story_corpus.iter_titles(), tokenizer, sign_titles=sign_titles
+    )
+
+
+def sharded_corpus_metrics(
+    paths, item_name, tokenizer=StoryTokenizer(), workers=None, sign_titles=True
+):
+    """
+    Map the files to metric states across a process pool, and reduce them
+    into the metrics of the whole corpus.
+
+    :param paths: paths of the JSONL files, one shard each.
+    :param workers: number of processes, one per CPU by default.
+    :param sign_titles: sign the titles of the states, for the near
+        duplicate metric.
+    :rtype: StreamingCorpusMetrics
+    """
+    state = MetricState(sign_titles=sign_titles)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for file_state in executor.map(
+            partial(file_metric_state, tokenizer=tokenizer, sign_titles=sign_titles),
+            paths,
+        ):
+            state.merge(file_state)
+    return StreamingCorpusMetrics.from_state(state, item_name)
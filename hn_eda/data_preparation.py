@@ -1,55 +1,153 @@
-import json
+import os
+import typing
 from pathlib import Path
 
-import pandas as pd
-import requests
-from tqdm import tqdm
+from hn_eda.item_store import ItemStore
+from hn_eda.jsonl_writer import JsonlWriter
+
+if typing.TYPE_CHECKING:
+    from hn_eda.hn_client import HackerNewsClient
 
 ROOT = Path(__file__)
 
 TOPSTORIES_NAME = "hn_topstories"
 TOPSTORIES_ZIP = ROOT.parent / f"{TOPSTORIES_NAME}.zip"
 TOPSTORIES_JSONL = TOPSTORIES_ZIP / f"{TOPSTORIES_NAME}.jsonl"
+TOPSTORIES_PARQUET = ROOT.parent / f"{TOPSTORIES_NAME}.parquet"
+ITEMS_DB = ROOT.parent / "hn_items.sqlite"
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "hn_eda"
+"""User cache directory, as the package directory may not be writable"""
+
+ITEM_MAX_AGE = 24 * 60 * 60
+"""Age in seconds after which a cached item is fetched again"""
+
+
+def iter_items(
+    client: "HackerNewsClient",
+    item_ids,
+    store: ItemStore = None,
+    max_age: float = ITEM_MAX_AGE,
+    batch_size: int = 500,
+):
+    """
+    Fetch the items, querying the API only for the ids missing from `store`
+    or stored more than `max_age` seconds ago.
+
+    :param batch_size: number of ids looked up and cached at once.
+    :return: an iterator over the items, in the order of `item_ids`.
+    :rtype: iter(dict)
+    """
+    if store is None:
+        yield from client.iter_items(item_ids)
+        return
+
+    item_ids = list(item_ids)
+    for start in range(0, len(item_ids), batch_size):
+        batch_ids = item_ids[start : start + batch_size]
+        stale_ids = store.stale_ids(batch_ids, max_age=max_age)
+        store.put(client.iter_items(stale_ids, progress=False))
+        yield from store.get(batch_ids)
+
+
+def fetch_items(
+    client: "HackerNewsClient",
+    item_ids,
+    store: ItemStore = None,
+    max_age: float = ITEM_MAX_AGE,
+):
+    """
+    :return: the items, in the order of `item_ids`.
+    :rtype: list(dict)
+    """
+    return list(iter_items(client, item_ids, store=store, max_age=max_age))
+
+
+def save_topstories_as_zip(
+    client: "HackerNewsClient" = None,
+    file_path=TOPSTORIES_ZIP,
+    store: ItemStore = None,
+    max_age: float = ITEM_MAX_AGE,
+):
+    """
+    Fetch the current top stories and stream them as JSON lines into
+    `file_path`, zipped as `TOPSTORIES_JSONL` by default.
+
+    :param client: client used to query the API, a default one is created
+        when omitted.
+    :param store: local item cache, only the new and stale items are fetched
+        when given.
+    :return: the number of stories written.
+    :rtype: int
+    """
+    if client is None:
+        from hn_eda.hn_client import HackerNewsClient
+
+        with HackerNewsClient() as default_client:
+            return save_topstories_as_zip(default_client, file_path, store, max_age)
+
+    item_ids = client.topstories()
+    with JsonlWriter(file_path, member=f"{TOPSTORIES_NAME}.jsonl") as writer:
+        return writer.write_all(
+            iter_items(client, item_ids, store=store, max_age=max_age)
+        )
 
 
-def save_topstories_as_zip():
-    hn_topstories_url = (
-        "https://hacker-news.firebaseio.com/v0/topstories.json?print=pretty"
-    )
-    hn_get_item_url = (
-        "https://hacker-news.firebaseio.com/v0/item/{item_id}.json?print=pretty"
+def story_schema():
+    """
+    :return: the arrow schema of a Story, `descendants` is a float as in
+        the pandas exports.
+    :rtype: pyarrow.Schema
+    """
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            ("by", pa.string()),
+            ("descendants", pa.float64()),
+            ("id", pa.int64()),
+            ("kids", pa.list_(pa.int64())),
+            ("score", pa.int64()),
+            ("time", pa.int64()),
+            ("title", pa.string()),
+            ("type", pa.string()),
+            ("url", pa.string()),
+            ("text", pa.string()),
+        ]
     )
 
-    topstory_result = requests.get(hn_topstories_url)
-    topstory_ids = json.loads(topstory_result.text)
-
-    data = list()
-    for topstory_id in tqdm(topstory_ids):
-        result = requests.get(hn_get_item_url.format(item_id=topstory_id))
-        data.append(json.loads(result.text))
-
-    data_df = pd.json_normalize(data)
-    data_df.to_pickle(TOPSTORIES_ZIP)
-
 
-def save_to_json(file_path: Path):
-    standard_df = pd.read_pickle(file_path)
-    shuffled_df = standard_df.sample(frac=1, random_state=42).reset_index(drop=True)
-    _save_df_as_jsonl(shuffled_df, file_path.parent / f"{TOPSTORIES_NAME}.jsonl")
-
-
-def _save_df_as_jsonl(df, file_path: Path):
-    if file_path.exists():
-        file_path.unlink()
-
-    with open(file_path, "ab") as json_file:
-        df.apply(
-            lambda x: json_file.write(f"{x.to_json()}\n".encode("utf-8")),
-            axis=1,
-        )
+def save_as_parquet(stories, file_path=TOPSTORIES_PARQUET, batch_size=10000):
+    """
+    Write the stories in a columnar parquet file, read by
+    `StoryCorpusReader(path=file_path)` one field at a time.
+
+    :param stories: iterable of Stories, such as `StoryCorpusReader().docs()`.
+    :param batch_size: number of stories held in memory per row group.
+    :return: the number of stories written.
+    :rtype: int
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = story_schema()
+    count = 0
+    with pq.ParquetWriter(str(file_path), schema) as writer:
+        batch = []
+        for story in stories:
+            batch.append(story)
+            if len(batch) == batch_size:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                count += len(batch)
+                batch = []
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            count += len(batch)
+    return count
 
 
 def load_topstories_from_zip():
+    import pandas as pd
+
     return pd.read_json(
         TOPSTORIES_ZIP,
         lines=True,
@@ -58,5 +156,5 @@ def load_topstories_from_zip():
 
 
 if __name__ == "__main__":
-    save_topstories_as_zip()
-    save_to_json(TOPSTORIES_ZIP)
+    with ItemStore(ITEMS_DB) as item_store:
+        save_topstories_as_zip(store=item_store)
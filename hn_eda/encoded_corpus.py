@@ -0,0 +1,142 @@
+import typing
+from itertools import islice
+
+import numpy as np
+
+
+class EncodedCorpus:
+    r"""
+    Integer encoding of a tokenized corpus.
+
+    The tokens of every item are mapped to ids of a vocabulary table and
+    stored in one flat `int32` array; the tokens of item `i` span
+    `token_ids[offsets[i]:offsets[i + 1]]`. Ids are given in order of first
+    occurrence.
+
+        >>> encoded = EncodedCorpus.from_sentences([("Show", "HN"), ("HN",)])
+        >>> encoded.vocabulary
+        {'Show': 0, 'HN': 1}
+        >>> encoded.token_ids
+        array([0, 1, 1], dtype=int32)
+        >>> encoded.counts()
+        array([1, 2])
+    """
+
+    def __init__(
+        self,
+        vocabulary: typing.Dict[str, int],
+        token_ids: np.ndarray,
+        offsets: np.ndarray,
+    ):
+        """
+        :param vocabulary: token to id table.
+        :param token_ids: flat `int32` array of the token ids of all items.
+        :param offsets: `int64` array of the start of each item in
+            `token_ids`, followed by the number of tokens.
+        """
+        self.vocabulary = vocabulary
+        self.token_ids = token_ids
+        self.offsets = offsets
+        self._tokens = None
+
+    @classmethod
+    def from_sentences(cls, sentences: typing.Iterable[typing.Sequence[str]]):
+        """
+        :param sentences: the tokenized items.
+        :rtype: EncodedCorpus
+        """
+        vocabulary = {}
+        lengths = []
+
+        def ids():
+            for sentence in sentences:
+                lengths.append(len(sentence))
+                for token in sentence:
+                    token_id = vocabulary.get(token)
+                    if token_id is None:
+                        token_id = vocabulary[token] = len(vocabulary)
+                    yield token_id
+
+        token_ids = np.fromiter(ids(), dtype=np.int32)
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return cls(vocabulary, token_ids, offsets)
+
+    def extend(self, sentences: typing.Sequence[typing.Sequence[str]]) -> np.ndarray:
+        """
+        Append tokenized items, the new tokens taking the next ids.
+
+        :return: the token ids of the appended items.
+        :rtype: numpy.ndarray
+        """
+        vocabulary = self.vocabulary
+        vocabulary_length = len(vocabulary)
+        token_ids = np.fromiter(
+            (
+                vocabulary.setdefault(token, len(vocabulary))
+                for sentence in sentences
+                for token in sentence
+            ),
+            dtype=np.int32,
+        )
+        offsets = self.offsets[-1] + np.cumsum(
+            np.fromiter(map(len, sentences), dtype=np.int64, count=len(sentences))
+        )
+        self.token_ids = np.concatenate([self.token_ids, token_ids])
+        self.offsets = np.concatenate([self.offsets, offsets])
+        if self._tokens is not None:
+            new_tokens = islice(
+                reversed(vocabulary), len(vocabulary) - vocabulary_length
+            )
+            self._tokens.extend(reversed(list(new_tokens)))
+        return token_ids
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def tokens(self) -> typing.List[str]:
+        """
+        :return: the vocabulary, indexed by token id.
+        :rtype: list(str)
+        """
+        return list(self.vocabulary)
+
+    def _token_table(self):
+        if self._tokens is None:
+            self._tokens = list(self.vocabulary)
+        return self._tokens
+
+    def sentence(self, index: int) -> typing.Tuple[str]:
+        """
+        :return: the decoded tokens of the item `index`.
+        :rtype: tuple(str)
+        """
+        tokens = self._token_table()
+        start, stop = self.offsets[index], self.offsets[index + 1]
+        return tuple(tokens[token_id] for token_id in self.token_ids[start:stop])
+
+    def counts(self) -> np.ndarray:
+        """
+        :return: the number of occurrences of each token id.
+        :rtype: numpy.ndarray
+        """
+        return np.bincount(self.token_ids, minlength=len(self.vocabulary))
+
+    def item_lengths(self) -> np.ndarray:
+        """
+        :return: the number of tokens of each item.
+        :rtype: numpy.ndarray
+        """
+        return np.diff(self.offsets)
+
+    def token_mask(self, predicate: typing.Callable[[str], bool]) -> np.ndarray:
+        """
+        :return: a boolean array, indexed by token id, of the tokens
+            satisfying `predicate`.
+        :rtype: numpy.ndarray
+        """
+        return np.fromiter(
+            (predicate(token) for token in self.vocabulary),
+            dtype=bool,
+            count=len(self.vocabulary),
+        )
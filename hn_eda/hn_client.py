@@ -0,0 +1,105 @@
+import typing
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from tqdm import tqdm
+from urllib3.util.retry import Retry
+
+HN_API_URL = "https://hacker-news.firebaseio.com/v0"
+
+
+class HackerNewsClient:
+    r"""
+    Concurrent client for the Hacker News Firebase API.
+
+    Items are fetched by a thread pool sharing one keep-alive session,
+    failed requests are retried with an exponential backoff.
+
+        >>> client = HackerNewsClient(max_workers=8)
+        >>> stories = client.items(client.topstories())
+    """
+
+    def __init__(
+        self,
+        base_url: str = HN_API_URL,
+        max_workers: int = 16,
+        timeout: float = 10.0,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+    ):
+        """
+        :param base_url: root url of the API, overridden to target a local stub.
+        :param max_workers: maximum number of concurrent requests.
+        :param timeout: connect and read timeout of each request, in seconds.
+        :param retries: number of retries of a failed request.
+        :param backoff_factor: backoff factor between two retries, in seconds.
+        """
+        self.base_url = base_url.rstrip("/")
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=max_workers,
+            max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get(self, path: str):
+        """
+        :return: the JSON document served at `path`.
+        """
+        response = self.session.get(f"{self.base_url}/{path}", timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def topstories(self) -> typing.List[int]:
+        """
+        :return: the ids of the current top stories.
+        :rtype: list(int)
+        """
+        return self.get("topstories.json")
+
+    def item(self, item_id: int) -> dict:
+        """
+        :return: the item deserialised from JSON.
+        :rtype: dict
+        """
+        return self.get(f"item/{item_id}.json")
+
+    def iter_items(self, item_ids: typing.Iterable[int], progress=True):
+        """
+        Fetch the items concurrently.
+
+        :return: an iterator over the items, in the order of `item_ids`.
+        :rtype: iter(dict)
+        """
+        item_ids = list(item_ids)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            items = executor.map(self.item, item_ids)
+            yield from tqdm(items, total=len(item_ids), disable=not progress)
+
+    def items(self, item_ids: typing.Iterable[int], progress=True) -> typing.List[dict]:
+        """
+        :return: the items, in the order of `item_ids`.
+        :rtype: list(dict)
+        """
+        return list(self.iter_items(item_ids, progress=progress))
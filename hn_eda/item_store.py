@@ -0,0 +1,117 @@
+import json
+import sqlite3
+import time
+import typing
+from pathlib import Path
+
+
+class ItemStore:
+    r"""
+    Persistent store of Hacker News items keyed by their id.
+
+    Each item is saved with the time it was fetched, so a crawl only has to
+    query the ids it has never seen and the items gone stale.
+
+        >>> store = ItemStore("hn_items.sqlite")
+        >>> store.put([{"id": 1, "title": "Y Combinator"}])
+        >>> store.get([1])
+        [{'id': 1, 'title': 'Y Combinator'}]
+    """
+
+    def __init__(self, path: typing.Union[str, Path] = ":memory:"):
+        """
+        :param path: path of the SQLite database, created if missing.
+        """
+        self.path = path
+        self._connection = sqlite3.connect(str(path))
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS items (
+                id INTEGER PRIMARY KEY,
+                fetched_at REAL NOT NULL,
+                item TEXT NOT NULL
+            )
+            """)
+        self._connection.commit()
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def __contains__(self, item_id):
+        query = "SELECT 1 FROM items WHERE id = ?"
+        return self._connection.execute(query, (item_id,)).fetchone() is not None
+
+    def put(self, items: typing.Iterable[dict], fetched_at: float = None):
+        """
+        Insert or replace the items, stamped with their fetch time.
+
+        :param fetched_at: epoch of the fetch, defaults to now.
+        """
+        if fetched_at is None:
+            fetched_at = time.time()
+
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO items (id, fetched_at, item) VALUES (?, ?, ?)",
+                (
+                    (item["id"], fetched_at, json.dumps(item))
+                    for item in items
+                    if item is not None
+                ),
+            )
+
+    def get(self, item_ids: typing.Iterable[int]) -> typing.List[dict]:
+        """
+        :return: the stored items, in the order of `item_ids`; missing ids
+            are skipped.
+        :rtype: list(dict)
+        """
+        item_ids = list(item_ids)
+        items = self._select("id, item", item_ids)
+        return [json.loads(items[item_id]) for item_id in item_ids if item_id in items]
+
+    def fetched_at(self, item_ids: typing.Iterable[int]) -> typing.Dict[int, float]:
+        """
+        :return: the fetch epoch of each stored item.
+        :rtype: dict(int, float)
+        """
+        return self._select("id, fetched_at", list(item_ids))
+
+    def stale_ids(
+        self, item_ids: typing.Iterable[int], max_age: float, now: float = None
+    ) -> typing.List[int]:
+        """
+        :param max_age: age in seconds past which a stored item is stale.
+        :return: the ids never fetched or fetched more than `max_age` ago,
+            in the order of `item_ids`.
+        :rtype: list(int)
+        """
+        if now is None:
+            now = time.time()
+
+        item_ids = list(item_ids)
+        fetch_times = self.fetched_at(item_ids)
+        return [
+            item_id
+            for item_id in item_ids
+            if now - fetch_times.get(item_id, float("-inf")) > max_age
+        ]
+
+    def _select(self, columns, item_ids, batch_size=500):
+        rows = {}
+        for start in range(0, len(item_ids), batch_size):
+            batch = item_ids[start : start + batch_size]
+            placeholders = ",".join("?" * len(batch))
+            cursor = self._connection.execute(
+                f"SELECT {columns} FROM items WHERE id IN ({placeholders})", batch
+            )
+            rows.update(cursor.fetchall())
+        return rows
@@ -0,0 +1,86 @@
+import gzip
+import json
+import typing
+import zipfile
+from pathlib import Path
+
+
+class JsonlWriter:
+    r"""
+    Buffered writer of JSON lines.
+
+    Objects are serialised as they come and written by bulk of
+    `buffer_size` lines, so memory stays bounded whatever the number of
+    objects. The compression is inferred from the file suffix: `.gz` for
+    gzip, `.zip` for a single deflated `member`, plain text otherwise.
+
+        >>> with JsonlWriter("hn_topstories.zip") as writer:
+        ...     writer.write_all(stories)
+    """
+
+    def __init__(
+        self,
+        file_path: typing.Union[str, Path],
+        member: str = None,
+        buffer_size: int = 1000,
+    ):
+        """
+        :param file_path: path of the file, overwritten if it exists.
+        :param member: name of the JSONL member of a `.zip` file, defaults
+            to the file stem with a `.jsonl` suffix.
+        :param buffer_size: number of lines held before a bulk write.
+        """
+        self.file_path = Path(file_path)
+        self.buffer_size = buffer_size
+        self.count = 0
+        self._buffer = []
+        self._archive = None
+
+        if self.file_path.suffix == ".gz":
+            self._stream = gzip.open(self.file_path, "wb")
+        elif self.file_path.suffix == ".zip":
+            if member is None:
+                member = f"{self.file_path.stem}.jsonl"
+            self._archive = zipfile.ZipFile(
+                self.file_path, "w", compression=zipfile.ZIP_DEFLATED
+            )
+            self._stream = self._archive.open(member, "w", force_zip64=True)
+        else:
+            self._stream = open(self.file_path, "wb")
+
+    def write(self, obj):
+        """
+        Buffer one object, skipped when None (deleted items).
+        """
+        if obj is None:
+            return
+        self._buffer.append(json.dumps(obj, separators=(",", ":")))
+        self.count += 1
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def write_all(self, objs: typing.Iterable) -> int:
+        """
+        :return: the number of objects written so far.
+        :rtype: int
+        """
+        for obj in objs:
+            self.write(obj)
+        return self.count
+
+    def flush(self):
+        if self._buffer:
+            self._stream.write("\n".join(self._buffer).encode("utf-8") + b"\n")
+            self._buffer = []
+
+    def close(self):
+        self.flush()
+        self._stream.close()
+        if self._archive is not None:
+            self._archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,96 @@
+import json
+import typing
+from pathlib import Path
+
+from nltk.stem import WordNetLemmatizer
+
+from hn_eda.data_preparation import CACHE_DIR
+from hn_eda.vocabulary import nltk_data_version
+
+LEMMA_CACHE = CACHE_DIR / "lemmas.json"
+
+
+class LemmaCache:
+    r"""
+    Casefolded word to lemma map, persisted on disk and versioned by the
+    NLTK and WordNet install so that repeated runs skip WordNet.
+
+    The lemma of a word is its noun lemma, or its verb lemma when the word
+    is not an inflected noun. Each casefolded word is looked up in WordNet
+    once, the map holding the words seen so far being the one persisted.
+
+        >>> lemma_cache = LemmaCache()
+        >>> lemma_cache.lemmatize_words(["Dogs", "dogs", "running"])
+        {'dog', 'run'}
+        >>> lemma_cache.save()
+    """
+
+    def __init__(self, path: typing.Union[str, Path] = LEMMA_CACHE):
+        """
+        :param path: path of the JSON cache, None to keep it in memory.
+        """
+        self.path = None if path is None else Path(path)
+        self.version = nltk_data_version("wordnet")
+        self.lemmas = self._load()
+        self.new_lemma_count = 0
+        self._lemmatizer = WordNetLemmatizer()
+
+    def _load(self):
+        if self.path is None or not self.path.exists():
+            return {}
+        with open(self.path, encoding="utf-8") as cache_file:
+            cache = json.load(cache_file)
+        if cache.get("version") != self.version:
+            return {}
+        return cache["lemmas"]
+
+    def save(self):
+        """
+        Write the cache to disk, if any new lemma was looked up.
+        """
+        if self.path is None or self.new_lemma_count == 0:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as cache_file:
+            json.dump({"version": self.version, "lemmas": self.lemmas}, cache_file)
+        self.new_lemma_count = 0
+
+    def _wordnet_lemma(self, word):
+        noun_lemma = self._lemmatizer.lemmatize(word, pos="n")
+        if noun_lemma.casefold() != word:
+            return noun_lemma
+        return self._lemmatizer.lemmatize(word, pos="v")
+
+    def lemma(self, word: str) -> str:
+        """
+        :return: the lemma of the casefolded word.
+        :rtype: str
+        """
+        word = word.casefold()
+        lemma = self.lemmas.get(word)
+        if lemma is None:
+            lemma = self.lemmas[word] = self._wordnet_lemma(word)
+            self.new_lemma_count += 1
+        return lemma
+
+    def lemmatize_words(self, words: typing.Iterable[str]) -> typing.Set[str]:
+        """
+        :return: the set of lemmas of the words, each casefolded word being
+            looked up once.
+        :rtype: set(str)
+        """
+        return {self.lemma(word) for word in {word.casefold() for word in words}}
+
+
+_default_lemma_cache = None
+
+
+def default_lemma_cache() -> LemmaCache:
+    """
+    :return: the lemma cache shared by the whole process.
+    :rtype: LemmaCache
+    """
+    global _default_lemma_cache
+    if _default_lemma_cache is None:
+        _default_lemma_cache = LemmaCache()
+    return _default_lemma_cache
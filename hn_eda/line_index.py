@@ -0,0 +1,85 @@
+import os
+from array import array
+from pathlib import Path
+
+from nltk.data import ZipFilePathPointer
+
+CHUNK_SIZE = 1 << 20
+
+
+def line_offsets(stream, chunk_size=CHUNK_SIZE) -> array:
+    """
+    Scan a binary stream for the byte offset of each line start.
+
+    :return: the offset of every line followed by the size of the stream,
+        so that line `i` spans `offsets[i]:offsets[i + 1]`.
+    :rtype: array(int)
+    """
+    offsets = array("q", [0])
+    position = 0
+    last_byte = b"\n"
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        newline = chunk.find(b"\n")
+        while newline != -1:
+            offsets.append(position + newline + 1)
+            newline = chunk.find(b"\n", newline + 1)
+        position += len(chunk)
+        last_byte = chunk[-1:]
+
+    if last_byte != b"\n":
+        # Last line without trailing newline
+        offsets.append(position)
+    return offsets
+
+
+def index_path(path) -> Path:
+    """
+    :return: the path of the sidecar index of a corpus file, next to the
+        archive for a zip member.
+    :rtype: Path
+    """
+    if isinstance(path, ZipFilePathPointer):
+        entry = path.entry.replace("/", ".")
+        return Path(f"{path.zipfile.filename}.{entry}.idx")
+    return Path(f"{path}.idx")
+
+
+def _stamp(path):
+    if isinstance(path, ZipFilePathPointer):
+        size = path.file_size()
+        mtime = os.stat(path.zipfile.filename).st_mtime_ns
+    else:
+        stat = os.stat(path)
+        size, mtime = stat.st_size, stat.st_mtime_ns
+    return array("q", [size, mtime])
+
+
+def load_line_index(path) -> array:
+    """
+    Load the line offsets of a corpus file from its sidecar index, which is
+    (re)built when missing or older than the file.
+
+    :param path: path of the file, as a string or a `PathPointer`.
+    :rtype: array(int)
+    """
+    sidecar = index_path(path)
+    stamp = _stamp(path)
+
+    if sidecar.exists():
+        offsets = array("q", sidecar.read_bytes())
+        if offsets[:2] == stamp:
+            return offsets[2:]
+
+    if isinstance(path, ZipFilePathPointer):
+        stream = path.open()
+    else:
+        stream = open(path, "rb")
+    with stream:
+        offsets = line_offsets(stream)
+
+    with open(sidecar, "wb") as index_file:
+        (stamp + offsets).tofile(index_file)
+    return offsets
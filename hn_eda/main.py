@@ -1,86 +1,143 @@
+from functools import partial
 from pathlib import Path
-import pandas as pd
 
+from nltk import FreqDist
+
+from hn_eda.artifacts import ArtifactGraph
 from hn_eda.corpus_metrics import CorpusMetrics
-from hn_eda.data_preparation import load_topstories_from_zip
 from hn_eda.story_corpus import StoryCorpusReader
-from wordcloud import WordCloud
-from matplotlib import pyplot as plt
+from hn_eda.token_index import TokenIndex
+from hn_eda.vocabulary import nltk_data_version
 
 ROOT = Path(__file__).parent
 GENERATED_DIR = ROOT.parent / "generated"
 
+DISPERSION_WORDS = {
+    "big_tech": ["Google", "Microsoft", "Apple", "Amazon", "Tesla"],
+    "languages": ["Rust", "Python", "JavaScript", "C"],
+}
 
-def main():
-    # topstories = load_topstories_from_zip()
-    # topstories.describe()
 
+def main(workers: int = None):
+    """
+    Build the report of the stories into `GENERATED_DIR`, skipping the
+    files whose inputs did not change since the previous run.
+    """
     story_corpus = StoryCorpusReader()
-    corpus_metric = CorpusMetrics(corpus=story_corpus, item_name="title")
+    graph = report_graph(story_corpus, GENERATED_DIR)
+    for name in graph.run(workers=workers):
+        print(f"Built {graph.path(name)}")
+
+
+def report_graph(story_corpus: StoryCorpusReader, output_dir: Path) -> ArtifactGraph:
+    """
+    :return: the artifacts of the report: the metrics table, the word cloud,
+        the dispersion and frequency plots, and the trigram collocations.
+    :rtype: ArtifactGraph
+    """
+    content_key = (
+        f"{story_corpus.content_hash()}:{story_corpus.word_tokenizer.version}:"
+        f"{nltk_data_version('words', 'stopwords', 'wordnet')}"
+    )
+    graph = ArtifactGraph(output_dir, content_key)
+    graph.add(
+        "corpus_metrics",
+        partial(CorpusMetrics, story_corpus),
+        params={"item_name": "title"},
+    )
+    graph.add("dictionary", corpus_dictionary, requires=("corpus_metrics",))
+    graph.add("token_index", partial(story_token_index, story_corpus))
+
+    graph.add(
+        "metrics_table",
+        write_metrics_table,
+        requires=("corpus_metrics",),
+        output="readme.md",
+    )
+    graph.add(
+        "word_cloud",
+        plot_word_cloud,
+        requires=("dictionary",),
+        params={"max_words": 150},
+        output="wordcloud.png",
+        figure=True,
+    )
+    for name, words in DISPERSION_WORDS.items():
+        graph.add(
+            f"{name}_positions",
+            token_positions,
+            requires=("token_index",),
+            params={"words": words},
+        )
+        graph.add(
+            f"{name}_dispersion",
+            plot_dispersion_file,
+            requires=(f"{name}_positions",),
+            output=f"{name}_dispersion.png",
+            figure=True,
+        )
+    graph.add(
+        "most_common", most_common, requires=("dictionary",), params={"count": 20}
+    )
+    graph.add(
+        "frequency_plot",
+        plot_frequencies,
+        requires=("most_common",),
+        output="frequency.png",
+        figure=True,
+    )
+    graph.add(
+        "trigrams",
+        partial(write_trigrams, story_corpus=story_corpus),
+        params={"count": 15},
+        output="trigrams.txt",
+    )
+    return graph
 
-    metrics_df = corpus_metric.values()
-    metrics_df.to_markdown(GENERATED_DIR / "readme.md")
 
-    corpus_metric.frequency_distribution.most_common(20)
+def corpus_dictionary(corpus_metrics: CorpusMetrics) -> dict:
+    return dict(corpus_metrics.dictionary())
 
-    corpus_metric.story_text.collocations()
 
-    corpus_metric.story_text.generate(length=10)
-    corpus_metric.story_text.plot(30)
+def story_token_index(story_corpus: StoryCorpusReader) -> TokenIndex:
+    return TokenIndex.from_sentences(story_corpus.sentences())
 
-    corpus_metric.story_text[3:5]
 
-    corpus_metric.story_text.findall("<.*><.*><Google>")
+def token_positions(token_index: TokenIndex, words):
+    return token_index.dispersion(words)
 
-    corpus_metric.story_text.index(word="Google")
 
-    # ?
-    corpus_metric.story_text.common_contexts(words="oo")
-    # ?
-    corpus_metric.story_text.similar("Google")
+def most_common(dictionary: dict, count: int):
+    return FreqDist(dictionary).most_common(count)
 
-    corpus_metric.story_text.vocab()["Google"]
 
-    # When window_size > 2, count non-contiguous bigrams, in the
-    # style of Church and Hanks's (1990) association ratio.
-    corpus_metric.story_text.collocations(window_size=3)
+def write_metrics_table(path: Path, corpus_metrics: CorpusMetrics):
+    corpus_metrics.values().to_markdown(path)
 
-    corpus_metric.story_text.concordance("language")
-    trigramer(story_corpus)
 
-    corpus_metric.story_text.concordance("pfizer")
+def plot_dispersion_file(path: Path, positions: dict):
+    from matplotlib import pyplot as plt
 
-    plt.figure(figsize=(18, 12))
-    corpus_metric.story_text.dispersion_plot(
-        [
-            "Google",
-            "Microsoft",
-            "Apple",
-            "Amazon",
-            "Tesla",
-        ]
-    )
-    plt.savefig("saved_figure.png")
+    from hn_eda.main_eda import plot_dispersion_positions
 
     plt.figure(figsize=(18, 12))
-    corpus_metric.story_text.dispersion_plot(
-        [
-            "Rust",
-            "Python",
-            "JavaScript",
-            "C",
-        ]
-    )
-    plt.savefig("saved_figure.png")
+    plot_dispersion_positions(positions)
+    plt.savefig(path)
+
+
+def plot_frequencies(path: Path, most_common_tokens):
+    from matplotlib import pyplot as plt
 
     plt.figure(figsize=(18, 12))
-    corpus_metric.frequency_distribution.plot(20, cumulative=True)
-    plt.savefig("saved_figure.png")
+    FreqDist(dict(most_common_tokens)).plot(
+        len(most_common_tokens), cumulative=True, show=False
+    )
+    plt.savefig(path)
 
-    # Access the plaintext; outputs pure string/basestring.
-    story_corpus.items()
 
-    plot_word_cloud(corpus_metric, plot_path=GENERATED_DIR / "wordcloud.png")
+def write_trigrams(path: Path, story_corpus: StoryCorpusReader, count: int):
+    with open(path, "w", encoding="utf-8") as trigram_file:
+        trigramer(story_corpus, count=count, file=trigram_file)
 
 
 def summary_files(dir_path: Path, corpus_metrics: CorpusMetrics):
@@ -97,15 +154,18 @@ def summary_files(dir_path: Path, corpus_metrics: CorpusMetrics):
         )
 
 
-def plot_word_cloud(corpus_metric: CorpusMetrics, plot_path: Path):
+def plot_word_cloud(plot_path: Path, frequencies: dict, max_words=150):
+    from matplotlib import pyplot as plt
+    from wordcloud import WordCloud
+
     # generating the wordcloud
     wordcloud = (
         WordCloud(
             background_color="black",
-            max_words=150,
+            max_words=max_words,
             include_numbers=False,
         )
-        .generate_from_frequencies(corpus_metric.dictionary())
+        .generate_from_frequencies(frequencies)
         .recolor(random_state=1)
     )
 
@@ -118,41 +178,21 @@ def plot_word_cloud(corpus_metric: CorpusMetrics, plot_path: Path):
     plt.savefig(plot_path)
 
 
-def trigramer(story_corpus: StoryCorpusReader):
-    """Finds trigram collocations."""
-    from nltk.metrics import (
-        TrigramAssocMeasures,
-        ranks_from_scores,
-        spearman_correlation,
-    )
-    from nltk.collocations import TrigramCollocationFinder
-    from nltk.corpus import stopwords
-
-    likelihood_ratio_scorer = TrigramAssocMeasures.likelihood_ratio
-    raw_freq_scorer = TrigramAssocMeasures.raw_freq
-    point_wise_mutual_information = TrigramAssocMeasures.pmi
+def trigramer(story_corpus: StoryCorpusReader, count=15, file=None):
+    """Finds trigram collocations, printed to `file`."""
+    from hn_eda.collocations import TrigramCollocations
+    from hn_eda.vocabulary import load_vocabulary
 
-    ignored_words = stopwords.words("english")
+    ignored_words = load_vocabulary().stop_words
     word_filter = lambda w: len(w) < 3 or w.lower() in ignored_words
 
-    words = [word.lower() for word in story_corpus.words()]
-
-    cf = TrigramCollocationFinder.from_words(words)
+    cf = TrigramCollocations.from_words(
+        word.lower() for word in story_corpus.iter_words()
+    )
     cf.apply_freq_filter(min_freq=2)
     cf.apply_word_filter(word_filter)
 
-    corr_1 = spearman_correlation(
-        ranks_from_scores(cf.score_ngrams(likelihood_ratio_scorer)),
-        ranks_from_scores(cf.score_ngrams(raw_freq_scorer)),
-    )
-
-    print([" ".join(tup) for tup in cf.nbest(likelihood_ratio_scorer, 15)])
-    print(f"Correlation to {raw_freq_scorer.__name__}: {corr_1:0.4f}")
-
-    corr_2 = spearman_correlation(
-        ranks_from_scores(cf.score_ngrams(point_wise_mutual_information)),
-        ranks_from_scores(cf.score_ngrams(raw_freq_scorer)),
-    )
-
-    print([" ".join(tup) for tup in cf.nbest(point_wise_mutual_information, 15)])
-    print(f"Correlation to {raw_freq_scorer.__name__}: {corr_2:0.4f}")
+    for measure in ("likelihood_ratio", "pmi"):
+        correlation = cf.spearman_correlation(measure, "raw_freq")
+        print([" ".join(tup) for tup in cf.nbest(measure, count)], file=file)
+        print(f"Correlation to raw_freq: {correlation:0.4f}", file=file)
@@ -1,13 +1,16 @@
 from hn_eda.story_corpus import StoryCorpusReader
-from matplotlib import pyplot as plt
-from nltk.book import Text
-from nltk.corpus import stopwords
+from hn_eda.token_index import TokenIndex
+from hn_eda.vocabulary import load_vocabulary
+from nltk.text import Text
 
 
 def main():
+    from matplotlib import pyplot as plt
+
     story_corpus = StoryCorpusReader()
 
     story_text = Text(story_corpus.words())
+    token_index = TokenIndex.from_sentences(story_corpus.sentences())
 
     story_text[3:5]
     story_text.tokens[3:5]
@@ -15,40 +18,50 @@ def main():
     plt.figure(figsize=(18, 12))
     story_text.plot(20)
 
-    story_text.concordance("language")
+    # Case insensitive, as nltk.Text.concordance
+    match_count = token_index.count("language", ignore_case=True)
+    concordance_lines = token_index.concordance("language", ignore_case=True)
+    if not concordance_lines:
+        print("no matches")
+    else:
+        print(f"Displaying {len(concordance_lines)} of {match_count} matches:")
+    for concordance_line in concordance_lines:
+        print(concordance_line.line)
 
-    story_text.findall("<.*><.*><Google>")
+    token_index.findall("<.*><.*><Google>")
 
-    story_text.index(word="Apple")
+    token_index.index("Apple")
 
     story_text.collocations(window_size=3)
 
     plt.figure(figsize=(18, 12))
-    story_text.dispersion_plot(
+    plot_dispersion(
+        token_index,
         [
             "Google",
             "Microsoft",
             "Apple",
             "Amazon",
             "Tesla",
-        ]
+        ],
     )
 
     plt.figure(figsize=(18, 12))
-    story_text.dispersion_plot(
+    plot_dispersion(
+        token_index,
         [
             "Rust",
             "Python",
             "JavaScript",
             "C",
-        ]
+        ],
     )
 
     story_vocab = story_text.vocab()
 
     story_vocab.most_common(10)
 
-    stop_words = set(stopwords.words("english"))
+    stop_words = load_vocabulary().stop_words
 
     removable_vocab_keys = []
     for vocab_key in story_vocab.keys():
@@ -69,3 +82,24 @@ def main():
 
     story_text.common_contexts(words=["Google", "Apple"])
     story_text.similar("Google")
+
+
+def plot_dispersion(token_index: TokenIndex, words):
+    """
+    Lexical dispersion plot of the words, as `nltk.Text.dispersion_plot`,
+    from the offsets of the index.
+    """
+    plot_dispersion_positions(token_index.dispersion(words))
+
+
+def plot_dispersion_positions(positions: dict):
+    """
+    Lexical dispersion plot of the offsets of each word.
+    """
+    from matplotlib import pyplot as plt
+
+    for y, word_positions in enumerate(positions.values()):
+        plt.plot(word_positions, [y] * len(word_positions), "|", markersize=12)
+    plt.yticks(range(len(positions)), list(positions))
+    plt.xlabel("Word Offset")
+    plt.title("Lexical Dispersion Plot")
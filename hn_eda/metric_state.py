@@ -0,0 +1,385 @@
+import base64
+import json
+import math
+import re
+import typing
+from collections import Counter
+from hashlib import blake2b
+
+import numpy as np
+
+from hn_eda.near_duplicates import NearDuplicates
+
+UPPERCASE_SENTENCE_RE = re.compile(r"^[^a-z]*$")
+UPPERCASED_TOKEN_RE = re.compile(r"[A-Z]{2,}")
+SIGNATURE_BATCH = 4096
+
+
+class LengthStatistics(typing.NamedTuple):
+    count: int
+    mean: float
+    std: float
+    minimum: int
+    maximum: int
+    median: float
+
+
+class RunningMoments:
+    """
+    Accumulator of the count, sum and sum of squares of a stream of
+    integers, kept exact so that values can be removed without drift.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.square_total = 0
+
+    def add(self, value: int):
+        self.count += 1
+        self.total += value
+        self.square_total += value * value
+
+    def remove(self, value: int):
+        """
+        Undo the addition of a value.
+        """
+        self.count -= 1
+        self.total -= value
+        self.square_total -= value * value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else math.nan
+
+    def std(self) -> float:
+        """
+        :return: the sample standard deviation, NaN below two values.
+        :rtype: float
+        """
+        if self.count < 2:
+            return math.nan
+        # Exact integer variance, rounded once
+        return math.sqrt(
+            (self.count * self.square_total - self.total * self.total)
+            / (self.count * (self.count - 1))
+        )
+
+
+def title_hash(title: str) -> int:
+    """
+    :return: a 64 bits digest of the title, stable across processes.
+    :rtype: int
+    """
+    return int.from_bytes(blake2b(title.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def median_from_counts(value_counts: Counter):
+    """
+    :param value_counts: number of occurrences of each value.
+    :return: the median, as `statistics.median` on the expanded values.
+    """
+    total = sum(value_counts.values())
+    middle = total // 2
+    ranks = (middle,) if total % 2 else (middle - 1, middle)
+
+    values = []
+    seen = 0
+    for value in sorted(value_counts):
+        seen += value_counts[value]
+        while len(values) < len(ranks) and ranks[len(values)] < seen:
+            values.append(value)
+        if len(values) == len(ranks):
+            break
+
+    if total % 2:
+        return values[0]
+    return (values[0] + values[1]) / 2
+
+
+class TitleFeatures(typing.NamedTuple):
+    length: int
+    is_uppercase: bool
+    uppercased_token_count: int
+
+
+class MetricState:
+    r"""
+    Online accumulators of every quantity the corpus metrics depend on,
+    updated one item at a time: the memory used grows with the number of
+    unique items and tokens, not with the corpus.
+
+    The features of each unique title are kept by hash so that the states
+    of several shards merge exactly, a title seen in two shards counting
+    once. So is its MinHash signature, computed by batches, from which the
+    near duplicate titles are clustered; a state of unsigned titles skips
+    that cost when the near duplicates are not measured.
+
+        >>> state = MetricState()
+        >>> for title in titles:
+        ...     state.add(title, tokenizer.tokenize(title))
+        >>> state.merge(other_shard_state)
+
+    The number of items of each title is counted as well, so that the
+    items of a state merged earlier can be subtracted again.
+    """
+
+    def __init__(self, near_duplicates: NearDuplicates = None, sign_titles=True):
+        """
+        :param near_duplicates: hashing of the title signatures; states
+            merge only with the same parameters.
+        :param sign_titles: compute the MinHash signature of each unique
+            title, needed by `near_duplicate_labels`.
+        """
+        self.near_duplicates = near_duplicates or NearDuplicates()
+        self.sign_titles = sign_titles
+        self.item_count = 0
+        self.titles = {}
+        self.title_counts = Counter()
+        self.length_moments = RunningMoments()
+        self.length_counts = Counter()
+        self.uppercase_item_count = 0
+        self.uppercased_token_count = 0
+        self.token_counts = Counter()
+        self._signatures = {}
+        self._pending_titles = []
+
+    @classmethod
+    def from_titles(cls, titles: typing.Iterable[str], tokenizer, **kwargs):
+        """
+        :param titles: iterable of titles, consumed once.
+        :param tokenizer: tokenizer of the titles.
+        :param kwargs: arguments of the state.
+        :rtype: MetricState
+        """
+        state = cls(**kwargs)
+        for title in titles:
+            state.add(title, tokenizer.tokenize(title))
+        return state
+
+    def add(self, title: str, tokens: typing.Sequence[str]):
+        """
+        Account for one item: every token counts, only the first occurrence
+        of a title updates the unique item statistics.
+        """
+        self.item_count += 1
+        self.token_counts.update(tokens)
+
+        digest = title_hash(title)
+        self.title_counts[digest] += 1
+        if digest in self.titles:
+            return
+
+        is_uppercase = UPPERCASE_SENTENCE_RE.match(title) is not None
+        uppercased_token_count = (
+            0 if is_uppercase else len(UPPERCASED_TOKEN_RE.findall(title))
+        )
+        self._add_unique(
+            digest, TitleFeatures(len(title), is_uppercase, uppercased_token_count)
+        )
+        if self.sign_titles:
+            self._pending_titles.append((digest, title))
+            if len(self._pending_titles) >= SIGNATURE_BATCH:
+                self._sign_pending_titles()
+
+    def _sign_pending_titles(self):
+        if not self._pending_titles:
+            return
+        digests, titles = zip(*self._pending_titles)
+        self._add_signatures(digests, self.near_duplicates.signatures(titles))
+        self._pending_titles = []
+
+    def _add_signatures(self, digests, signatures):
+        self._signatures.update(zip(digests, signatures))
+
+    def signatures(self):
+        """
+        :return: the hash of each unique title and its MinHash signature.
+        :rtype: tuple(numpy.ndarray, numpy.ndarray)
+        :raises ValueError: if the titles are not signed.
+        """
+        if not self.sign_titles:
+            raise ValueError("The titles of this state are not signed")
+        self._sign_pending_titles()
+        digests = np.fromiter(
+            self._signatures, dtype=np.uint64, count=len(self._signatures)
+        )
+        signatures = np.zeros((len(digests), self.near_duplicates.num_perm), np.uint32)
+        for index, signature in enumerate(self._signatures.values()):
+            signatures[index] = signature
+        return digests, signatures
+
+    def near_duplicate_labels(self):
+        """
+        :return: the label of the near duplicate cluster of each unique
+            title, in the order of `signatures`.
+        :rtype: numpy.ndarray
+        """
+        digests, signatures = self.signatures()
+        return self.near_duplicates.labels(signatures, keys=digests)
+
+    def _add_unique(self, digest: int, features: TitleFeatures):
+        self.titles[digest] = features
+        self.length_moments.add(features.length)
+        self.length_counts[features.length] += 1
+        self.uppercase_item_count += features.is_uppercase
+        self.uppercased_token_count += features.uppercased_token_count
+
+    def _remove_unique(self, digest: int):
+        features = self.titles.pop(digest)
+        self.length_moments.remove(features.length)
+        self.length_counts[features.length] -= 1
+        if not self.length_counts[features.length]:
+            del self.length_counts[features.length]
+        self.uppercase_item_count -= features.is_uppercase
+        self.uppercased_token_count -= features.uppercased_token_count
+        self._signatures.pop(digest, None)
+
+    def merge(self, other: "MetricState"):
+        """
+        Add the items of another state, as if they were streamed after the
+        items of this one.
+
+        :return: this state.
+        :rtype: MetricState
+        :raises ValueError: if the near duplicate parameters differ, or if
+            the titles of this state are signed and those of the other not.
+        """
+        if other.near_duplicates.parameters() != self.near_duplicates.parameters():
+            raise ValueError(
+                "States merge only with the same near duplicate parameters, "
+                f"{self.near_duplicates.parameters()} and "
+                f"{other.near_duplicates.parameters()} differ"
+            )
+        if self.sign_titles and not other.sign_titles:
+            raise ValueError("The titles of the state to merge are not signed")
+
+        self.item_count += other.item_count
+        self.token_counts.update(other.token_counts)
+        self.title_counts.update(other.title_counts)
+
+        if self.sign_titles:
+            other_digests, other_signatures = other.signatures()
+            is_new = np.fromiter(
+                (digest not in self.titles for digest in other_digests.tolist()),
+                dtype=bool,
+                count=len(other_digests),
+            )
+            self._add_signatures(
+                other_digests[is_new].tolist(), other_signatures[is_new]
+            )
+
+        for digest, features in other.titles.items():
+            if digest not in self.titles:
+                self._add_unique(digest, features)
+        return self
+
+    def subtract(self, other: "MetricState"):
+        """
+        Remove the items of another state, previously merged into this one:
+        a title is only forgotten once none of its items remain.
+
+        :return: this state.
+        :rtype: MetricState
+        :raises ValueError: if the other state has items this one has not.
+        """
+        if any(
+            self.title_counts[digest] < count
+            for digest, count in other.title_counts.items()
+        ):
+            raise ValueError("The state to subtract was not merged into this one")
+        self._sign_pending_titles()
+
+        self.item_count -= other.item_count
+        self.token_counts.subtract(other.token_counts)
+        for token, count in other.token_counts.items():
+            if count and not self.token_counts[token]:
+                del self.token_counts[token]
+
+        for digest, count in other.title_counts.items():
+            self.title_counts[digest] -= count
+            if not self.title_counts[digest]:
+                del self.title_counts[digest]
+                self._remove_unique(digest)
+        return self
+
+    def unique_item_count(self):
+        return len(self.titles)
+
+    def length_statistics(self) -> LengthStatistics:
+        """
+        :return: the statistics of the lengths of the unique items.
+        :rtype: LengthStatistics
+        """
+        return LengthStatistics(
+            count=self.length_moments.count,
+            mean=self.length_moments.mean,
+            std=self.length_moments.std(),
+            minimum=min(self.length_counts),
+            maximum=max(self.length_counts),
+            median=median_from_counts(self.length_counts),
+        )
+
+    def to_dict(self) -> dict:
+        """
+        :return: the JSON serialisable content of the state; the derived
+            accumulators are rebuilt by `from_dict`.
+        :rtype: dict
+        """
+        data = {
+            "item_count": self.item_count,
+            "titles": [
+                [digest, *features, self.title_counts[digest]]
+                for digest, features in self.titles.items()
+            ],
+            "token_counts": self.token_counts,
+            "near_duplicates": list(self.near_duplicates.parameters()),
+            "sign_titles": self.sign_titles,
+        }
+        if self.sign_titles:
+            digests, signatures = self.signatures()
+            data["signature_digests"] = digests.tolist()
+            data["signatures"] = base64.b64encode(signatures.tobytes()).decode("ascii")
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """
+        :rtype: MetricState
+        """
+        state = cls(
+            NearDuplicates(*data["near_duplicates"]),
+            sign_titles=data.get("sign_titles", True),
+        )
+        state.item_count = data["item_count"]
+        state.token_counts = Counter(data["token_counts"])
+        for (
+            digest,
+            length,
+            is_uppercase,
+            uppercased_token_count,
+            item_count,
+        ) in data["titles"]:
+            state.title_counts[digest] = item_count
+            state._add_unique(
+                digest,
+                TitleFeatures(length, bool(is_uppercase), uppercased_token_count),
+            )
+        if state.sign_titles:
+            signatures = np.frombuffer(
+                base64.b64decode(data["signatures"]), dtype=np.uint32
+            ).reshape(-1, state.near_duplicates.num_perm)
+            state._add_signatures(data["signature_digests"], signatures)
+        return state
+
+    def save(self, file_path):
+        with open(file_path, "w", encoding="utf-8") as state_file:
+            json.dump(self.to_dict(), state_file)
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        :rtype: MetricState
+        """
+        with open(file_path, encoding="utf-8") as state_file:
+            return cls.from_dict(json.load(state_file))
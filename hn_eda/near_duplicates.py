@@ -0,0 +1,248 @@
+import typing
+
+import numpy as np
+
+THRESHOLD = 0.8
+NUM_PERM = 128
+SHINGLE_SIZE = 5
+BATCH_SHINGLES = 1 << 16
+
+
+def normalize_title(title: str) -> str:
+    return " ".join(title.casefold().split())
+
+
+def lsh_parameters(threshold: float, num_perm: int) -> typing.Tuple[int, int]:
+    """
+    :return: the number of bands and of rows per band of the LSH index:
+        the most rows whose similarity threshold `(1 / bands) ** (1 / rows)`
+        stays below `threshold`, so that candidates are not missed.
+    :rtype: tuple(int, int)
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+class NearDuplicates:
+    r"""
+    Near duplicate detection of titles by MinHash and locality sensitive
+    hashing.
+
+    Each title is shingled into its casefolded character `shingle_size`
+    grams, and summarized by a MinHash signature of `num_perm` values:
+    two signatures agree on a proportion of values that estimates the
+    Jaccard similarity of the shingles. Signatures are cut into bands,
+    titles sharing a band are candidates, and candidates whose estimated
+    similarity reaches `threshold` are clustered together. The cost is
+    linear in the number of titles, for a bounded number of duplicates.
+
+        >>> near_duplicates = NearDuplicates(threshold=0.8)
+        >>> near_duplicates.clusters(["Show HN: My app", "Show HN: my app!", "Rust"])
+        [[0, 1]]
+    """
+
+    def __init__(
+        self,
+        threshold: float = THRESHOLD,
+        num_perm: int = NUM_PERM,
+        shingle_size: int = SHINGLE_SIZE,
+        seed: int = 1,
+    ):
+        """
+        :param threshold: minimum estimated Jaccard similarity of the
+            shingles of two near duplicate titles.
+        :param num_perm: number of hash functions of the signatures.
+        :param shingle_size: number of bytes of a shingle, up to 8.
+        :param seed: seed of the hash functions; signatures are only
+            comparable for the same parameters and seed.
+        """
+        if not 1 <= shingle_size <= 8:
+            raise ValueError("The shingle size must be between 1 and 8 bytes")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seed = seed
+        self.bands, self.rows = lsh_parameters(threshold, num_perm)
+
+        rng = np.random.default_rng(seed)
+        max_value = np.iinfo(np.uint64).max
+        self._shingle_multiplier = rng.integers(0, max_value, dtype=np.uint64) | 1
+        self._multipliers = rng.integers(0, max_value, num_perm, dtype=np.uint64) | 1
+        self._increments = rng.integers(0, max_value, num_perm, dtype=np.uint64)
+        self._band_multipliers = rng.integers(
+            0, max_value, self.rows, dtype=np.uint64
+        ) | np.uint64(1)
+
+    def parameters(self) -> typing.Tuple[float, int, int, int]:
+        """
+        :return: the threshold, number of hash functions, shingle size and
+            seed, which signatures and clusters are only comparable for.
+        :rtype: tuple(float, int, int, int)
+        """
+        return self.threshold, self.num_perm, self.shingle_size, self.seed
+
+    def shingles(self, titles: typing.Sequence[str]):
+        """
+        :return: the shingles of the titles packed into `uint64`, and the
+            index of the title of each shingle, in increasing order.
+        :rtype: tuple(numpy.ndarray, numpy.ndarray)
+        """
+        encoded = [normalize_title(title).encode("utf-8") for title in titles]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        ends = np.cumsum(lengths)
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+
+        # Shingles starting at every byte, those spanning two titles dropped
+        padded = np.concatenate([data, np.zeros(self.shingle_size, dtype=np.uint64)])
+        keys = np.zeros(len(data), dtype=np.uint64)
+        for offset in range(self.shingle_size):
+            keys |= padded[offset : offset + len(data)] << np.uint64(8 * offset)
+        title_indices = np.repeat(np.arange(len(encoded)), lengths)
+        valid = np.arange(len(data)) + self.shingle_size <= ends[title_indices]
+        keys, title_indices = keys[valid], title_indices[valid]
+
+        # Titles shorter than a shingle are their own shingle
+        short_titles = np.flatnonzero(lengths < self.shingle_size)
+        if len(short_titles):
+            short_keys = np.fromiter(
+                (int.from_bytes(encoded[index], "little") for index in short_titles),
+                dtype=np.uint64,
+                count=len(short_titles),
+            )
+            keys = np.concatenate([keys, short_keys])
+            title_indices = np.concatenate([title_indices, short_titles])
+            order = np.argsort(title_indices, kind="stable")
+            keys, title_indices = keys[order], title_indices[order]
+        return keys, title_indices
+
+    def _min_hashes(self, keys, starts):
+        """
+        :return: the minimum of each hash function over the shingles of
+            each title, the shingles of title `i` starting at `starts[i]`.
+        """
+        # Multiply-shift hashing of the shingles to 32 bits, then one
+        # multiply-add-shift hash function per permutation, computed in
+        # place one permutation per row
+        hashes = np.empty((self.num_perm, len(keys)), dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            keys = (keys * self._shingle_multiplier) >> np.uint64(32)
+            np.multiply(self._multipliers[:, None], keys, out=hashes)
+            hashes += self._increments[:, None]
+        # The high bits of the minimum are the minimum of the high bits
+        minima = np.minimum.reduceat(hashes, starts, axis=1)
+        return (minima >> np.uint64(32)).astype(np.uint32).T
+
+    def signatures(self, titles: typing.Sequence[str]) -> np.ndarray:
+        """
+        :return: the MinHash signature of each title, one row per title.
+        :rtype: numpy.ndarray
+        """
+        keys, title_indices = self.shingles(titles)
+        title_starts = np.searchsorted(title_indices, np.arange(len(titles) + 1))
+
+        signatures = np.empty((len(titles), self.num_perm), dtype=np.uint32)
+        start = 0
+        while start < len(titles):
+            stop = int(
+                np.searchsorted(
+                    title_starts, title_starts[start] + BATCH_SHINGLES, side="right"
+                )
+            )
+            stop = min(max(stop - 1, start + 1), len(titles))
+            first, last = title_starts[start], title_starts[stop]
+            signatures[start:stop] = self._min_hashes(
+                keys[first:last], title_starts[start:stop] - first
+            )
+            start = stop
+        return signatures
+
+    def _band_keys(self, signatures, band):
+        rows = signatures[:, band * self.rows : (band + 1) * self.rows]
+        with np.errstate(over="ignore"):
+            return (rows.astype(np.uint64) * self._band_multipliers).sum(
+                axis=1, dtype=np.uint64
+            )
+
+    def labels(self, signatures: np.ndarray, keys: np.ndarray = None) -> np.ndarray:
+        """
+        Cluster the signatures: in each band, every signature sharing its
+        bucket is compared to the first one, and the similar pairs are
+        joined.
+
+        :param signatures: signatures of distinct titles.
+        :param keys: keys ordering the signatures, such as title hashes, so
+            that the clusters do not depend on the order of the titles.
+        :return: the label of the cluster of each signature, the index of
+            one of its members.
+        :rtype: numpy.ndarray
+        """
+        count = len(signatures)
+        order = np.arange(count) if keys is None else np.argsort(keys, kind="stable")
+        signatures = signatures[order]
+
+        candidate_pairs = []
+        for band in range(self.bands):
+            band_keys = self._band_keys(signatures, band)
+            bucket_order = np.argsort(band_keys, kind="stable")
+            sorted_keys = band_keys[bucket_order]
+            is_first = np.ones(count, dtype=bool)
+            is_first[1:] = sorted_keys[1:] != sorted_keys[:-1]
+            firsts = bucket_order[
+                np.maximum.accumulate(np.where(is_first, np.arange(count), 0))
+            ]
+            members = ~is_first
+            candidate_pairs.append(
+                np.stack([firsts[members], bucket_order[members]], axis=1)
+            )
+
+        parents = np.arange(count)
+
+        def root(index):
+            while parents[index] != index:
+                parents[index] = parents[parents[index]]
+                index = parents[index]
+            return index
+
+        if candidate_pairs:
+            pairs = np.unique(np.concatenate(candidate_pairs), axis=0)
+            similarities = np.mean(
+                signatures[pairs[:, 0]] == signatures[pairs[:, 1]], axis=1
+            )
+            for first, other in pairs[similarities >= self.threshold].tolist():
+                first_root, other_root = root(first), root(other)
+                if first_root != other_root:
+                    parents[max(first_root, other_root)] = min(first_root, other_root)
+
+        labels = np.empty(count, dtype=np.int64)
+        labels[order] = order[[root(index) for index in range(count)]]
+        return labels
+
+    def cluster_count(self, signatures: np.ndarray, keys: np.ndarray = None) -> int:
+        """
+        :return: the number of clusters of the signatures of distinct titles.
+        :rtype: int
+        """
+        return len(np.unique(self.labels(signatures, keys)))
+
+    def clusters(self, titles: typing.Sequence[str]) -> typing.List[typing.List[int]]:
+        """
+        :return: the indices of the titles of each cluster of near
+            duplicates, exact duplicates included, in order of first title.
+        :rtype: list(list(int))
+        """
+        unique_indices = {}
+        for title in titles:
+            unique_indices.setdefault(title, len(unique_indices))
+        unique_titles = list(unique_indices)
+        labels = self.labels(self.signatures(unique_titles))
+
+        clusters = {}
+        for index, title in enumerate(titles):
+            clusters.setdefault(labels[unique_indices[title]], []).append(index)
+        return [cluster for cluster in clusters.values() if len(cluster) > 1]
@@ -0,0 +1,92 @@
+import time
+import tracemalloc
+import typing
+
+
+class StageMeasure(typing.NamedTuple):
+    stage: str
+    kind: str
+    """`intermediate` or `metric`"""
+    seconds: float
+    peak_memory: typing.Optional[int]
+    """Peak of the memory allocated by the stage in bytes, when traced"""
+    item_count: typing.Optional[int]
+    """Size of the result of the stage, when it has one"""
+
+
+class StageReport:
+    r"""
+    Wall time, peak memory and item count of each stage of the metrics
+    pipeline, in the order the stages ran.
+
+        >>> report = StageReport(trace_memory=True)
+        >>> metrics_df = CorpusMetrics(corpus, "title", report=report).values()
+        >>> report.to_frame()
+
+    The pipeline runs its stages directly when no report is given, so that
+    the instrumentation costs nothing when disabled.
+    """
+
+    def __init__(
+        self,
+        trace_memory: bool = False,
+        callback: typing.Callable[[StageMeasure], None] = None,
+    ):
+        """
+        :param trace_memory: measure the peak memory with `tracemalloc`,
+            which slows down allocations. When memory is already traced,
+            the tracer's peak is not reset, and a stage peaking below it
+            reports its memory growth instead.
+        :param callback: called with each measure as soon as it is taken.
+        """
+        self.trace_memory = trace_memory
+        self.callback = callback
+        self.measures = []
+
+    def measure(self, stage: str, kind: str, function: typing.Callable):
+        """
+        Run the function of a stage and record its measure.
+
+        :return: the result of the function.
+        """
+        if self.trace_memory:
+            was_tracing = tracemalloc.is_tracing()
+            if not was_tracing:
+                tracemalloc.start()
+            start_memory, start_peak = tracemalloc.get_traced_memory()
+
+        start = time.perf_counter()
+        result = function()
+        seconds = time.perf_counter() - start
+
+        peak_memory = None
+        if self.trace_memory:
+            # The peak of an outer tracer is left as is: below it, the peak
+            # of the stage is only known by its memory at the end
+            end_memory, end_peak = tracemalloc.get_traced_memory()
+            peak_memory = max(
+                (end_peak if end_peak > start_peak else end_memory) - start_memory, 0
+            )
+            if not was_tracing:
+                tracemalloc.stop()
+
+        item_count = len(result) if hasattr(result, "__len__") else None
+        self.add(StageMeasure(stage, kind, seconds, peak_memory, item_count))
+        return result
+
+    def add(self, measure: StageMeasure):
+        self.measures.append(measure)
+        if self.callback is not None:
+            self.callback(measure)
+
+    def total_seconds(self) -> float:
+        return sum(measure.seconds for measure in self.measures)
+
+    def to_frame(self):
+        """
+        :return: one row per measure.
+        :rtype: pandas.DataFrame
+        """
+        import pandas as pd
+
+        return pd.DataFrame(self.measures, columns=StageMeasure._fields)
@@ -2,12 +2,31 @@ from nltk.corpus.reader.api import CorpusReader
 from nltk.corpus.reader.util import StreamBackedCorpusView, concat, ZipFilePathPointer
 
 from hn_eda.data_preparation import TOPSTORIES_JSONL
-from hn_eda.tokenizers import StoryTokenizer
-import json
+from hn_eda.line_index import load_line_index
+from hn_eda.story_files import (
+    DecompressedStream,
+    is_compressed,
+    open_decompressed,
+    story_files,
+)
+from hn_eda.tokenizers import CHUNK_SIZE, StoryTokenizer, tokenize_sents_parallel
 import os
+import sys
+from functools import partial
+from hashlib import blake2b
+from itertools import chain
+from pathlib import Path
 
 from abc import abstractmethod
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+BACKENDS = ("jsonl", "parquet")
+BLOCK_SIZE = 100
+
 
 class CorpusReaderBase(CorpusReader):
     @abstractmethod
@@ -29,25 +48,65 @@ class StoryCorpusReader(CorpusReaderBase):
     The corpus view class used by this reader.
     """
     _titles = None
+    _sentences = None
+    _words = None
 
-    def __init__(self, word_tokenizer=StoryTokenizer(), encoding="utf8"):
+    def __init__(
+        self,
+        word_tokenizer=StoryTokenizer(),
+        encoding="utf8",
+        path=TOPSTORIES_JSONL,
+        backend=None,
+        block_size=BLOCK_SIZE,
+        json_loads=json_loads,
+        line_index=False,
+        tokenize_workers=1,
+        tokenize_chunk_size=CHUNK_SIZE,
+    ):
         """
         :param word_tokenizer: Tokenizer for breaking the text of Story into
             smaller units, including but not limited to words.
+        :param path: path of the files of Stories: a file, a glob pattern
+            such as `dumps/*.jsonl.gz`, a zip archive, or a member or glob
+            pattern over the members of a zip archive such as
+            `archive.zip/stories.jsonl`. Zip members, `.gz` and `.zst` files
+            are decompressed as a stream, chunk by chunk.
+        :param backend: storage format of the files, "jsonl" (row oriented)
+            or "parquet" (columnar, only the requested fields are read).
+            Inferred from the suffix of the first file when omitted.
+        :param block_size: number of JSON lines decoded per block.
+        :param json_loads: JSON decoder, orjson when installed.
+        :param line_index: when True, a sidecar index of the line offsets
+            is loaded (built on first use) so that indexing, slicing and
+            sharding seek straight to a Story.
+        :param tokenize_workers: number of processes tokenizing the titles,
+            None for one per CPU. Small corpora are tokenized serially.
+        :param tokenize_chunk_size: number of titles per tokenizing task.
         """
+        root, fileids = story_files(path)
+        if backend is None:
+            backend = "parquet" if Path(fileids[0]).suffix == ".parquet" else "jsonl"
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend}, expected one of {BACKENDS}")
+        self._backend = backend
 
-        CorpusReader.__init__(
-            self, str(TOPSTORIES_JSONL.parent), [TOPSTORIES_JSONL.name], encoding
-        )
+        CorpusReader.__init__(self, root, fileids, encoding)
 
         for path in self.abspaths(self._fileids):
             if isinstance(path, ZipFilePathPointer):
                 pass
             elif os.path.getsize(path) == 0:
                 raise ValueError(f"File {path} is empty")
+            elif line_index and is_compressed(path):
+                raise ValueError(f"No line index over the compressed file {path}")
         """Check that all user-created corpus files are non-empty."""
 
         self._word_tokenizer = word_tokenizer
+        self._block_size = block_size
+        self._json_loads = json_loads
+        self._line_index = line_index
+        self._tokenize_workers = tokenize_workers
+        self._tokenize_chunk_size = tokenize_chunk_size
 
     def docs(self, fileids=None):
         """
@@ -55,22 +114,61 @@ class StoryCorpusReader(CorpusReaderBase):
         :return: list of dictionaries deserialised from JSON.
         :rtype: list(dict)
         """
+        if self._backend == "parquet":
+            return self._read_parquet(fileids).to_pylist()
+
         return concat(
             [
-                self.corpus_view(path, self._read_stories, encoding=enc)
+                self._corpus_view(path, enc)
                 for (path, enc, fileid) in self.abspaths(fileids, True, True)
             ]
         )
 
+    def records(self, fileids=None):
+        """
+        Returns the Stories read into compact arrays, rather than a dict
+        per Story.
+        :rtype: StoryRecords
+        """
+        from hn_eda.story_records import StoryRecords
+
+        return StoryRecords.from_stories(self.docs(fileids))
+
+    def shard(self, index, count, fileids=None):
+        """
+        Returns the `index`-th of `count` contiguous shards of the Stories,
+        read lazily.
+        :rtype: list(dict)
+        """
+        stories = self.docs(fileids)
+        size = len(stories)
+        return stories[index * size // count : (index + 1) * size // count]
+
+    def content_hash(self, fileids=None) -> str:
+        """
+        Returns a digest of the bytes of the files of Stories, as stored,
+        which changes with any Story.
+
+        :rtype: str
+        """
+        digest = blake2b(digest_size=16)
+        for path in self.abspaths(fileids):
+            if isinstance(path, ZipFilePathPointer):
+                stream = open_decompressed(path)
+            else:
+                stream = open(path, "rb")
+            with stream:
+                for block in iter(partial(stream.read, 1 << 20), b""):
+                    digest.update(block)
+        return digest.hexdigest()
+
     def titles(self):
         """
         Returns only the titles content of Stories
         """
         if self._titles == None:
-            titles = self.docs()
             standard_titles = []
-            for jsono in titles:
-                text = jsono["title"]
+            for text in self.column("title"):
                 if isinstance(text, bytes):
                     text = text.decode(self.encoding)
 
@@ -78,37 +176,200 @@ class StoryCorpusReader(CorpusReaderBase):
             self._titles = standard_titles
         return self._titles
 
+    def iter_titles(self, fileids=None):
+        """
+        Returns an iterator over the titles of Stories, read lazily
+        without being held in memory.
+        """
+        if self._backend == "parquet":
+            yield from self.column("title", fileids)
+            return
+
+        for story in self.docs(fileids):
+            text = story["title"]
+            if isinstance(text, bytes):
+                text = text.decode(self.encoding)
+            yield text
+
+    def times(self):
+        """
+        Returns only the creation epochs of Stories
+        """
+        return self.column("time")
+
+    def scores(self):
+        """
+        Returns only the scores of Stories
+        """
+        return self.column("score")
+
+    def column(self, name, fileids=None):
+        """
+        Returns one field of every Story, None where it is missing.
+        The parquet backend reads that single column from disk.
+
+        :rtype: list
+        """
+        if self._backend == "parquet":
+            return self._read_parquet(fileids, columns=[name]).column(name).to_pylist()
+
+        return [story.get(name) for story in self.docs(fileids)]
+
     def texts(self):
         return self.titles()
 
+    @property
+    def word_tokenizer(self):
+        return self._word_tokenizer
+
+    @word_tokenizer.setter
+    def word_tokenizer(self, word_tokenizer):
+        """
+        Changing the tokenizer invalidates the memoized sentences and words.
+        """
+        self._word_tokenizer = word_tokenizer
+        self._sentences = None
+        self._words = None
+
     def sentences(self):
         """
         :return: a list of the text content of Stories as
             as a list of words.. and punctuation symbols.
-        :rtype: list(list(str))
+            Tokenized once, then memoized.
+        :rtype: list(tuple(str))
+        """
+        if self._sentences is None:
+            self._sentences = [
+                tuple(tokens)
+                for tokens in tokenize_sents_parallel(
+                    self._word_tokenizer,
+                    self.titles(),
+                    workers=self._tokenize_workers,
+                    chunk_size=self._tokenize_chunk_size,
+                )
+            ]
+        return self._sentences
+
+    def iter_sentences(self):
         """
+        :return: an iterator over the tokenized titles, tokenizing them on
+            the fly unless `sentences()` were memoized.
+        :rtype: iter(tuple(str))
+        """
+        if self._sentences is not None:
+            yield from self._sentences
+            return
+
         tokenizer = self._word_tokenizer
-        return [tuple(tokenizer.tokenize(t)) for t in self.titles()]
+        for title in self.titles():
+            yield tuple(tokenizer.tokenize(title))
 
     def words(self):
         """
-        :return: a list of the tokens of Stories.
+        :return: a list of the tokens of Stories, memoized.
         :rtype: list(str)
         """
-        tokens = []
-        for title_sentence in self.sentences():
-            tokens += title_sentence
-        return tokens
+        if self._words is None:
+            self._words = list(chain.from_iterable(self.sentences()))
+        return self._words
+
+    def iter_words(self):
+        """
+        :return: an iterator over the tokens of Stories.
+        :rtype: iter(str)
+        """
+        return chain.from_iterable(self.iter_sentences())
+
+    def _read_parquet(self, fileids=None, columns=None):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        return pa.concat_tables(
+            [
+                pq.read_table(str(path), columns=columns)
+                for path in self.abspaths(fileids)
+            ]
+        )
+
+    def _corpus_view(self, path, encoding):
+        if self._line_index:
+            return IndexedCorpusView(
+                path,
+                load_line_index(path),
+                self._block_size,
+                self._json_loads,
+                encoding=encoding,
+            )
+        if is_compressed(path):
+            return DecompressedCorpusView(path, self._read_stories)
+        return self.corpus_view(path, self._read_stories, encoding=encoding)
 
     def _read_stories(self, stream):
         """
         Assume that each line in stream is a JSON serialised object
         """
         stories = []
-        for i in range(10):
+        for i in range(self._block_size):
             line = stream.readline()
             if not line:
                 return stories
-            story = json.loads(line)
+            story = self._json_loads(line)
             stories.append(story)
         return stories
+
+
+class IndexedCorpusView(StreamBackedCorpusView):
+    """
+    Corpus view of JSON lines whose block table is filled from the line
+    offsets up front: any Story is reached with a single seek, and each
+    block of lines is read with a single call.
+    """
+
+    def __init__(self, fileid, line_offsets, block_size, json_loads, encoding="utf8"):
+        """
+        :param line_offsets: offset of every line followed by the file size,
+            see `hn_eda.line_index.line_offsets`.
+        """
+        StreamBackedCorpusView.__init__(self, fileid, encoding=encoding)
+        self._line_offsets = line_offsets
+        self._block_size = block_size
+        self._json_loads = json_loads
+
+        line_count = len(line_offsets) - 1
+        self._toknum = list(range(0, line_count, block_size)) + [line_count]
+        self._filepos = [line_offsets[toknum] for toknum in self._toknum]
+        self._len = line_count
+
+    def read_block(self, stream):
+        start = self._current_toknum
+        stop = min(start + self._block_size, self._len)
+        lines = stream.read(self._line_offsets[stop] - self._line_offsets[start])
+        return [self._json_loads(line) for line in lines.splitlines()]
+
+
+class DecompressedCorpusView(StreamBackedCorpusView):
+    """
+    Corpus view of the JSON lines of a compressed file, read through a
+    `DecompressedStream`. The decompressed size is not known up front: the
+    end of the file is found by the block that reaches it.
+    """
+
+    def __init__(self, fileid, block_reader):
+        """
+        :param block_reader: reads the Stories of a block from a binary
+            stream of UTF-8 JSON lines.
+        """
+        StreamBackedCorpusView.__init__(self, fileid, encoding=None)
+        self._block_reader = block_reader
+        self._eofpos = sys.maxsize
+
+    def _open(self):
+        self._stream = DecompressedStream(self._fileid)
+        if self._stream.at_eof():
+            self._eofpos = 0
+
+    def read_block(self, stream):
+        stories = self._block_reader(stream)
+        if stream.at_eof():
+            self._eofpos = stream.tell()
+        return stories
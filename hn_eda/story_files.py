@@ -0,0 +1,186 @@
+import fnmatch
+import glob
+import gzip
+import io
+import os
+import re
+import typing
+import zipfile
+
+from nltk.data import ZipFilePathPointer
+
+CHUNK_SIZE = 1 << 20
+GLOB_RE = re.compile(r"[*?[]")
+ZIP_MEMBER_RE = re.compile(r"(.*\.zip)(?:/(.*))?$", re.IGNORECASE)
+GZIP_SUFFIXES = (".gz",)
+ZSTD_SUFFIXES = (".zst", ".zstd")
+
+
+def story_files(path) -> typing.Tuple[str, typing.List[str]]:
+    """
+    Expand the path of the files of Stories into a corpus root and file ids.
+
+    :param path: a file, a glob pattern over files such as
+        `dumps/**/*.jsonl.gz`, a zip archive for all its members, or a
+        member or glob pattern over the members of a zip archive such as
+        `dumps.zip/2022-01-*.jsonl`.
+    :return: the root directory or zip archive, and the paths of the files
+        relative to it, in sorted order for the patterns.
+    :rtype: tuple(str, list(str))
+    :raises ValueError: if a pattern matches no file.
+    """
+    path = os.fspath(path)
+    zip_match = ZIP_MEMBER_RE.match(path)
+    if zip_match and os.path.isfile(zip_match.group(1)):
+        archive, member = zip_match.groups()
+        if member and not GLOB_RE.search(member):
+            return archive, [member]
+        with zipfile.ZipFile(archive) as zip_file:
+            names = [name for name in zip_file.namelist() if not name.endswith("/")]
+        if member:
+            names = sorted(fnmatch.filter(names, member))
+        if not names:
+            raise ValueError(f"No member of {archive} matches {member or '*'}")
+        return archive, names
+
+    if not GLOB_RE.search(path):
+        return os.path.dirname(path) or ".", [os.path.basename(path)]
+
+    paths = sorted(
+        matched
+        for matched in glob.glob(path, recursive=True)
+        if os.path.isfile(matched)
+    )
+    if not paths:
+        raise ValueError(f"No file matches {path}")
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in paths])
+    return root, [os.path.relpath(os.path.abspath(p), root) for p in paths]
+
+
+def is_compressed(path) -> bool:
+    """
+    :return: whether the file is read through a decompressing stream: a
+        zip member, a gzip or a zstd file.
+    :rtype: bool
+    """
+    if isinstance(path, ZipFilePathPointer):
+        return True
+    return str(path).lower().endswith(GZIP_SUFFIXES + ZSTD_SUFFIXES)
+
+
+def open_decompressed(path) -> typing.BinaryIO:
+    """
+    :param path: path of the file, as a string or a `PathPointer`.
+    :return: a binary stream of the decompressed content of the file, read
+        chunk by chunk.
+    """
+    if isinstance(path, ZipFilePathPointer):
+        zip_file = zipfile.ZipFile(path.zipfile.filename)
+        try:
+            return _ClosingStream(zip_file.open(path.entry), zip_file)
+        except BaseException:
+            zip_file.close()
+            raise
+
+    lower_path = str(path).lower()
+    if lower_path.endswith(GZIP_SUFFIXES):
+        return gzip.open(path, "rb")
+    if lower_path.endswith(ZSTD_SUFFIXES):
+        import zstandard
+
+        return zstandard.ZstdDecompressor().stream_reader(
+            open(path, "rb"), read_across_frames=True, closefd=True
+        )
+    return open(path, "rb")
+
+
+class _ClosingStream(io.BufferedIOBase):
+    """
+    Stream of a zip member, which closes its archive with it.
+    """
+
+    def __init__(self, stream, zip_file):
+        self._stream = stream
+        self._zip_file = zip_file
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        return self._stream.read(size)
+
+    def readinto(self, buffer):
+        return self._stream.readinto(buffer)
+
+    def close(self):
+        if not self.closed:
+            self._stream.close()
+            self._zip_file.close()
+        super().close()
+
+
+class DecompressedStream:
+    r"""
+    Buffered binary stream of the decompressed content of a file, with the
+    `readline`, `read`, `tell` and `seek` of a corpus view stream.
+
+    Positions are offsets in the decompressed content. Seeking forward
+    decompresses and skips the content in between, seeking backward opens
+    the file again: reading sequentially is the efficient access.
+
+        >>> with DecompressedStream("stories.jsonl.gz") as stream:
+        ...     stream.readline()
+        b'{"by": "...", ...}\n'
+    """
+
+    def __init__(self, path, buffer_size=CHUNK_SIZE):
+        """
+        :param path: path of the file, as a string or a `PathPointer`.
+        """
+        self.path = path
+        self.buffer_size = buffer_size
+        self._stream = None
+        self._position = 0
+        self._open()
+
+    def _open(self):
+        self._stream = io.BufferedReader(
+            open_decompressed(self.path), buffer_size=self.buffer_size
+        )
+        self._position = 0
+
+    def readline(self, size=-1) -> bytes:
+        line = self._stream.readline(size)
+        self._position += len(line)
+        return line
+
+    def read(self, size=-1) -> bytes:
+        data = self._stream.read(size)
+        self._position += len(data)
+        return data
+
+    def at_eof(self) -> bool:
+        return not self._stream.peek(1)
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence != io.SEEK_SET:
+            raise ValueError("Decompressed streams only seek to absolute offsets")
+        if offset < self._position:
+            self._stream.close()
+            self._open()
+        while self._position < offset:
+            if not self.read(min(offset - self._position, self.buffer_size)):
+                break
+        return self._position
+
+    def close(self):
+        self._stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
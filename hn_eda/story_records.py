@@ -0,0 +1,258 @@
+import typing
+from array import array
+from pathlib import Path
+
+import numpy as np
+
+NUMERIC_FIELDS = ("id", "score", "descendants", "time")
+RECORD_DTYPE = np.dtype(
+    [
+        ("id", np.int64),
+        ("score", np.int32),
+        ("descendants", np.int32),
+        ("time", np.int64),
+        ("missing", np.uint8),
+    ]
+)
+"""Numeric fields of a Story, 0 where missing, and the missing fields as
+bit flags, bit `i` for the field `MISSING_FIELDS[i]`"""
+STRING_FIELDS = ("title", "url")
+MISSING_FIELDS = NUMERIC_FIELDS + STRING_FIELDS
+
+
+def _append_string(data: bytearray, offsets: array, string):
+    if string:
+        data += string if isinstance(string, bytes) else string.encode()
+    offsets.append(len(data))
+
+
+class StringArena:
+    r"""
+    Strings encoded in UTF-8 back to back in one byte array, the string `i`
+    spanning `data[offsets[i]:offsets[i + 1]]`.
+
+    A missing string is stored as an empty one, the records flagging
+    which of them are missing.
+    """
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.data[start:end].tobytes().decode()
+
+    def __iter__(self):
+        return (self[index] for index in range(len(self)))
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes + self.offsets.nbytes
+
+
+class StoryRecord:
+    """
+    View of one Story of `StoryRecords`, its fields read on access.
+    """
+
+    __slots__ = ("_records", "_index")
+
+    def __init__(self, records: "StoryRecords", index: int):
+        self._records = records
+        self._index = index
+
+    def __getitem__(self, name):
+        return self._records.field(name, self._index)
+
+    def get(self, name, default=None):
+        value = self[name]
+        return default if value is None else value
+
+    def __repr__(self):
+        return f"StoryRecord(id={self['id']}, title={self['title']!r})"
+
+
+class StoryRecords:
+    r"""
+    Compact in-memory Stories, instead of one dict per Story.
+
+    The numeric fields are held in a NumPy structured array of
+    `RECORD_DTYPE`, with flags of the missing ones, the titles and URLs in
+    string arenas, and the ids of the kids in one flat array, the kids of
+    Story `i` spanning `kid_offsets[i]:kid_offsets[i + 1]` of it. The
+    author, type and text fields are dropped. A Story takes its numeric
+    fields, its strings and 8 bytes per kid, where its dict takes tens of
+    bytes per kid and hundreds of bytes of objects.
+
+        >>> story_records = StoryRecords.from_stories(StoryCorpusReader().docs())
+        >>> story_records.records["score"].mean()
+        >>> story_records[0]["title"]
+        'The Curse of the Grandmaster Title'
+        >>> story_records.kids(0)
+        array([30017413, 30019097, ...])
+    """
+
+    def __init__(
+        self,
+        records: np.ndarray,
+        titles: StringArena,
+        urls: StringArena,
+        kids: np.ndarray,
+        kid_offsets: np.ndarray,
+    ):
+        """
+        :param records: the numeric fields of the Stories, of `RECORD_DTYPE`.
+        :param kids: the ids of the kids of all the Stories.
+        :param kid_offsets: the start of the kids of each Story in `kids`,
+            followed by the number of kids.
+        """
+        self.records = records
+        self.titles = titles
+        self.urls = urls
+        self._kids = kids
+        self.kid_offsets = kid_offsets
+
+    @classmethod
+    def from_stories(cls, stories: typing.Iterable[dict]):
+        """
+        Read the Stories in one pass, each one being released once copied.
+
+        :param stories: iterable of Stories, such as
+            `StoryCorpusReader().docs()`.
+        :rtype: StoryRecords
+        """
+        numeric_fields = {name: array("q") for name in NUMERIC_FIELDS}
+        missing = array("B")
+        string_fields = {name: (bytearray(), array("q", [0])) for name in STRING_FIELDS}
+        kids = array("q")
+        kid_offsets = array("q", [0])
+        for story in stories:
+            missing_flags = 0
+            for bit, (name, values) in enumerate(numeric_fields.items()):
+                value = story.get(name)
+                if value is None:
+                    missing_flags |= 1 << bit
+                    value = 0
+                values.append(int(value))
+            for bit, (name, (data, offsets)) in enumerate(
+                string_fields.items(), len(numeric_fields)
+            ):
+                string = story.get(name)
+                if string is None:
+                    missing_flags |= 1 << bit
+                _append_string(data, offsets, string)
+            missing.append(missing_flags)
+            kids.extend(story.get("kids") or ())
+            kid_offsets.append(len(kids))
+
+        records = np.empty(len(kid_offsets) - 1, dtype=RECORD_DTYPE)
+        for name, values in numeric_fields.items():
+            records[name] = np.frombuffer(values, dtype=np.int64)
+        records["missing"] = np.frombuffer(missing, dtype=np.uint8)
+        return cls(
+            records,
+            *(
+                StringArena(
+                    np.frombuffer(data, np.uint8), np.frombuffer(offsets, np.int64)
+                )
+                for data, offsets in string_fields.values()
+            ),
+            np.frombuffer(kids, dtype=np.int64),
+            np.frombuffer(kid_offsets, dtype=np.int64),
+        )
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index: int) -> StoryRecord:
+        if not -len(self) <= index < len(self):
+            raise IndexError("Story index out of range")
+        return StoryRecord(self, index % len(self))
+
+    def __iter__(self) -> typing.Iterator[StoryRecord]:
+        return (StoryRecord(self, index) for index in range(len(self)))
+
+    def field(self, name: str, index: int):
+        """
+        :return: one field of a Story, None where it is missing.
+        """
+        if name == "kids":
+            return self.kids(index).tolist()
+        if name not in MISSING_FIELDS:
+            raise KeyError(name)
+        if self.records["missing"][index] & (1 << MISSING_FIELDS.index(name)):
+            return None
+        if name in STRING_FIELDS:
+            return getattr(self, f"{name}s")[index]
+        return self.records[name][index].item()
+
+    def is_missing(self, name: str) -> np.ndarray:
+        """
+        :return: whether each Story misses the field, read as 0 in
+            `records` or as an empty string in the arenas.
+        :rtype: numpy.ndarray
+        """
+        bit = np.uint8(1 << MISSING_FIELDS.index(name))
+        return (self.records["missing"] & bit) != 0
+
+    def kids(self, index: int) -> np.ndarray:
+        """
+        :return: the ids of the kids of a Story, a view on the flat array.
+        :rtype: numpy.ndarray
+        """
+        return self._kids[self.kid_offsets[index] : self.kid_offsets[index + 1]]
+
+    def kid_counts(self) -> np.ndarray:
+        """
+        :return: the number of kids of each Story.
+        :rtype: numpy.ndarray
+        """
+        return np.diff(self.kid_offsets)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        :return: the size of the arrays of the Stories, in bytes.
+        :rtype: int
+        """
+        return (
+            self.records.nbytes
+            + self.titles.nbytes
+            + self.urls.nbytes
+            + self._kids.nbytes
+            + self.kid_offsets.nbytes
+        )
+
+    def save(self, file_path: typing.Union[str, Path]):
+        """
+        Save the Stories as a compressed NumPy archive.
+        """
+        with open(file_path, "wb") as records_file:
+            np.savez_compressed(
+                records_file,
+                records=self.records,
+                title_data=self.titles.data,
+                title_offsets=self.titles.offsets,
+                url_data=self.urls.data,
+                url_offsets=self.urls.offsets,
+                kids=self._kids,
+                kid_offsets=self.kid_offsets,
+            )
+
+    @classmethod
+    def load(cls, file_path: typing.Union[str, Path]):
+        """
+        :rtype: StoryRecords
+        """
+        with np.load(file_path, allow_pickle=False) as archive:
+            return cls(
+                archive["records"],
+                StringArena(archive["title_data"], archive["title_offsets"]),
+                StringArena(archive["url_data"], archive["url_offsets"]),
+                archive["kids"],
+                archive["kid_offsets"],
+            )
@@ -0,0 +1,175 @@
+import string
+import typing
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+from hn_eda.jsonl_writer import JsonlWriter
+from hn_eda.metric_state import UPPERCASE_SENTENCE_RE
+
+FIRST_ITEM_ID = 30_000_000
+FIRST_ITEM_TIME = 1_642_582_841
+HEAPS_BETA = 0.6
+ZIPF_EXPONENT = 1.0
+ZIPF_OFFSET = 2.7
+
+
+class TitleModel:
+    r"""
+    Generative model of story titles, fitted on real titles.
+
+    The number of words of a title follows the empirical distribution of
+    the real titles. Words are drawn from a Zipf-Mandelbrot distribution
+    over the real words, in decreasing order of frequency, followed by
+    pseudo-words: the vocabulary grows with the corpus following Heaps'
+    law, as in real data.
+
+        >>> model = TitleModel.from_titles(StoryCorpusReader().titles())
+        >>> model.sample_titles(np.random.default_rng(0), 3)
+        ['Show HN: ...', ...]
+    """
+
+    def __init__(
+        self,
+        title_word_counts: typing.Sequence[int],
+        words: typing.Sequence[str],
+        uppercase_proportion: float = 0.0,
+    ):
+        """
+        :param title_word_counts: number of words of each real title.
+        :param words: real words, most frequent first.
+        :param uppercase_proportion: proportion of uppercase titles.
+        """
+        self.title_word_counts = np.asarray(title_word_counts, dtype=np.int64)
+        self.words = list(words)
+        self.uppercase_proportion = uppercase_proportion
+
+        word_count = int(self.title_word_counts.sum())
+        self.heaps_k = len(self.words) / word_count**HEAPS_BETA
+
+    @classmethod
+    def from_titles(cls, titles: typing.Iterable[str]):
+        """
+        :rtype: TitleModel
+        """
+        title_word_counts = []
+        word_counts = Counter()
+        uppercase_count = 0
+        for title in titles:
+            title_words = title.split()
+            title_word_counts.append(len(title_words))
+            word_counts.update(title_words)
+            uppercase_count += UPPERCASE_SENTENCE_RE.match(title) is not None
+
+        return cls(
+            title_word_counts,
+            [word for word, _ in word_counts.most_common()],
+            uppercase_count / len(title_word_counts),
+        )
+
+    def vocabulary(self, rng: np.random.Generator, word_count: int) -> np.ndarray:
+        """
+        :return: the real words, followed by the pseudo-words needed for a
+            corpus of `word_count` words.
+        :rtype: numpy.ndarray
+        """
+        size = max(len(self.words), int(self.heaps_k * word_count**HEAPS_BETA))
+        word_lengths = np.fromiter(map(len, self.words), dtype=np.int64)
+        pseudo_lengths = rng.choice(word_lengths, size=size - len(self.words))
+        letters = np.array(list(string.ascii_lowercase))
+        pseudo_words = [
+            "".join(letters[rng.integers(0, len(letters), size=length)])
+            for length in pseudo_lengths
+        ]
+        return np.array(self.words + pseudo_words, dtype=object)
+
+    def sample_titles(self, rng: np.random.Generator, count: int) -> typing.List[str]:
+        """
+        :return: `count` titles drawn from the model.
+        :rtype: list(str)
+        """
+        title_word_counts = rng.choice(self.title_word_counts, size=count)
+        word_count = int(title_word_counts.sum())
+        vocabulary = self.vocabulary(rng, word_count)
+
+        weights = 1.0 / (np.arange(len(vocabulary)) + ZIPF_OFFSET) ** ZIPF_EXPONENT
+        word_ids = rng.choice(
+            len(vocabulary), size=word_count, p=weights / weights.sum()
+        )
+        words = vocabulary[word_ids].tolist()
+
+        is_uppercase = rng.random(count) < self.uppercase_proportion
+        titles = []
+        start = 0
+        for title_word_count, uppercase in zip(title_word_counts, is_uppercase):
+            title = " ".join(words[start : start + title_word_count])
+            titles.append(title.upper() if uppercase else title)
+            start += title_word_count
+        return titles
+
+
+def synthetic_stories(
+    count: int,
+    model: TitleModel,
+    seed: int = 0,
+    duplicate_proportion: float = 0.01,
+) -> typing.Iterator[dict]:
+    """
+    Generate stories shaped as the items of the Hacker News API, the same
+    for a given seed.
+
+    :param count: number of stories.
+    :param model: model of the titles.
+    :param duplicate_proportion: proportion of stories reusing the title of
+        an earlier story.
+    :return: an iterator of stories.
+    """
+    rng = np.random.default_rng(seed)
+    titles = model.sample_titles(rng, count)
+
+    duplicates = np.flatnonzero(rng.random(count) < duplicate_proportion)
+    duplicates = duplicates[duplicates > 0]
+    for index, source in zip(duplicates, rng.integers(0, duplicates)):
+        titles[index] = titles[source]
+
+    times = FIRST_ITEM_TIME + np.cumsum(rng.exponential(60.0, size=count)).astype(
+        np.int64
+    )
+    scores = rng.geometric(0.02, size=count)
+    descendants = rng.poisson(scores / 2)
+    kid_counts = np.minimum(descendants, rng.integers(0, 50, size=count))
+    kid_ids = FIRST_ITEM_ID + count + np.cumsum(kid_counts)
+    authors = rng.integers(0, count, size=count)
+
+    for index in range(count):
+        item_id = FIRST_ITEM_ID + index
+        yield {
+            "by": f"user{authors[index]}",
+            "descendants": int(descendants[index]),
+            "id": item_id,
+            "kids": list(
+                range(
+                    int(kid_ids[index] - kid_counts[index]),
+                    int(kid_ids[index]),
+                )
+            ),
+            "score": int(scores[index]),
+            "time": int(times[index]),
+            "title": titles[index],
+            "type": "story",
+            "url": f"https://example.com/{item_id}",
+        }
+
+
+def write_synthetic_corpus(
+    file_path: typing.Union[str, Path], count: int, model: TitleModel, seed: int = 0
+) -> int:
+    """
+    Write a synthetic corpus as JSON lines, or compressed after the suffix.
+
+    :return: the number of stories written.
+    :rtype: int
+    """
+    with JsonlWriter(file_path) as writer:
+        return writer.write_all(synthetic_stories(count, model, seed=seed))
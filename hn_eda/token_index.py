@@ -0,0 +1,332 @@
+import json
+import re
+import typing
+from pathlib import Path
+
+import numpy as np
+from nltk.text import ConcordanceLine
+
+from hn_eda.encoded_corpus import EncodedCorpus
+
+TOKEN_PATTERN_RE = re.compile(r"<([^>]*)>")
+WILDCARD = ".*"
+
+
+class TokenIndex:
+    r"""
+    Positional inverted index of the tokens of a corpus.
+
+    The positions of the tokens are grouped by token in one flat array, the
+    positions of the token with key id `k` spanning
+    `postings[posting_offsets[k]:posting_offsets[k + 1]]` in increasing
+    order. Lookups, concordances and token pattern queries read the
+    positions of the queried tokens only, instead of scanning the corpus
+    as `nltk.Text` does.
+
+        >>> token_index = TokenIndex.from_sentences(story_corpus.sentences())
+        >>> token_index.positions("Google")
+        array([  120,  2841, ...])
+        >>> token_index.findall("<.*><.*><Google>")
+        [('Why', 'I', 'Google'), ...]
+
+    With `casefold`, tokens are looked up regardless of their case.
+    """
+
+    def __init__(
+        self,
+        encoded_corpus: EncodedCorpus,
+        casefold: bool = False,
+        postings: np.ndarray = None,
+        posting_offsets: np.ndarray = None,
+    ):
+        """
+        :param encoded_corpus: the integer encoded tokens of the corpus.
+        :param casefold: index the casefolded tokens.
+        :param postings: the positions grouped by token, as saved by `save`;
+            computed when missing.
+        :param posting_offsets: the start of the positions of each token in
+            `postings`, followed by the number of tokens.
+        """
+        self.encoded_corpus = encoded_corpus
+        self.casefold = casefold
+        self.tokens = encoded_corpus.tokens()
+
+        if casefold:
+            self.keys = {}
+            key_of_token = np.fromiter(
+                (
+                    self.keys.setdefault(token.casefold(), len(self.keys))
+                    for token in self.tokens
+                ),
+                dtype=np.int32,
+                count=len(self.tokens),
+            )
+            self.key_ids = key_of_token[encoded_corpus.token_ids]
+        else:
+            self.keys = encoded_corpus.vocabulary
+            key_of_token = np.arange(len(self.tokens), dtype=np.int32)
+            self.key_ids = encoded_corpus.token_ids
+        self.key_of_token = key_of_token
+
+        if postings is None:
+            postings = np.argsort(self.key_ids, kind="stable")
+            posting_offsets = np.zeros(len(self.keys) + 1, dtype=np.int64)
+            np.cumsum(
+                np.bincount(self.key_ids, minlength=len(self.keys)),
+                out=posting_offsets[1:],
+            )
+        self.postings = postings
+        self.posting_offsets = posting_offsets
+        self._lowercase_token_ids = None
+
+    @classmethod
+    def from_sentences(
+        cls, sentences: typing.Iterable[typing.Sequence[str]], casefold=False
+    ):
+        """
+        :param sentences: the tokenized items.
+        :rtype: TokenIndex
+        """
+        return cls(EncodedCorpus.from_sentences(sentences), casefold=casefold)
+
+    def __len__(self):
+        return len(self.key_ids)
+
+    def __contains__(self, word):
+        return self._key(word) in self.keys
+
+    def _key(self, word):
+        return word.casefold() if self.casefold else word
+
+    def _key_positions(self, key_id):
+        start, stop = self.posting_offsets[key_id], self.posting_offsets[key_id + 1]
+        return self.postings[start:stop]
+
+    def positions(self, word: str, ignore_case: bool = False) -> np.ndarray:
+        """
+        :param ignore_case: match the tokens equal to the word once
+            lowercased, as `nltk.Text.concordance` does.
+        :return: the offsets of the word in the corpus, in increasing order.
+        :rtype: numpy.ndarray
+        """
+        if ignore_case:
+            return self._lowercase_positions(word)
+        key_id = self.keys.get(self._key(word))
+        if key_id is None:
+            return np.zeros(0, dtype=np.int64)
+        return self._key_positions(key_id)
+
+    def _lowercase_positions(self, word):
+        if self._lowercase_token_ids is None:
+            self._lowercase_token_ids = {}
+            for token_id, token in enumerate(self.tokens):
+                self._lowercase_token_ids.setdefault(token.lower(), []).append(token_id)
+        token_ids = np.array(
+            self._lowercase_token_ids.get(word.lower(), []), dtype=np.int64
+        )
+        key_ids = np.unique(self.key_of_token[token_ids])
+        positions = np.sort(
+            np.concatenate(
+                [self._key_positions(key_id) for key_id in key_ids.tolist()]
+                or [np.zeros(0, dtype=np.int64)]
+            )
+        )
+        if self.casefold:
+            # A casefolded key may also hold tokens of another lowercase
+            positions = positions[
+                np.isin(self.encoded_corpus.token_ids[positions], token_ids)
+            ]
+        return positions
+
+    def count(self, word: str, ignore_case: bool = False) -> int:
+        return len(self.positions(word, ignore_case))
+
+    def index(self, word: str) -> int:
+        """
+        :return: the offset of the first occurrence of the word.
+        :rtype: int
+        :raises ValueError: if the word is not in the corpus.
+        """
+        positions = self.positions(word)
+        if len(positions) == 0:
+            raise ValueError(f"{word!r} is not in the corpus")
+        return int(positions[0])
+
+    def token(self, position: int) -> str:
+        return self.tokens[self.encoded_corpus.token_ids[position]]
+
+    def item_indices(self, positions: np.ndarray) -> np.ndarray:
+        """
+        :return: the index of the item of each position.
+        :rtype: numpy.ndarray
+        """
+        return np.searchsorted(self.encoded_corpus.offsets, positions, side="right") - 1
+
+    def dispersion(self, words: typing.Sequence[str]) -> typing.Dict[str, np.ndarray]:
+        """
+        :return: the offsets of each word, as plotted by a dispersion plot.
+        :rtype: dict(str, numpy.ndarray)
+        """
+        return {word: self.positions(word) for word in words}
+
+    def concordance(
+        self, word: str, width: int = 79, lines: int = 25, ignore_case: bool = False
+    ) -> typing.List[ConcordanceLine]:
+        """
+        :param ignore_case: match the word regardless of its case, as
+            `nltk.Text.concordance_list` does.
+        :return: the keyword in context lines of the first occurrences of
+            the word, as `nltk.text.ConcordanceIndex.find_concordance`.
+        :rtype: list(ConcordanceLine)
+        """
+        half_width = (width - len(word) - 2) // 2
+        context = width // 4
+
+        concordance_lines = []
+        for position in self.positions(word, ignore_case)[:lines].tolist():
+            left = [
+                self.token(index)
+                for index in range(max(position - context, 0), position)
+            ]
+            right = [
+                self.token(index)
+                for index in range(position + 1, min(position + context, len(self)))
+            ]
+            query = self.token(position)
+            left_print = " ".join(left)[-half_width:]
+            right_print = " ".join(right)[:half_width]
+            concordance_lines.append(
+                ConcordanceLine(
+                    left,
+                    query,
+                    right,
+                    position,
+                    left_print,
+                    right_print,
+                    " ".join([left_print, query, right_print]),
+                )
+            )
+        return concordance_lines
+
+    def _element_key_mask(self, element):
+        """
+        :return: the key id of a literal token, or a boolean array of the
+            keys matching a regular expression.
+        """
+        if re.escape(element) == element:
+            return self.keys.get(self._key(element), -1)
+
+        flags = re.IGNORECASE if self.casefold else 0
+        regex = re.compile(element, flags)
+        token_mask = np.fromiter(
+            (regex.fullmatch(token) is not None for token in self.tokens),
+            dtype=bool,
+            count=len(self.tokens),
+        )
+        key_mask = np.zeros(len(self.keys), dtype=bool)
+        key_mask[self.key_of_token[token_mask]] = True
+        return key_mask
+
+    def findall(self, pattern: str) -> typing.List[typing.Tuple[str]]:
+        """
+        Find the sequences of tokens matching a pattern of one regular
+        expression per token, as `nltk.Text.findall`: `<.*><.*><Google>`.
+
+        The positions of the most selective element are looked up, and
+        the other elements are checked at their offsets from them.
+
+        :return: the matching sequences of tokens, in corpus order, without
+            overlap.
+        :rtype: list(tuple(str))
+        :raises ValueError: if the pattern is not a sequence of `<...>`.
+        """
+        elements = TOKEN_PATTERN_RE.findall(pattern)
+        if not elements or "".join(f"<{element}>" for element in elements) != (
+            re.sub(r"\s", "", pattern)
+        ):
+            raise ValueError(f"Unsupported token pattern {pattern!r}")
+
+        key_counts = np.diff(self.posting_offsets)
+        constraints = []
+        for offset, element in enumerate(elements):
+            if element == WILDCARD:
+                continue
+            key_mask = self._element_key_mask(element)
+            if isinstance(key_mask, int):
+                hit_count = key_counts[key_mask] if key_mask >= 0 else 0
+            else:
+                hit_count = key_counts[key_mask].sum()
+            constraints.append((hit_count, offset, key_mask))
+
+        if constraints:
+            constraints.sort(key=lambda constraint: constraint[0])
+            _, anchor_offset, anchor_mask = constraints[0]
+            if isinstance(anchor_mask, int):
+                if anchor_mask < 0:
+                    return []
+                anchor_positions = self._key_positions(anchor_mask)
+            else:
+                anchor_positions = np.sort(
+                    np.concatenate(
+                        [
+                            self._key_positions(key_id)
+                            for key_id in np.flatnonzero(anchor_mask)
+                        ]
+                        or [np.zeros(0, dtype=np.int64)]
+                    )
+                )
+            starts = anchor_positions - anchor_offset
+        else:
+            starts = np.arange(len(self))
+
+        starts = starts[(starts >= 0) & (starts <= len(self) - len(elements))]
+        for _, offset, key_mask in constraints[1:]:
+            key_ids = self.key_ids[starts + offset]
+            if isinstance(key_mask, int):
+                starts = starts[key_ids == key_mask]
+            else:
+                starts = starts[key_mask[key_ids]]
+
+        # Successive matches do not overlap, as with `re.findall`
+        matches = []
+        end = 0
+        for start in starts.tolist():
+            if start < end:
+                continue
+            end = start + len(elements)
+            matches.append(tuple(self.token(index) for index in range(start, end)))
+        return matches
+
+    def save(self, file_path: typing.Union[str, Path]):
+        """
+        Save the index as a compressed NumPy archive.
+        """
+        with open(file_path, "wb") as index_file:
+            np.savez_compressed(
+                index_file,
+                vocabulary=np.array(json.dumps(self.tokens)),
+                token_ids=self.encoded_corpus.token_ids,
+                offsets=self.encoded_corpus.offsets,
+                casefold=np.array(self.casefold),
+                postings=self.postings,
+                posting_offsets=self.posting_offsets,
+            )
+
+    @classmethod
+    def load(cls, file_path: typing.Union[str, Path]):
+        """
+        :rtype: TokenIndex
+        """
+        with np.load(file_path, allow_pickle=False) as archive:
+            tokens = json.loads(str(archive["vocabulary"]))
+            encoded_corpus = EncodedCorpus(
+                {token: token_id for token_id, token in enumerate(tokens)},
+                archive["token_ids"],
+                archive["offsets"],
+            )
+            return cls(
+                encoded_corpus,
+                casefold=bool(archive["casefold"]),
+                postings=archive["postings"],
+                posting_offsets=archive["posting_offsets"],
+            )
@@ -1,5 +1,8 @@
+import os
 import typing
 import re
+from hashlib import blake2b
+from concurrent.futures import ProcessPoolExecutor
 from nltk.tokenize.api import TokenizerI
 from nltk.tokenize.casual import _replace_html_entities
 import string
@@ -23,6 +26,14 @@ REGEXPS = (
     """,
 )
 
+PUNCTUATION = f"{re.escape(string.punctuation)}——–’‘“”×"
+"""Tokens starting with one of these characters are dropped"""
+
+CHUNK_SIZE = 5000
+"""Number of texts sent at once to a tokenizing process"""
+MIN_PARALLEL_SIZE = 50000
+"""Number of texts under which the process pool startup outweighs the gain"""
+
 
 class StoryTokenizer(TokenizerI):
     r"""
@@ -35,9 +46,10 @@ class StoryTokenizer(TokenizerI):
         ['SICP', 'JavaScript', 'Version', '2022', 'pdf']
     """
 
-    # Values used to lazily compile WORD_RE
+    # Values used to lazily compile WORD_RE and TOKEN_RE
     # which are the core tokenizing regexes.
     _WORD_RE = None
+    _TOKEN_RE = None
 
     def tokenize(self, text: str) -> typing.List[str]:
         """Tokenize the input text.
@@ -47,21 +59,28 @@ class StoryTokenizer(TokenizerI):
         :return: a tokenized list of strings; joining this list returns\
         the original string if `preserve_case=False`.
         """
-        # Fix HTML character entities:
-        safe_text = _replace_html_entities(text)
-
-        # Tokenize
-        words = self.WORD_RE.findall(safe_text)
-
-        # Remove punctuation
-        words = [
-            word
-            for word in words
-            if re.match(f"[{re.escape(string.punctuation)}——–’‘“”×]", word.casefold())
-            == None
-        ]
+        return self.tokenize_sents([text])[0]
 
-        return words
+    def tokenize_sents(
+        self, strings: typing.List[str]
+    ) -> typing.List[typing.List[str]]:
+        """Tokenize a batch of texts, sharing the compiled pattern lookup.
+        HTML character entities are only replaced in texts containing "&".
+
+        :param strings: list(str)
+        :rtype: list(list(str))
+        """
+        findall = self.TOKEN_RE.findall
+        return [
+            [
+                word
+                for word in findall(
+                    _replace_html_entities(text) if "&" in text else text
+                )
+                if word
+            ]
+            for text in strings
+        ]
 
     @property
     def WORD_RE(self) -> "re.Pattern":
@@ -73,3 +92,62 @@ class StoryTokenizer(TokenizerI):
                 re.VERBOSE | re.I | re.UNICODE,
             )
         return type(self)._WORD_RE
+
+    @property
+    def TOKEN_RE(self) -> "re.Pattern":
+        """StoryTokenizer regex dropping punctuation while matching.
+
+        A match starting with punctuation goes through the first branch,
+        which has no group, so `findall` returns an empty string for it.
+        """
+        if not type(self)._TOKEN_RE:
+            word_regex = "|".join(REGEXPS)
+            type(self)._TOKEN_RE = re.compile(
+                f"(?=[{PUNCTUATION}])(?:{word_regex})|({word_regex})",
+                re.VERBOSE | re.I | re.UNICODE,
+            )
+        return type(self)._TOKEN_RE
+
+    @property
+    def version(self) -> str:
+        """Digest of the tokenizing regex, which changes with the tokens."""
+        token_re = self.TOKEN_RE
+        return blake2b(
+            f"{type(self).__qualname__}:{token_re.flags}:{token_re.pattern}".encode(),
+            digest_size=8,
+        ).hexdigest()
+
+
+def tokenize_sents_parallel(
+    tokenizer: TokenizerI,
+    strings: typing.Iterable[str],
+    workers: int = None,
+    chunk_size: int = CHUNK_SIZE,
+    min_size: int = MIN_PARALLEL_SIZE,
+) -> typing.List[typing.List[str]]:
+    """Tokenize the texts by chunks across a process pool.
+    Falls back to `tokenizer.tokenize_sents` for a single worker or
+    fewer than `min_size` texts.
+
+    :param tokenizer: picklable tokenizer.
+    :param workers: number of processes, one per CPU by default.
+    :param chunk_size: number of texts per task.
+    :return: the tokenized texts, in the original order.
+    :rtype: list(list(str))
+    """
+    strings = list(strings)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers == 1 or len(strings) < max(min_size, chunk_size + 1):
+        return tokenizer.tokenize_sents(strings)
+
+    chunks = [
+        strings[start : start + chunk_size]
+        for start in range(0, len(strings), chunk_size)
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return [
+            tokens
+            for chunk_tokens in executor.map(tokenizer.tokenize_sents, chunks)
+            for tokens in chunk_tokens
+        ]
@@ -0,0 +1,71 @@
+import os
+import pickle
+import typing
+from functools import lru_cache
+from pathlib import Path
+
+import nltk
+from nltk.corpus import stopwords, words
+from nltk.data import ZipFilePathPointer
+
+from hn_eda.data_preparation import CACHE_DIR
+
+VOCABULARY_SNAPSHOT = CACHE_DIR / "vocabulary.pickle"
+
+
+def nltk_data_version(*corpus_names: str) -> str:
+    """
+    :return: a stamp of the NLTK version and of the files of the corpora,
+        read without loading them.
+    :rtype: str
+    """
+    stamps = [f"nltk-{nltk.__version__}"]
+    for corpus_name in corpus_names:
+        stamp = f"{corpus_name}-missing"
+        for resource in (f"corpora/{corpus_name}", f"corpora/{corpus_name}.zip"):
+            try:
+                path = nltk.data.find(resource)
+            except LookupError:
+                continue
+            if isinstance(path, ZipFilePathPointer):
+                path = path.zipfile.filename
+            stat = os.stat(path)
+            stamp = f"{resource}:{stat.st_size}:{stat.st_mtime_ns}"
+            break
+        stamps.append(stamp)
+    return ";".join(stamps)
+
+
+class Vocabulary(typing.NamedTuple):
+    words: typing.FrozenSet[str]
+    """Lowercased words of the NLTK words corpus"""
+    stop_words: typing.FrozenSet[str]
+    """English stop words"""
+
+
+@lru_cache(maxsize=None)
+def load_vocabulary(path: typing.Union[str, Path] = VOCABULARY_SNAPSHOT) -> Vocabulary:
+    """
+    Load the NLTK vocabulary and stop words from an on-disk snapshot,
+    built from the NLTK corpora on first use or when they changed, and
+    shared by the whole process.
+
+    :rtype: Vocabulary
+    """
+    path = Path(path)
+    version = nltk_data_version("words", "stopwords")
+
+    if path.exists():
+        with open(path, "rb") as snapshot_file:
+            snapshot = pickle.load(snapshot_file)
+        if snapshot["version"] == version:
+            return snapshot["vocabulary"]
+
+    vocabulary = Vocabulary(
+        words=frozenset(word.lower() for word in words.words()),
+        stop_words=frozenset(stopwords.words("english")),
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as snapshot_file:
+        pickle.dump({"version": version, "vocabulary": vocabulary}, snapshot_file)
+    return vocabulary
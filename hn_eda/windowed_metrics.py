@@ -0,0 +1,162 @@
+import typing
+
+from hn_eda.corpus_metrics import StreamingCorpusMetrics
+from hn_eda.metric_state import MetricState
+from hn_eda.near_duplicates import NearDuplicates
+from hn_eda.tokenizers import StoryTokenizer
+
+DAY = 24 * 60 * 60
+WEEK = 7 * DAY
+
+
+class WindowedMetrics:
+    r"""
+    Corpus metrics over time: the stories are partitioned by their `time`
+    epoch into buckets of `period` seconds, each accumulated into its own
+    `MetricState`.
+
+    The metrics of a bucket are read from its state. Those of a sliding
+    window of several buckets are read from a state updated bucket by
+    bucket: the newest bucket is merged into it and the oldest subtracted
+    from it, so that each story is accounted for twice at most, whatever
+    the size of the window.
+
+        >>> windowed_metrics = WindowedMetrics.from_corpus(StoryCorpusReader(), DAY)
+        >>> windowed_metrics.bucket_values("title", ["item_count"])
+        >>> windowed_metrics.window_values(7, "title", ["item_count"])
+    """
+
+    def __init__(
+        self,
+        period: int = DAY,
+        origin: int = 0,
+        tokenizer=StoryTokenizer(),
+        near_duplicates: NearDuplicates = None,
+        sign_titles: bool = True,
+    ):
+        """
+        :param period: duration of a bucket in seconds.
+        :param origin: epoch a bucket starts at, buckets being aligned on
+            the UTC midnights by default; weeks start on Thursdays then.
+        :param near_duplicates: near duplicate detection of the states.
+        :param sign_titles: sign the titles of the states, for the near
+            duplicate metric.
+        """
+        self.period = period
+        self.origin = origin
+        self.tokenizer = tokenizer
+        self.near_duplicates = near_duplicates or NearDuplicates()
+        self.sign_titles = sign_titles
+        self.buckets = {}
+
+    @classmethod
+    def from_corpus(cls, story_corpus, period: int = DAY, **kwargs):
+        """
+        :param story_corpus: a `StoryCorpusReader`.
+        :rtype: WindowedMetrics
+        """
+        windowed_metrics = cls(period, tokenizer=story_corpus.word_tokenizer, **kwargs)
+        for title, time in zip(
+            story_corpus.column("title"), story_corpus.column("time")
+        ):
+            if isinstance(title, bytes):
+                title = title.decode(story_corpus.encoding)
+            windowed_metrics.add(title, time)
+        return windowed_metrics
+
+    def bucket_start(self, time: int) -> int:
+        """
+        :return: the epoch the bucket of the time starts at.
+        :rtype: int
+        """
+        return time - (time - self.origin) % self.period
+
+    def add(self, title: str, time: int):
+        """
+        Account for one story in the state of its bucket.
+        """
+        start = self.bucket_start(time)
+        state = self.buckets.get(start)
+        if state is None:
+            state = self.buckets[start] = MetricState(
+                self.near_duplicates, self.sign_titles
+            )
+        state.add(title, self.tokenizer.tokenize(title))
+
+    def bucket_starts(self) -> typing.List[int]:
+        """
+        :return: the start of every bucket from the first to the last story,
+            the empty ones included.
+        :rtype: list(int)
+        """
+        if not self.buckets:
+            return []
+        return list(range(min(self.buckets), max(self.buckets) + 1, self.period))
+
+    def windows(
+        self, size: int
+    ) -> typing.Iterator[typing.Tuple[int, int, MetricState]]:
+        """
+        Slide a window of `size` buckets over the buckets, one bucket at a
+        time, starting with the window ending on the first bucket.
+
+        :return: the start and end epochs of each window with stories, and
+            its state. The state is updated in place by the next step, so
+            it is only valid until then.
+        :rtype: iterator(tuple(int, int, MetricState))
+        """
+        if size < 1:
+            raise ValueError("A window spans one bucket at least")
+        state = MetricState(self.near_duplicates, self.sign_titles)
+        starts = self.bucket_starts()
+        for index, start in enumerate(starts):
+            if start in self.buckets:
+                state.merge(self.buckets[start])
+            if index >= size and starts[index - size] in self.buckets:
+                state.subtract(self.buckets[starts[index - size]])
+            if state.item_count:
+                yield start - (size - 1) * self.period, start + self.period, state
+
+    def _values(self, states, item_name, metrics, lemma_cache):
+        """
+        :return: one row of metric values per window, indexed by its start.
+        :rtype: pandas.DataFrame
+        """
+        import pandas as pd
+
+        rows = {}
+        for start, end, state in states:
+            corpus_metrics = StreamingCorpusMetrics(
+                (), item_name, state=state, lemma_cache=lemma_cache
+            )
+            values = corpus_metrics.values(metrics)
+            rows[start] = dict(zip(values["Name"], values["Value"]))
+            lemma_cache = corpus_metrics.lemma_cache
+
+        values_df = pd.DataFrame.from_dict(rows, orient="index")
+        values_df.index = pd.to_datetime(values_df.index, unit="s", utc=True)
+        values_df.index.name = "start"
+        return values_df
+
+    def bucket_values(self, item_name, metrics=None, lemma_cache=None):
+        """
+        :param metrics: names of the metric methods to compute, every
+            metric by default.
+        :return: one row of metric values per bucket with stories.
+        :rtype: pandas.DataFrame
+        """
+        states = (
+            (start, start + self.period, self.buckets[start])
+            for start in sorted(self.buckets)
+        )
+        return self._values(states, item_name, metrics, lemma_cache)
+
+    def window_values(self, size: int, item_name, metrics=None, lemma_cache=None):
+        """
+        :param size: number of buckets of the sliding window, such as 7 for
+            a rolling week of daily buckets.
+        :return: one row of metric values per window with stories, indexed
+            by the start of the window.
+        :rtype: pandas.DataFrame
+        """
+        return self._values(self.windows(size), item_name, metrics, lemma_cache)
@@ -0,0 +1,74 @@
+from functools import partial
+
+from hn_eda.artifacts import ArtifactGraph
+
+BUILT_VALUES = []
+
+
+def words(text):
+    BUILT_VALUES.append(text)
+    return text.split()
+
+
+def write_words(path, words, separator):
+    path.write_text(separator.join(words))
+
+
+def plot_word_lengths(path, words):
+    from matplotlib import pyplot as plt
+
+    plt.bar(words, [len(word) for word in words])
+    plt.savefig(path)
+
+
+def word_graph(output_dir, content_key, separator="\n"):
+    graph = ArtifactGraph(output_dir, content_key)
+    graph.add("words", words, params={"text": "Show HN Rust"})
+    graph.add(
+        "word_list",
+        write_words,
+        requires=("words",),
+        params={"separator": separator},
+        output="words.txt",
+    )
+    graph.add(
+        "word_lengths",
+        plot_word_lengths,
+        requires=("words",),
+        output="word_lengths.png",
+        figure=True,
+    )
+    return graph
+
+
+def test_artifact_graph(tmp_path):
+    assert word_graph(tmp_path, "corpus").run(workers=1) == [
+        "word_list",
+        "word_lengths",
+    ]
+    assert (tmp_path / "words.txt").read_text() == "Show\nHN\nRust"
+    assert (tmp_path / "word_lengths.png").exists()
+    assert len(BUILT_VALUES) == 1
+
+    assert word_graph(tmp_path, "corpus").run(workers=1) == []
+    assert len(BUILT_VALUES) == 1
+
+    assert word_graph(tmp_path, "corpus", separator=" ").run(workers=1) == ["word_list"]
+    assert (tmp_path / "words.txt").read_text() == "Show HN Rust"
+
+    (tmp_path / "word_lengths.png").unlink()
+    graph = word_graph(tmp_path, "other corpus", separator=" ")
+    assert graph.key("word_list") != word_graph(tmp_path, "corpus").key("word_list")
+    assert graph.run(workers=1) == ["word_list", "word_lengths"]
+
+
+def test_partial_arguments_key(tmp_path):
+    graph = ArtifactGraph(tmp_path, "corpus")
+    other_graph = ArtifactGraph(tmp_path, "corpus")
+    graph.add("story_words", partial(words, "Show HN"))
+    other_graph.add("story_words", partial(words, "Ask HN"))
+    graph.add("object_words", partial(words, text=object()))
+    other_graph.add("object_words", partial(words, text=object()))
+
+    assert graph.key("story_words") != other_graph.key("story_words")
+    assert graph.key("object_words") == other_graph.key("object_words")
@@ -0,0 +1,65 @@
+import pytest
+from nltk.collocations import TrigramCollocationFinder
+from nltk.metrics import (
+    TrigramAssocMeasures,
+    ranks_from_scores,
+    spearman_correlation,
+)
+
+from hn_eda.collocations import TrigramCollocations
+from hn_eda.story_corpus import StoryCorpusReader
+
+WORDS = [word.lower() for word in StoryCorpusReader().words()]
+STOP_WORDS = {"the", "a", "of", "to", "and", "in", "for", "on", "with"}
+
+
+def word_filter(word):
+    return len(word) < 3 or word in STOP_WORDS
+
+
+@pytest.fixture(scope="module")
+def finders():
+    finder = TrigramCollocationFinder.from_words(WORDS)
+    finder.apply_freq_filter(min_freq=2)
+    finder.apply_word_filter(word_filter)
+
+    collocations = TrigramCollocations.from_words(WORDS, chunk_size=1000)
+    collocations.apply_freq_filter(min_freq=2)
+    collocations.apply_word_filter(word_filter)
+    return finder, collocations
+
+
+@pytest.mark.parametrize("measure", ["likelihood_ratio", "raw_freq", "pmi"])
+def test_scores(finders, measure):
+    finder, collocations = finders
+    score_fn = getattr(TrigramAssocMeasures, measure)
+    nltk_scores = dict(finder.score_ngrams(score_fn))
+    scores = dict(zip(collocations.ngrams(), collocations.scores(measure).tolist()))
+
+    assert scores == pytest.approx(nltk_scores)
+    assert collocations.nbest(measure, 15) == finder.nbest(score_fn, 15)
+
+
+def test_spearman_correlation(finders):
+    finder, collocations = finders
+    nltk_correlation = spearman_correlation(
+        ranks_from_scores(finder.score_ngrams(TrigramAssocMeasures.pmi)),
+        ranks_from_scores(finder.score_ngrams(TrigramAssocMeasures.raw_freq)),
+    )
+
+    assert collocations.spearman_correlation("pmi", "raw_freq") == pytest.approx(
+        nltk_correlation
+    )
+
+
+def test_chunks():
+    words = "a b c a b c a b d".split()
+    collocations = TrigramCollocations.from_words(words, chunk_size=2)
+
+    assert collocations.word_count() == 9
+    assert dict(zip(collocations.ngrams(), collocations.trigram_counts.tolist())) == {
+        ("a", "b", "c"): 2,
+        ("b", "c", "a"): 2,
+        ("c", "a", "b"): 2,
+        ("a", "b", "d"): 1,
+    }
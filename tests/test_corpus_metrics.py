@@ -1,8 +1,155 @@
+import pytest
+
 from hn_eda.story_corpus import StoryCorpusReader
-from hn_eda.corpus_metrics import CorpusMetrics
+from hn_eda.corpus_metrics import (
+    CorpusMetrics,
+    StreamingCorpusMetrics,
+    sharded_corpus_metrics,
+)
+from hn_eda.jsonl_writer import JsonlWriter
+from hn_eda.tokenizers import StoryTokenizer
 
 
 def test_load_corpus():
     story_corpus = StoryCorpusReader()
     corpus_metric = CorpusMetrics(corpus=story_corpus)
     metrics_df = corpus_metric.values()
+
+
+def test_streaming_metrics():
+    story_corpus = StoryCorpusReader()
+    metrics_df = CorpusMetrics(corpus=story_corpus, item_name="title").values()
+    streaming_metrics = StreamingCorpusMetrics(
+        story_corpus.iter_titles(), item_name="title"
+    )
+    assert streaming_metrics.values().equals(metrics_df)
+
+
+def test_sharded_metrics(tmp_path):
+    story_corpus = StoryCorpusReader()
+    stories = list(story_corpus.docs())
+    paths = []
+    for day, start in enumerate(range(0, len(stories), 150)):
+        path = tmp_path / f"day_{day}.jsonl"
+        with JsonlWriter(path) as writer:
+            writer.write_all(stories[start : start + 150])
+        paths.append(path)
+
+    metrics_df = CorpusMetrics(corpus=story_corpus, item_name="title").values()
+    sharded_metrics = sharded_corpus_metrics(paths, item_name="title", workers=2)
+    assert sharded_metrics.values().equals(metrics_df)
+
+
+def test_update(tmp_path):
+    story_corpus = StoryCorpusReader()
+    stories = list(story_corpus.docs())
+    path = tmp_path / "stories.jsonl"
+    with JsonlWriter(path) as writer:
+        writer.write_all(stories[:400])
+
+    corpus_metrics = CorpusMetrics(
+        corpus=StoryCorpusReader(path=path), item_name="title"
+    )
+    corpus_metrics.values()
+    corpus_metrics.update(stories[400:450]).update(stories[450:])
+
+    metrics_df = CorpusMetrics(corpus=story_corpus, item_name="title").values()
+    assert corpus_metrics.values().equals(metrics_df)
+
+
+def test_streaming_update():
+    story_corpus = StoryCorpusReader()
+    stories = list(story_corpus.docs())
+    streaming_metrics = StreamingCorpusMetrics(
+        (story["title"] for story in stories[:400]), item_name="title"
+    )
+    streaming_metrics.values()
+    streaming_metrics.update(stories[400:450]).update(stories[450:])
+
+    metrics_df = StreamingCorpusMetrics(
+        story_corpus.iter_titles(), item_name="title"
+    ).values()
+    assert streaming_metrics.values().equals(metrics_df)
+
+
+def test_unsigned_streaming_metrics():
+    streaming_metrics = StreamingCorpusMetrics(
+        StoryCorpusReader().iter_titles(), item_name="title", sign_titles=False
+    )
+
+    metric_names = [metric.__name__ for metric in streaming_metrics.metrics()]
+    assert "item_count" in metric_names
+    assert "near_duplicate_proportion" not in metric_names
+    with pytest.raises(ValueError):
+        streaming_metrics.values(["near_duplicate_proportion"])
+
+
+def test_selected_metrics():
+    story_corpus = StoryCorpusReader()
+    corpus_metrics = CorpusMetrics(corpus=story_corpus, item_name="title")
+    metrics_df = corpus_metrics.values(
+        metrics=["average_item_length", "item_count", "uppercase_item_proportion"]
+    )
+
+    assert list(metrics_df["Name"]) == ["Count", "Average length", "Uppercase items"]
+    assert metrics_df["Value"][0] == len(story_corpus.titles())
+    assert corpus_metrics._encoded_corpus is None
+    assert corpus_metrics._lemmatized_words is None
+
+    corpus_metrics.values(metrics=["token_count", "hapaxes_proportion"])
+    assert corpus_metrics._token_counts is not None
+    assert corpus_metrics._dictionary is None
+
+
+def test_required_intermediates():
+    corpus_metrics = CorpusMetrics(corpus=StoryCorpusReader(), item_name="title")
+    metrics = corpus_metrics.metrics(["numerical_frequency", "lexical_diversity"])
+
+    assert corpus_metrics.required_intermediates(metrics) == [
+        "sentences",
+        "dictionary",
+        "lemmas",
+        "oov",
+    ]
+    with pytest.raises(ValueError):
+        corpus_metrics.metrics(["lemmas"])
+
+
+class TitleCorpus:
+    def __init__(self, titles):
+        self._titles = titles
+
+    def titles(self):
+        return self._titles
+
+
+def test_title_features():
+    corpus_metrics = CorpusMetrics(
+        corpus=TitleCorpus(
+            ["Show HN: GPT in 200 lines", "ASK HN", "Show HN: GPT in 200 lines"]
+        ),
+        item_name="title",
+    )
+    title_features = corpus_metrics.title_features()
+
+    assert title_features["length"].tolist() == [25, 6, 25]
+    assert title_features["is_uppercase"].tolist() == [False, True, False]
+    assert title_features["uppercased_token_count"].tolist() == [2, 0, 2]
+    assert title_features["is_duplicate"].tolist() == [False, False, True]
+    assert corpus_metrics.duplicate_proportion() == 1 / 3
+    assert corpus_metrics.uppercase_item_proportion() == 1 / 2
+    assert corpus_metrics.uppercased_tokens() == ["HN", "GPT"]
+
+
+def test_update_title_metrics():
+    titles = ["Show HN: GPT in 200 lines", "ASK HN", "Show HN: GPT in 200 lines"]
+    metrics = ["item_count", "median_item_length", "uppercase_item_proportion"]
+    corpus_metrics = CorpusMetrics(corpus=TitleCorpus(titles[:2]), item_name="title")
+    corpus_metrics.values(metrics=["item_count", "median_item_length"])
+    corpus_metrics.update([{"title": titles[2]}], tokenizer=StoryTokenizer())
+
+    assert corpus_metrics.values(metrics).equals(
+        CorpusMetrics(corpus=TitleCorpus(titles), item_name="title").values(metrics)
+    )
+    assert corpus_metrics.titles() == titles
+    assert corpus_metrics.unique_sentence_count() == 2
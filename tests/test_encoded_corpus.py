@@ -0,0 +1,41 @@
+import numpy as np
+
+from hn_eda.encoded_corpus import EncodedCorpus
+from hn_eda.story_corpus import StoryCorpusReader
+
+
+def test_from_sentences():
+    encoded = EncodedCorpus.from_sentences([("Show", "HN"), (), ("HN", "Rust")])
+
+    assert encoded.vocabulary == {"Show": 0, "HN": 1, "Rust": 2}
+    assert encoded.token_ids.dtype == np.int32
+    assert encoded.token_ids.tolist() == [0, 1, 1, 2]
+    assert encoded.offsets.tolist() == [0, 2, 2, 4]
+    assert encoded.counts().tolist() == [1, 2, 1]
+    assert encoded.item_lengths().tolist() == [2, 0, 2]
+    assert encoded.sentence(2) == ("HN", "Rust")
+    assert encoded.token_mask(str.isupper).tolist() == [False, True, False]
+
+
+def test_extend():
+    encoded = EncodedCorpus.from_sentences([("Show", "HN")])
+    assert encoded.sentence(0) == ("Show", "HN")
+    new_token_ids = encoded.extend([("HN", "Rust"), ()])
+
+    assert new_token_ids.tolist() == [1, 2]
+    assert encoded.vocabulary == {"Show": 0, "HN": 1, "Rust": 2}
+    assert encoded.token_ids.tolist() == [0, 1, 1, 2]
+    assert encoded.offsets.tolist() == [0, 2, 4, 4]
+    assert encoded.sentence(1) == ("HN", "Rust")
+    assert encoded.extend([("Ask", "Show")]).tolist() == [3, 0]
+    assert encoded.sentence(3) == ("Ask", "Show")
+    assert encoded.tokens() == ["Show", "HN", "Rust", "Ask"]
+
+
+def test_encode_story_corpus():
+    story_corpus = StoryCorpusReader()
+    encoded = EncodedCorpus.from_sentences(story_corpus.sentences())
+
+    assert len(encoded) == len(story_corpus.sentences())
+    assert encoded.sentence(1) == story_corpus.sentences()[1]
+    assert encoded.counts().sum() == len(story_corpus.words())
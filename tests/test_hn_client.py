@@ -0,0 +1,96 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from hn_eda.data_preparation import fetch_items, save_topstories_as_zip
+from hn_eda.hn_client import HackerNewsClient
+from hn_eda.item_store import ItemStore
+from hn_eda.story_corpus import StoryCorpusReader
+
+STORIES = {
+    item_id: {"id": item_id, "title": f"Story {item_id}", "score": item_id % 7}
+    for item_id in range(100, 140)
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    failures = {}
+    requested_paths = []
+
+    def do_GET(self):
+        self.requested_paths.append(self.path)
+        if self.path == "/topstories.json":
+            return self._send(list(STORIES))
+
+        item_id = int(self.path.split("/")[-1].split(".")[0])
+        if self.failures.get(item_id, 0) > 0:
+            self.failures[item_id] -= 1
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        return self._send(STORIES[item_id])
+
+    def _send(self, document):
+        body = json.dumps(document).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_api():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_items_keep_topstories_order(stub_api):
+    with HackerNewsClient(base_url=stub_api, max_workers=8) as client:
+        ids = client.topstories()
+        items = client.items(ids, progress=False)
+
+    assert ids == list(STORIES)
+    assert items == list(STORIES.values())
+
+
+def test_item_is_retried(stub_api):
+    StubHandler.failures = {101: 2}
+    with HackerNewsClient(base_url=stub_api, backoff_factor=0) as client:
+        assert client.item(101) == STORIES[101]
+    assert StubHandler.failures[101] == 0
+
+
+def test_save_topstories_as_zip(stub_api, tmp_path):
+    file_path = tmp_path / "hn_topstories.zip"
+    with HackerNewsClient(base_url=stub_api) as client:
+        count = save_topstories_as_zip(client, file_path)
+
+    assert count == len(STORIES)
+    story_corpus = StoryCorpusReader(path=file_path / "hn_topstories.jsonl")
+    assert list(story_corpus.docs()) == list(STORIES.values())
+
+
+def test_fetch_items_only_queries_missing_items(stub_api):
+    ids = list(STORIES)
+    with HackerNewsClient(base_url=stub_api) as client, ItemStore() as store:
+        store.put([STORIES[item_id] for item_id in ids[:30]])
+        StubHandler.requested_paths.clear()
+
+        items = fetch_items(client, ids, store=store)
+
+    assert items == list(STORIES.values())
+    assert sorted(StubHandler.requested_paths) == sorted(
+        f"/item/{item_id}.json" for item_id in ids[30:]
+    )
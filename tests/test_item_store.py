@@ -0,0 +1,22 @@
+from hn_eda.item_store import ItemStore
+
+
+def test_put_and_get():
+    with ItemStore() as store:
+        store.put([{"id": 2, "title": "b"}, {"id": 1, "title": "a"}, None])
+
+        assert len(store) == 2
+        assert 1 in store
+        assert store.get([1, 3, 2]) == [
+            {"id": 1, "title": "a"},
+            {"id": 2, "title": "b"},
+        ]
+
+
+def test_stale_ids():
+    with ItemStore() as store:
+        store.put([{"id": 1}], fetched_at=1000.0)
+        store.put([{"id": 2}], fetched_at=1900.0)
+
+        assert store.stale_ids([3, 2, 1], max_age=500, now=2000.0) == [3, 1]
+        assert store.fetched_at([1, 2]) == {1: 1000.0, 2: 1900.0}
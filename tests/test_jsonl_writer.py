@@ -0,0 +1,44 @@
+import gzip
+import json
+import zipfile
+
+import pytest
+
+from hn_eda.jsonl_writer import JsonlWriter
+from hn_eda.story_corpus import StoryCorpusReader
+
+STORIES = [
+    {"id": i, "title": f"Show HN: Story {i}", "kids": [i, i + 1]} for i in range(25)
+]
+
+
+def _read_lines(file_path):
+    if file_path.suffix == ".gz":
+        with gzip.open(file_path, "rt", encoding="utf-8") as json_file:
+            return [json.loads(line) for line in json_file]
+    if file_path.suffix == ".zip":
+        with zipfile.ZipFile(file_path) as archive:
+            lines = archive.read(f"{file_path.stem}.jsonl").decode("utf-8").splitlines()
+            return [json.loads(line) for line in lines]
+    return [json.loads(line) for line in file_path.read_text("utf-8").splitlines()]
+
+
+@pytest.mark.parametrize(
+    "file_name", ["stories.jsonl", "stories.jsonl.gz", "stories.zip"]
+)
+def test_write_all(tmp_path, file_name):
+    file_path = tmp_path / file_name
+    with JsonlWriter(file_path, buffer_size=10) as writer:
+        count = writer.write_all(STORIES + [None])
+
+    assert count == len(STORIES)
+    assert _read_lines(file_path) == STORIES
+
+
+def test_zip_export_is_readable_by_story_corpus(tmp_path):
+    file_path = tmp_path / "stories.zip"
+    with JsonlWriter(file_path, buffer_size=7) as writer:
+        writer.write_all(STORIES)
+
+    story_corpus = StoryCorpusReader(path=file_path / "stories.jsonl")
+    assert story_corpus.titles() == [story["title"] for story in STORIES]
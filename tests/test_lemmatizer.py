@@ -0,0 +1,24 @@
+import json
+
+from hn_eda.lemmatizer import LemmaCache
+
+
+def test_lemmatize_words(tmp_path):
+    cache_path = tmp_path / "lemmas.json"
+    lemma_cache = LemmaCache(cache_path)
+
+    assert lemma_cache.lemmatize_words(["Dogs", "dogs", "running"]) == {"dog", "run"}
+    assert lemma_cache.new_lemma_count == 2
+    lemma_cache.save()
+
+    reloaded_cache = LemmaCache(cache_path)
+    assert reloaded_cache.lemmas == {"dogs": "dog", "running": "run"}
+    assert reloaded_cache.lemmatize_words(["DOGS"]) == {"dog"}
+    assert reloaded_cache.new_lemma_count == 0
+
+
+def test_stale_cache_is_ignored(tmp_path):
+    cache_path = tmp_path / "lemmas.json"
+    cache_path.write_text(json.dumps({"version": "old", "lemmas": {"dogs": "cat"}}))
+
+    assert LemmaCache(cache_path).lemmas == {}
@@ -0,0 +1,149 @@
+import json
+import math
+import random
+import statistics
+from collections import Counter
+
+import pytest
+
+from hn_eda.metric_state import (
+    MetricState,
+    RunningMoments,
+    median_from_counts,
+    title_hash,
+)
+from hn_eda.near_duplicates import NearDuplicates
+from hn_eda.story_corpus import StoryCorpusReader
+from hn_eda.tokenizers import StoryTokenizer
+
+
+@pytest.mark.parametrize("values", [[7], [3, 1, 4, 1, 5], [2, 9, 4, 4, 8, 1]])
+def test_median_from_counts(values):
+    assert median_from_counts(Counter(values)) == statistics.median(values)
+
+
+def test_running_moments():
+    values = [49, 7, 81, 51, 33, 60, 12]
+    moments = RunningMoments()
+    for value in values:
+        moments.add(value)
+
+    assert moments.count == len(values)
+    assert moments.mean == pytest.approx(statistics.mean(values))
+    assert moments.std() == pytest.approx(statistics.stdev(values))
+
+    for value in values[:4]:
+        moments.remove(value)
+    assert moments.count == 3
+    assert moments.mean == pytest.approx(statistics.mean(values[4:]))
+    assert moments.std() == pytest.approx(statistics.stdev(values[4:]))
+
+    for value in values[4:6]:
+        moments.remove(value)
+    assert moments.mean == values[6]
+    assert math.isnan(moments.std())
+
+
+def test_running_moments_removal():
+    rng = random.Random(0)
+    for _ in range(200):
+        values = [rng.randint(1, 200) for _ in range(rng.randint(2, 30))]
+        moments = RunningMoments()
+        for value in values:
+            moments.add(value)
+        kept = rng.randint(2, len(values))
+        for value in values[kept:]:
+            moments.remove(value)
+
+        assert moments.std() == pytest.approx(statistics.stdev(values[:kept]))
+
+
+def test_metric_state():
+    titles = ["Show HN: My NAS", "ASK HN: WHY?", "Show HN: My NAS", "Rust 1.58"]
+    state = MetricState.from_titles(titles, StoryTokenizer())
+
+    assert state.item_count == 4
+    assert state.unique_item_count() == 3
+    assert state.uppercase_item_count == 1
+    assert state.uppercased_token_count == 2
+    assert state.token_counts["HN"] == 3
+    assert state.length_statistics().maximum == len("Show HN: My NAS")
+    assert title_hash("Rust 1.58") == title_hash("Rust 1.58")
+
+
+def test_merge_shards():
+    tokenizer = StoryTokenizer()
+    titles = StoryCorpusReader().titles()
+    titles = titles + titles[:50]
+    state = MetricState.from_titles(titles, tokenizer)
+
+    shards = [titles[:200], titles[200:400], titles[400:]]
+    merged = MetricState()
+    for shard in shards:
+        shard_state = MetricState.from_titles(shard, tokenizer)
+        merged.merge(
+            MetricState.from_dict(json.loads(json.dumps(shard_state.to_dict())))
+        )
+
+    assert merged.item_count == state.item_count == 550
+    assert merged.titles == state.titles
+    assert merged.token_counts == state.token_counts
+    assert merged.uppercase_item_count == state.uppercase_item_count
+    assert merged.uppercased_token_count == state.uppercased_token_count
+    assert merged.length_statistics() == pytest.approx(state.length_statistics())
+    assert len(set(merged.near_duplicate_labels())) == len(
+        set(state.near_duplicate_labels())
+    )
+
+
+@pytest.mark.parametrize(
+    "near_duplicates", [NearDuplicates(seed=2), NearDuplicates(num_perm=64)]
+)
+def test_merge_other_parameters(near_duplicates):
+    tokenizer = StoryTokenizer()
+    state = MetricState.from_titles(["Show HN: My NAS"], tokenizer)
+    other_state = MetricState.from_titles(
+        ["Rust 1.58"], tokenizer, near_duplicates=near_duplicates
+    )
+
+    with pytest.raises(ValueError):
+        state.merge(other_state)
+    assert state.item_count == 1
+
+
+def test_unsigned_titles():
+    tokenizer = StoryTokenizer()
+    titles = ["Show HN: My NAS", "ASK HN: WHY?", "Rust 1.58"]
+    state = MetricState.from_titles(titles[:2], tokenizer, sign_titles=False)
+    other_state = MetricState.from_titles(titles[2:], tokenizer, sign_titles=False)
+
+    assert not state._signatures and not state._pending_titles
+    with pytest.raises(ValueError):
+        state.signatures()
+    with pytest.raises(ValueError):
+        MetricState().merge(other_state)
+
+    state.merge(MetricState.from_titles(titles[2:], tokenizer))
+    state.subtract(other_state)
+    loaded_state = MetricState.from_dict(json.loads(json.dumps(state.to_dict())))
+    assert not loaded_state.sign_titles
+    assert loaded_state.titles == state.titles
+
+
+def test_subtract():
+    tokenizer = StoryTokenizer()
+    titles = ["Show HN: My NAS", "ASK HN: WHY?", "Rust 1.58", "Show HN: My NAS"]
+    state = MetricState.from_titles(titles, tokenizer)
+    state.subtract(MetricState.from_titles(titles[:2], tokenizer))
+    expected = MetricState.from_titles(titles[2:], tokenizer)
+
+    assert state.item_count == 2
+    assert state.titles == expected.titles
+    assert state.title_counts == expected.title_counts
+    assert state.token_counts == expected.token_counts
+    assert state.uppercase_item_count == expected.uppercase_item_count == 0
+    assert state.length_statistics() == pytest.approx(expected.length_statistics())
+    assert len(state.signatures()[0]) == 2
+
+    with pytest.raises(ValueError):
+        state.subtract(MetricState.from_titles(["Go 1.18"], tokenizer))
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from hn_eda.near_duplicates import NearDuplicates, lsh_parameters
+
+TITLES = [
+    "Show HN: A tiny SQLite clone written in Rust",
+    "Why the JVM is still relevant in 2022",
+    "Show HN: a tiny SQLite clone, written in Rust",
+    "Show HN: A tiny SQLite clone written in Rust (2021)",
+    "Why the JVM is still relevant in 2022",
+    "Rust",
+]
+
+
+def jaccard(first, second, size=5):
+    def shingles(title):
+        title = " ".join(title.casefold().split()).encode("utf-8")
+        return {title[i : i + size] for i in range(len(title) - size + 1)}
+
+    return len(shingles(first) & shingles(second)) / len(
+        shingles(first) | shingles(second)
+    )
+
+
+def test_lsh_parameters():
+    bands, rows = lsh_parameters(0.8, 128)
+
+    assert bands * rows == 128
+    assert (1 / bands) ** (1 / rows) <= 0.8
+
+
+def test_signatures():
+    near_duplicates = NearDuplicates(num_perm=256)
+    signatures = near_duplicates.signatures(TITLES)
+
+    assert signatures.shape == (6, 256)
+    assert (signatures[1] == signatures[4]).all()
+    for first, second in [(0, 2), (0, 3), (0, 1)]:
+        similarity = np.mean(signatures[first] == signatures[second])
+        assert similarity == pytest.approx(
+            jaccard(TITLES[first], TITLES[second]), abs=0.1
+        )
+
+
+def test_clusters():
+    assert NearDuplicates(threshold=0.95).clusters(TITLES) == [[1, 4]]
+    assert NearDuplicates(threshold=0.7).clusters(TITLES) == [[0, 2, 3], [1, 4]]
+
+
+def test_labels_order():
+    near_duplicates = NearDuplicates(threshold=0.6)
+    titles = list(dict.fromkeys(TITLES))
+    keys = np.arange(len(titles), dtype=np.uint64)[::-1]
+    labels = near_duplicates.labels(near_duplicates.signatures(titles), keys)
+    reversed_labels = near_duplicates.labels(
+        near_duplicates.signatures(titles[::-1]), keys[::-1]
+    )
+
+    assert (labels == labels[0]).tolist() == [True, False, True, True, False]
+    assert (
+        np.asarray(titles)[labels] == np.asarray(titles[::-1])[reversed_labels][::-1]
+    ).all()
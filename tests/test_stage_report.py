@@ -0,0 +1,45 @@
+import tracemalloc
+
+from hn_eda.corpus_metrics import CorpusMetrics
+from hn_eda.stage_report import StageReport
+from hn_eda.story_corpus import StoryCorpusReader
+
+
+def test_stage_report():
+    measures = []
+    report = StageReport(trace_memory=True, callback=measures.append)
+    corpus_metrics = CorpusMetrics(
+        StoryCorpusReader(), item_name="title", report=report
+    )
+    corpus_metrics.values(metrics=["item_count", "average_item_length"])
+
+    assert measures == report.measures
+    assert [(measure.stage, measure.kind) for measure in report.measures] == [
+        ("titles", "intermediate"),
+        ("title_features", "intermediate"),
+        ("items", "intermediate"),
+        ("lengths", "intermediate"),
+        ("item_count", "metric"),
+        ("average_item_length", "metric"),
+    ]
+    assert report.measures[0].item_count == 500
+    assert report.measures[1].peak_memory > 0
+    assert report.total_seconds() > 0
+    assert list(report.to_frame()["stage"])[0] == "titles"
+
+
+def test_outer_tracer_peak():
+    tracemalloc.start()
+    try:
+        buffer = bytearray(1 << 22)
+        del buffer
+        outer_peak = tracemalloc.get_traced_memory()[1]
+
+        report = StageReport(trace_memory=True)
+        report.measure("small", "intermediate", lambda: bytearray(1 << 16))
+        assert tracemalloc.get_traced_memory()[1] >= outer_peak
+        assert 0 < report.measures[0].peak_memory < 1 << 20
+        report.measure("large", "intermediate", lambda: len(bytearray(1 << 23)))
+        assert report.measures[1].peak_memory >= 1 << 23
+    finally:
+        tracemalloc.stop()
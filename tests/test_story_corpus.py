@@ -0,0 +1,146 @@
+import gzip
+import json
+import zipfile
+
+import pytest
+from nltk.tokenize import WhitespaceTokenizer
+
+from hn_eda.data_preparation import save_as_parquet
+from hn_eda.line_index import index_path, line_offsets, load_line_index
+from hn_eda.story_corpus import StoryCorpusReader
+
+
+def test_parquet_backend(tmp_path):
+    pytest.importorskip("pyarrow")
+    story_corpus = StoryCorpusReader()
+    file_path = tmp_path / "stories.parquet"
+    assert save_as_parquet(story_corpus.docs(), file_path, batch_size=64) == 500
+
+    parquet_corpus = StoryCorpusReader(path=file_path)
+    assert parquet_corpus.titles() == story_corpus.titles()
+    assert parquet_corpus.times() == story_corpus.times()
+    assert parquet_corpus.scores() == story_corpus.scores()
+    assert parquet_corpus.docs()[3] == story_corpus.docs()[3]
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        StoryCorpusReader(backend="csv")
+
+
+def test_line_index(tmp_path):
+    file_path = tmp_path / "stories.jsonl"
+    file_path.write_bytes(b'{"title": "a"}\n{"title": "b"}\n{"title": "c"}')
+    with open(file_path, "rb") as stream:
+        offsets = line_offsets(stream, chunk_size=4)
+    assert list(offsets) == [0, 15, 30, 44]
+
+    assert list(load_line_index(str(file_path))) == list(offsets)
+    assert index_path(str(file_path)).exists()
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 1000])
+def test_indexed_docs(tmp_path, block_size):
+    stories = list(StoryCorpusReader().docs())
+    file_path = tmp_path / "stories.jsonl"
+    file_path.write_text("".join(json.dumps(story) + "\n" for story in stories))
+
+    story_corpus = StoryCorpusReader(
+        path=file_path, block_size=block_size, line_index=True
+    )
+    docs = story_corpus.docs()
+    assert len(docs) == len(stories)
+    assert docs[437] == stories[437]
+    assert list(docs[123:321]) == stories[123:321]
+    assert list(story_corpus.shard(2, 3)) == stories[333:]
+    assert list(docs) == stories
+
+
+def write_compressed(file_path, content: bytes):
+    if file_path.suffix == ".gz":
+        file_path.write_bytes(gzip.compress(content))
+    elif file_path.suffix == ".zst":
+        zstandard = pytest.importorskip("zstandard")
+        file_path.write_bytes(zstandard.ZstdCompressor().compress(content))
+    else:
+        with zipfile.ZipFile(file_path, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            zip_file.writestr("stories.jsonl", content)
+
+
+@pytest.mark.parametrize(
+    "file_name", ["stories.jsonl.gz", "stories.jsonl.zst", "dump.zip"]
+)
+def test_compressed_docs(tmp_path, file_name):
+    stories = list(StoryCorpusReader().docs())
+    file_path = tmp_path / file_name
+    write_compressed(
+        file_path, "".join(json.dumps(story) + "\n" for story in stories).encode()
+    )
+
+    story_corpus = StoryCorpusReader(path=file_path, block_size=7)
+    docs = story_corpus.docs()
+    assert list(docs) == stories
+    assert len(docs) == len(stories)
+    assert docs[437] == stories[437]
+    assert docs[3] == stories[3]
+    assert list(story_corpus.shard(2, 3)) == stories[333:]
+    assert list(story_corpus.iter_titles()) == story_corpus.titles()
+
+    if file_path.suffix != ".zip":
+        with pytest.raises(ValueError):
+            StoryCorpusReader(path=file_path, line_index=True)
+
+
+def test_glob_pattern(tmp_path):
+    stories = list(StoryCorpusReader().docs())
+    (tmp_path / "2022").mkdir()
+    for day, start in enumerate(range(0, len(stories), 200)):
+        lines = "".join(
+            json.dumps(story) + "\n" for story in stories[start : start + 200]
+        )
+        write_compressed(tmp_path / "2022" / f"day_{day}.jsonl.gz", lines.encode())
+    (tmp_path / "2022" / "empty.jsonl.gz").write_bytes(gzip.compress(b""))
+
+    story_corpus = StoryCorpusReader(path=tmp_path / "**" / "*.jsonl.gz")
+    assert story_corpus.fileids() == [
+        "day_0.jsonl.gz",
+        "day_1.jsonl.gz",
+        "day_2.jsonl.gz",
+        "empty.jsonl.gz",
+    ]
+    assert list(story_corpus.docs()) == stories
+
+    with pytest.raises(ValueError):
+        StoryCorpusReader(path=tmp_path / "*.parquet")
+
+
+def test_memoized_sentences():
+    story_corpus = StoryCorpusReader()
+    sentences = story_corpus.sentences()
+
+    assert story_corpus.sentences() is sentences
+    assert list(story_corpus.iter_sentences()) == sentences
+    assert story_corpus.words() == list(story_corpus.iter_words())
+    assert story_corpus.words()[:6] == [
+        "The",
+        "Curse",
+        "of",
+        "the",
+        "Grandmaster",
+        "Title",
+    ]
+
+    story_corpus.word_tokenizer = WhitespaceTokenizer()
+    assert story_corpus.sentences() is not sentences
+    assert story_corpus.sentences()[0] == tuple(story_corpus.titles()[0].split())
+
+
+def test_content_hash(tmp_path):
+    file_path = tmp_path / "stories.jsonl"
+    file_path.write_bytes(b'{"title": "a"}\n{"title": "b"}\n')
+    content_hash = StoryCorpusReader(path=file_path).content_hash()
+    assert StoryCorpusReader(path=file_path).content_hash() == content_hash
+
+    file_path.write_bytes(b'{"title": "a"}\n{"title": "c"}\n')
+    assert StoryCorpusReader(path=file_path).content_hash() != content_hash
+    assert len(StoryCorpusReader().content_hash()) == 32
@@ -0,0 +1,81 @@
+import pytest
+
+from hn_eda.story_corpus import StoryCorpusReader
+from hn_eda.story_records import StoryRecords
+
+STORIES = [
+    {
+        "id": 1,
+        "score": 18,
+        "descendants": 10.0,
+        "time": 1642719996,
+        "title": "Show HN: Rust",
+        "url": "https://example.com/rust",
+        "kids": [11, 12, 13],
+    },
+    {"id": 2, "time": 1642720000, "title": "Ask HN: Café?"},
+    {
+        "id": 3,
+        "score": 1,
+        "descendants": 0,
+        "time": 1642720010,
+        "title": "C",
+        "kids": [31],
+    },
+]
+
+
+def test_from_stories():
+    story_records = StoryRecords.from_stories(iter(STORIES))
+
+    assert len(story_records) == 3
+    assert story_records.records["score"].tolist() == [18, 0, 1]
+    assert story_records[1]["score"] is None
+    assert story_records[1]["time"] == 1642720000
+    assert story_records.is_missing("score").tolist() == [False, True, False]
+    assert list(story_records.titles) == ["Show HN: Rust", "Ask HN: Café?", "C"]
+    assert story_records[1]["url"] is None
+    assert story_records.is_missing("url").tolist() == [False, True, True]
+    assert story_records[1]["descendants"] is None
+    assert story_records[-1]["descendants"] == 0
+    assert story_records.kids(0).tolist() == [11, 12, 13]
+    assert story_records[1]["kids"] == []
+    assert story_records.kid_counts().tolist() == [3, 0, 1]
+    with pytest.raises(IndexError):
+        story_records[3]
+    with pytest.raises(KeyError):
+        story_records[0]["by"]
+
+
+def test_empty_strings():
+    story_records = StoryRecords.from_stories(
+        [{"id": 1, "title": "", "url": ""}, {"id": 2, "title": "Rust"}]
+    )
+
+    assert story_records[0]["title"] == ""
+    assert story_records[0]["url"] == ""
+    assert story_records[1]["url"] is None
+    assert story_records.is_missing("title").tolist() == [False, False]
+
+
+def test_save_load(tmp_path):
+    story_records = StoryRecords.from_stories(STORIES)
+    story_records.save(tmp_path / "stories.npz")
+    loaded = StoryRecords.load(tmp_path / "stories.npz")
+
+    assert loaded.records.tobytes() == story_records.records.tobytes()
+    assert list(loaded.titles) == list(story_records.titles)
+    assert list(loaded.urls) == list(story_records.urls)
+    assert loaded.kids(2).tolist() == [31]
+
+
+def test_corpus_records():
+    story_corpus = StoryCorpusReader()
+    story_records = story_corpus.records()
+
+    assert len(story_records) == len(story_corpus.docs())
+    for story, record in zip(story_corpus.docs(), story_records):
+        for name in ("id", "score", "descendants", "time", "title", "url"):
+            assert record[name] == story[name]
+        assert record["kids"] == (story["kids"] or [])
+    assert story_records.nbytes < 500 * 1000
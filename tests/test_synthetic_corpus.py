@@ -0,0 +1,34 @@
+from hn_eda.story_corpus import StoryCorpusReader
+from hn_eda.synthetic_corpus import (
+    TitleModel,
+    synthetic_stories,
+    write_synthetic_corpus,
+)
+
+MODEL = TitleModel.from_titles(StoryCorpusReader().titles())
+
+
+def test_synthetic_stories():
+    stories = list(synthetic_stories(2000, MODEL, seed=1))
+    title_word_counts = [len(story["title"].split()) for story in stories]
+
+    assert stories == list(synthetic_stories(2000, MODEL, seed=1))
+    assert stories != list(synthetic_stories(2000, MODEL, seed=2))
+    assert len({story["id"] for story in stories}) == 2000
+    assert min(title_word_counts) >= MODEL.title_word_counts.min()
+    assert max(title_word_counts) <= MODEL.title_word_counts.max()
+    assert all(story["descendants"] >= len(story["kids"]) for story in stories)
+
+
+def test_vocabulary_growth():
+    small_titles = " ".join(story["title"] for story in synthetic_stories(1000, MODEL))
+    large_titles = " ".join(story["title"] for story in synthetic_stories(10000, MODEL))
+
+    assert len(set(large_titles.split())) > len(set(small_titles.split()))
+
+
+def test_write_synthetic_corpus(tmp_path):
+    file_path = tmp_path / "synthetic.jsonl"
+
+    assert write_synthetic_corpus(file_path, 100, MODEL) == 100
+    assert len(StoryCorpusReader(path=file_path).titles()) == 100
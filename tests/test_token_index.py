@@ -0,0 +1,72 @@
+import pytest
+from nltk.text import ConcordanceIndex, Text, TokenSearcher
+
+from hn_eda.story_corpus import StoryCorpusReader
+from hn_eda.token_index import TokenIndex
+
+SENTENCES = [("Show", "HN", ":", "Rust"), ("Why", "rust", "?"), ("RUST", "and", "C")]
+
+
+def test_positions():
+    token_index = TokenIndex.from_sentences(SENTENCES)
+
+    assert token_index.positions("Rust").tolist() == [3]
+    assert token_index.positions("Go").tolist() == []
+    assert token_index.index("rust") == 5
+    assert token_index.item_indices(token_index.positions("C")).tolist() == [2]
+    with pytest.raises(ValueError):
+        token_index.index("Go")
+
+
+def test_casefold():
+    token_index = TokenIndex.from_sentences(SENTENCES, casefold=True)
+
+    assert token_index.positions("rust").tolist() == [3, 5, 7]
+    assert token_index.findall("<.*><Rust>") == [
+        (":", "Rust"),
+        ("Why", "rust"),
+        ("?", "RUST"),
+    ]
+    assert token_index.concordance("rust", width=20)[2].line == " rust ? RUST and C"
+
+
+@pytest.mark.parametrize("casefold", [False, True])
+def test_ignore_case(casefold):
+    token_index = TokenIndex.from_sentences(
+        [("Straße", "STRASSE", "strasse", "Rust")], casefold=casefold
+    )
+
+    assert token_index.positions("strasse", ignore_case=True).tolist() == [1, 2]
+    assert token_index.positions("RUST", ignore_case=True).tolist() == [3]
+    assert token_index.count("Go", ignore_case=True) == 0
+
+
+def test_nltk_queries():
+    story_corpus = StoryCorpusReader()
+    words = story_corpus.words()
+    token_index = TokenIndex.from_sentences(story_corpus.sentences())
+    concordance_index = ConcordanceIndex(words)
+    token_searcher = TokenSearcher(words)
+
+    assert token_index.concordance("Google") == concordance_index.find_concordance(
+        "Google", width=79
+    )
+    for word in ["language", "Google", "rust"]:
+        assert token_index.concordance(word, ignore_case=True) == Text(
+            words
+        ).concordance_list(word)
+    for pattern in ["<.*><.*><Google>", "<Show><HN>", "<[A-Z]+><.*>"]:
+        assert token_index.findall(pattern) == [
+            tuple(tokens) for tokens in token_searcher.findall(pattern)
+        ]
+
+
+def test_save_load(tmp_path):
+    token_index = TokenIndex.from_sentences(SENTENCES, casefold=True)
+    token_index.save(tmp_path / "index.npz")
+    loaded_index = TokenIndex.load(tmp_path / "index.npz")
+
+    assert loaded_index.casefold
+    assert loaded_index.tokens == token_index.tokens
+    assert loaded_index.positions("RUST").tolist() == [3, 5, 7]
+    assert loaded_index.findall("<Why><.*>") == [("Why", "rust")]
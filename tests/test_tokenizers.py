@@ -1,5 +1,5 @@
 from nltk.tokenize.casual import _replace_html_entities
-from hn_eda.tokenizers import StoryTokenizer
+from hn_eda.tokenizers import StoryTokenizer, tokenize_sents_parallel
 import re
 
 
@@ -29,3 +29,39 @@ def test_uppercased_title():
     uppercase_title = "THIS IS A TEST TITLE 2 !!"
     is_uppercase = re.match(regex_pattern, uppercase_title) is not None
     assert is_uppercase == True
+
+
+def test_tokenize_drops_punctuation():
+    tokenizer = StoryTokenizer()
+    title = "Ask HN: What’s “new” in Python 3.11 – <b>really</b>? &amp; why…"
+    assert tokenizer.tokenize(title) == [
+        "Ask",
+        "HN",
+        "What",
+        "s",
+        "new",
+        "in",
+        "Python",
+        "3.11",
+        "really",
+        "why",
+        "…",
+    ]
+
+
+def test_tokenize_sents():
+    tokenizer = StoryTokenizer()
+    titles = ["SICP JavaScript Version 2022 pdf", "Rust &gt; C++ ?", ""]
+    assert tokenizer.tokenize_sents(titles) == [
+        tokenizer.tokenize(title) for title in titles
+    ]
+    assert tokenizer.tokenize_sents(titles)[1] == ["Rust", "C"]
+
+
+def test_tokenize_sents_parallel():
+    tokenizer = StoryTokenizer()
+    titles = [f"Show HN: Version {i} of my side-project" for i in range(1000)]
+    tokens = tokenize_sents_parallel(
+        tokenizer, titles, workers=2, chunk_size=300, min_size=0
+    )
+    assert tokens == tokenizer.tokenize_sents(titles)
@@ -0,0 +1,19 @@
+import pickle
+
+from hn_eda.vocabulary import load_vocabulary, nltk_data_version
+
+
+def test_load_vocabulary(tmp_path):
+    snapshot_path = tmp_path / "vocabulary.pickle"
+    vocabulary = load_vocabulary(snapshot_path)
+
+    assert "english" in vocabulary.words
+    assert "the" in vocabulary.stop_words
+    assert load_vocabulary(snapshot_path) is vocabulary
+
+    load_vocabulary.cache_clear()
+    assert load_vocabulary(snapshot_path) == vocabulary
+    with open(snapshot_path, "rb") as snapshot_file:
+        assert pickle.load(snapshot_file)["version"] == nltk_data_version(
+            "words", "stopwords"
+        )
@@ -0,0 +1,73 @@
+import pytest
+
+from hn_eda.metric_state import MetricState
+from hn_eda.story_corpus import StoryCorpusReader
+from hn_eda.tokenizers import StoryTokenizer
+from hn_eda.windowed_metrics import DAY, WindowedMetrics
+
+
+def test_bucket_start():
+    windowed_metrics = WindowedMetrics(DAY, origin=3600)
+
+    assert windowed_metrics.bucket_start(3600) == 3600
+    assert windowed_metrics.bucket_start(3599) == 3600 - DAY
+    assert windowed_metrics.bucket_start(DAY + 3600 + 1) == DAY + 3600
+
+
+def test_sliding_windows():
+    story_corpus = StoryCorpusReader()
+    stories = list(zip(story_corpus.column("title"), story_corpus.column("time")))
+    windowed_metrics = WindowedMetrics.from_corpus(story_corpus, DAY)
+
+    assert sum(state.item_count for state in windowed_metrics.buckets.values()) == 500
+
+    tokenizer = StoryTokenizer()
+    windows = list(windowed_metrics.windows(2))
+    assert len(windows) == len(windowed_metrics.bucket_starts())
+    for start, end, state in windowed_metrics.windows(2):
+        expected = MetricState.from_titles(
+            [title for title, time in stories if start <= time < end], tokenizer
+        )
+        assert state.item_count == expected.item_count
+        assert state.titles == expected.titles
+        assert +state.token_counts == expected.token_counts
+        assert state.length_statistics() == pytest.approx(expected.length_statistics())
+        assert set(state.signatures()[0].tolist()) == set(expected.titles)
+
+
+def test_window_values():
+    windowed_metrics = WindowedMetrics.from_corpus(StoryCorpusReader(), DAY)
+    bucket_df = windowed_metrics.bucket_values("title", ["item_count"])
+    window_df = windowed_metrics.window_values(3, "title", ["item_count"])
+
+    assert list(bucket_df.columns) == ["Count"]
+    assert bucket_df["Count"].sum() == 500
+    assert (
+        window_df["Count"].values[2:] == bucket_df["Count"].rolling(3).sum().values[2:]
+    ).all()
+
+
+def test_length_values():
+    story_corpus = StoryCorpusReader()
+    stories = list(zip(story_corpus.column("title"), story_corpus.column("time")))
+    windowed_metrics = WindowedMetrics.from_corpus(story_corpus, 600)
+    metrics = ["average_item_length", "std_item_length"]
+    bucket_df = windowed_metrics.bucket_values("title", metrics)
+    window_df = windowed_metrics.window_values(6, "title", metrics)
+
+    single_title_count = sum(
+        state.unique_item_count() == 1 for state in windowed_metrics.buckets.values()
+    )
+    assert single_title_count
+    assert bucket_df["Std length"].isna().sum() == single_title_count
+    assert bucket_df["Average length"].notna().all()
+
+    tokenizer = StoryTokenizer()
+    for start, end, state in windowed_metrics.windows(6):
+        expected = MetricState.from_titles(
+            [title for title, time in stories if start <= time < end], tokenizer
+        )
+        assert state.length_statistics() == pytest.approx(
+            expected.length_statistics(), nan_ok=True
+        )
+    assert len(window_df) == len(list(windowed_metrics.windows(6)))